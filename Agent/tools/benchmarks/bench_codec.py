@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Encode/decode cost and size of Openctrol input messages: JSON vs binary
+
+Compares the JSON text messages with the optional binary input codec
+(`codec.py`): encoding on the Home Assistant side, decoding on the agent
+side (approximated with Python's json module and `codec.decode_frame`)
+and bytes on the wire.
+
+Usage:
+    python bench_codec.py
+    python bench_codec.py --number 200000
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import sys
+import timeit
+import types
+from pathlib import Path
+
+INTEGRATION_DIR = (
+    Path(__file__).resolve().parents[3] / "homeassistant" / "custom_components" / "openctrol"
+)
+
+
+def load_integration_module(name: str):
+    """Import an integration module without running the package __init__."""
+    if "openctrol_bench" not in sys.modules:
+        package = types.ModuleType("openctrol_bench")
+        package.__path__ = [str(INTEGRATION_DIR)]
+        sys.modules["openctrol_bench"] = package
+    return importlib.import_module(f"openctrol_bench.{name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Openctrol binary input codec")
+    parser.add_argument("--number", type=int, default=100000, help="Messages per case")
+    args = parser.parse_args()
+
+    ser = load_integration_module("serialization")
+    codec = load_integration_module("codec")
+
+    move = ser.pointer_move_message(3, -1)
+    key = ser.key_message(0x41, "down")
+    moves = [ser.pointer_move_message(dx % 7 - 3, dx % 5 - 2) for dx in range(100)]
+    move_frame = codec.encode_frames([move], 65536)[0]
+    batch_frame = codec.encode_frames(moves, 65536)[0]
+    batch_json = '{"type":"batch","events":[' + ",".join(moves) + "]}"
+
+    # The same move as JSON not built by serialization.py, so it is parsed
+    foreign_move = ser.dumps({"dx": 3, "dy": -1, "type": "pointer_move"})
+
+    deltas = itertools.cycle(range(-30000, 30000))
+
+    def new_move() -> None:
+        # More distinct deltas than the builder caches, so each one is built
+        ser.pointer_move_message(next(deltas), 0)
+
+    def uncached_foreign_move() -> None:
+        codec._cache.clear()
+        codec.encode_message(foreign_move)
+
+    cases = [
+        ("pointer_move  build (repeated delta)", lambda: ser.pointer_move_message(3, -1)),
+        ("pointer_move  encode binary", lambda: codec.encode_message(move)),
+        ("pointer_move  encode binary (parsed)", uncached_foreign_move),
+        ("pointer_move  decode JSON", lambda: json.loads(move)),
+        ("pointer_move  decode binary", lambda: codec.decode_frame(move_frame)),
+        ("key           encode binary", lambda: codec.encode_message(key)),
+        ("100 moves     encode binary frame", lambda: codec.encode_frames(moves, 65536)),
+        ("100 moves     decode JSON batch", lambda: json.loads(batch_json)),
+        ("100 moves     decode binary frame", lambda: codec.decode_frame(batch_frame)),
+        # Last: it pushes the records of the messages above out
+        ("pointer_move  build (new delta)", new_move),
+    ]
+
+    print(f"Serializer backend: {ser.JSON_BACKEND}")
+    print(f"Messages per case:  {args.number}")
+    print()
+    print(f"{'Case':<40}{'ns/op':>12}")
+    print("-" * 52)
+    for name, func in cases:
+        number = args.number // 100 if name.startswith("100") else args.number
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:<40}{best / number * 1e9:>12.1f}")
+
+    print()
+    print(f"{'Payload bytes':<40}{'JSON':>6}{'binary':>8}")
+    print("-" * 54)
+    print(f"{'pointer_move':<40}{len(move):>6}{len(move_frame):>8}")
+    print(f"{'100 pointer_move (batch / one frame)':<40}{len(batch_json):>6}{len(batch_frame):>8}")
+
+
+if __name__ == "__main__":
+    main()
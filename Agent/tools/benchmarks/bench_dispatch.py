@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Per-call target resolution overhead of the Openctrol services
+
+Compares resolving a service call's entity_id to its agent through the
+entity registry (the old per-call lookup), through Home Assistant's full
+target expansion, and through the integration's cached entity map.
+
+Requires the `homeassistant` package (tested with 2024.3).
+
+Usage:
+    python bench_dispatch.py
+    python bench_dispatch.py --agents 20 --number 50000
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "homeassistant"))
+
+from homeassistant.core import HomeAssistant, ServiceCall  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from custom_components.openctrol.const import DATA_ENTITY_MAP, DOMAIN  # noqa: E402
+from custom_components.openctrol.fanout import (  # noqa: E402
+    OpenctrolEntityMap,
+    async_resolve_entry_ids,
+)
+
+# Entities each agent registers (sensor, binary_sensor, buttons, numbers, select)
+ENTITIES_PER_AGENT = 14
+
+
+class BenchEntry:
+    """Just enough of a config entry to link registry entries to it."""
+
+    def __init__(self, entry_id: str) -> None:
+        self.entry_id = entry_id
+        self.pref_disable_new_entities = False
+
+
+async def run(agents: int, number: int) -> None:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        await ar.async_load(hass)
+        await dr.async_load(hass)
+        await er.async_load(hass)
+
+        registry = er.async_get(hass)
+        hass.data[DOMAIN] = {}
+        target = None
+        for agent in range(agents):
+            entry = BenchEntry(f"entry{agent}")
+            hass.data[DOMAIN][entry.entry_id] = {}
+            for index in range(ENTITIES_PER_AGENT):
+                entity = registry.async_get_or_create(
+                    "sensor", DOMAIN, f"{entry.entry_id}_{index}", config_entry=entry
+                )
+                target = target or entity.entity_id
+
+        call = ServiceCall(DOMAIN, "send_pointer_event", {"entity_id": target, "type": "move"})
+
+        def registry_lookup() -> None:
+            entity_entry = er.async_get(hass).async_get(target)
+            hass.data[DOMAIN].get(entity_entry.config_entry_id)
+
+        def resolve() -> None:
+            async_resolve_entry_ids(hass, call)
+
+        entity_map = OpenctrolEntityMap(hass)
+
+        print(f"Agents:             {agents} ({agents * ENTITIES_PER_AGENT} entities)")
+        print(f"Calls per case:     {number}")
+        print()
+        print(f"{'Case':<32}{'ns/call':>12}")
+        print("-" * 44)
+        for name, func, cached in (
+            ("registry lookup (old)", registry_lookup, False),
+            ("target expansion (uncached)", resolve, False),
+            ("cached entity map", resolve, True),
+        ):
+            if cached:
+                hass.data[DATA_ENTITY_MAP] = entity_map
+            best = min(timeit.repeat(func, number=number, repeat=5))
+            print(f"{name:<32}{best / number * 1e9:>12.1f}")
+
+        # Another integration's registry change must not drop the map
+        registry.async_get_or_create("light", "other", "unrelated")
+        await hass.async_block_till_done()
+        resolve()
+        print(f"\nEntity map rebuilds: {entity_map.rebuilds}")
+
+        entity_map.async_stop()
+        await hass.async_stop(force=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Openctrol service target resolution")
+    parser.add_argument("--agents", type=int, default=5, help="Loaded Openctrol agents")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.agents, args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Encode cost per message for the Openctrol integration's JSON layer
+
+Compares the old per-message `json.dumps` call against the integration's
+serializer (orjson when installed, stdlib otherwise) and the precomputed
+`pointer_button` / `key` templates.
+
+Usage:
+    python bench_serialization.py
+    python bench_serialization.py --number 200000
+    python bench_serialization.py --stdlib    # force the fallback backend
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import timeit
+from pathlib import Path
+
+INTEGRATION_DIR = (
+    Path(__file__).resolve().parents[3] / "homeassistant" / "custom_components" / "openctrol"
+)
+
+
+def load_serialization(stdlib: bool = False):
+    """Load serialization.py without importing Home Assistant."""
+    if stdlib:
+        # A None entry makes `import orjson` raise ImportError
+        sys.modules["orjson"] = None
+    spec = importlib.util.spec_from_file_location(
+        "openctrol_serialization", INTEGRATION_DIR / "serialization.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Openctrol message encoding")
+    parser.add_argument("--number", type=int, default=100000, help="Messages per case")
+    parser.add_argument("--stdlib", action="store_true", help="Benchmark the stdlib fallback")
+    args = parser.parse_args()
+
+    ser = load_serialization(args.stdlib)
+
+    move = {"type": "pointer_move", "dx": 12, "dy": -7}
+    button = {"type": "pointer_button", "button": "left", "action": "down"}
+    key = {"type": "key", "key_code": 0x41, "action": "down"}
+
+    cases = [
+        ("pointer_move    json.dumps", lambda: json.dumps(move)),
+        (f"pointer_move    {ser.JSON_BACKEND}", lambda: ser.dumps(move)),
+        ("pointer_button  json.dumps", lambda: json.dumps(button)),
+        (f"pointer_button  {ser.JSON_BACKEND}", lambda: ser.dumps(button)),
+        ("pointer_button  template", lambda: ser.pointer_button_message("left", "down")),
+        ("key             json.dumps", lambda: json.dumps(key)),
+        (f"key             {ser.JSON_BACKEND}", lambda: ser.dumps(key)),
+        ("key             template", lambda: ser.key_message(0x41, "down")),
+    ]
+
+    print(f"Serializer backend: {ser.JSON_BACKEND}")
+    print(f"Messages per case:  {args.number}")
+    print()
+    print(f"{'Case':<32}{'ns/message':>12}")
+    print("-" * 44)
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=args.number, repeat=5))
+        print(f"{name:<32}{best / args.number * 1e9:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Transport writes per input action for the Openctrol input WebSocket
+
+Sends input bursts to a local WebSocket server with and without the
+integration's corked transport (`cork.py`) and counts frames and
+transport writes. On a socket transport every write is one `send()`
+syscall, and with TCP_NODELAY a small write is one TCP segment.
+
+Requires `aiohttp`.
+
+Usage:
+    python bench_writes.py
+    python bench_writes.py --rate 250
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import aiohttp
+from aiohttp import web
+
+INTEGRATION_DIR = (
+    Path(__file__).resolve().parents[3] / "homeassistant" / "custom_components" / "openctrol"
+)
+
+
+def load_cork():
+    """Load cork.py without importing Home Assistant."""
+    spec = importlib.util.spec_from_file_location("openctrol_cork", INTEGRATION_DIR / "cork.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class CountingTransport:
+    """Counts writes and bytes reaching the socket transport."""
+
+    def __init__(self, transport: Any) -> None:
+        self._transport = transport
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, data: Any) -> None:
+        self.writes += 1
+        self.bytes += len(data)
+        self._transport.write(data)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._transport, name)
+
+
+def key(code: int, action: str) -> str:
+    return json.dumps({"type": "key", "key_code": code, "action": action}, separators=(",", ":"))
+
+
+CLICK = [
+    '{"type":"pointer_button","button":"left","action":"down"}',
+    '{"type":"pointer_button","button":"left","action":"up"}',
+]
+COMBO = [key(c, "down") for c in (0x11, 0x12, 0x2E)] + [key(c, "up") for c in (0x2E, 0x12, 0x11)]
+MOVE = '{"type":"pointer_move","dx":3,"dy":-1}'
+
+
+async def run_case(
+    url: str, cork: Any, corked: bool, send: Callable[[aiohttp.ClientWebSocketResponse], Any]
+) -> Tuple[int, int]:
+    """Run one scenario and return (frames, transport writes)."""
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(url) as ws:
+            counter = CountingTransport(ws._writer.transport)
+            ws._writer.transport = counter
+            stats = None
+            if corked:
+                stats = cork.CorkStats()
+                cork.cork_websocket(ws, asyncio.get_running_loop(), stats)
+            frames_before = counter.writes
+            await send(ws)
+            await asyncio.sleep(0.05)
+            frames = stats.frames if stats else counter.writes - frames_before
+            return frames, counter.writes - frames_before
+
+
+async def main_async(rate: int) -> None:
+    cork = load_cork()
+    received: List[str] = []
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for msg in ws:
+            received.append(msg.data)
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"ws://127.0.0.1:{port}/"
+
+    def burst(messages: List[str], repeats: int = 100):
+        async def _send(ws):
+            for _ in range(repeats):
+                for message in messages:
+                    await ws.send_str(message)
+                await asyncio.sleep(0)
+
+        return _send, repeats
+
+    def stream(per_tick: int):
+        ticks = rate // per_tick
+
+        async def _send(ws):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for tick in range(ticks):
+                for _ in range(per_tick):
+                    await ws.send_str(MOVE)
+                await asyncio.sleep(max(0.0, start + (tick + 1) / ticks - loop.time()))
+
+        return _send, 1
+
+    cases = [
+        ("click (2 frames)", *burst(CLICK)),
+        ("combo CTRL+ALT+DEL (6 frames)", *burst(COMBO)),
+        (f"1 s pointer stream, {rate} Hz, 1/tick", *stream(1)),
+        (f"1 s pointer stream, {rate} Hz, 4/tick", *stream(4)),
+    ]
+
+    print(f"{'Case':<40}{'frames':>8}{'writes':>9}{'corked':>9}")
+    print("-" * 66)
+    for name, send, per in cases:
+        frames, plain = await run_case(url, cork, False, send)
+        _, corked = await run_case(url, cork, True, send)
+        print(f"{name:<40}{frames / per:>8.0f}{plain / per:>9.0f}{corked / per:>9.0f}")
+    print("\nwrites/corked are transport writes (= send() syscalls) per action")
+
+    await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count transport writes per Openctrol input action")
+    parser.add_argument("--rate", type=int, default=120, help="Pointer events per second")
+    args = parser.parse_args()
+    asyncio.run(main_async(args.rate))
+
+
+if __name__ == "__main__":
+    main()
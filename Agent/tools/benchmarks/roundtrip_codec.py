@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Round-trip check for the Openctrol binary input codec
+
+Starts a local stand-in agent that announces the "binary_input"
+capability, sends input messages through `codec.encode_frames` over a
+real WebSocket and checks that the agent decodes the same events, in the
+same order, as the JSON messages describe. Exits non-zero on a mismatch.
+
+Requires `aiohttp`.
+
+Usage:
+    python roundtrip_codec.py
+"""
+
+import asyncio
+import json
+import sys
+from typing import Any, Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from bench_codec import load_integration_module
+
+MAX_MESSAGE_BYTES = 64 * 1024
+
+
+def cases(ser: Any) -> Dict[str, List[str]]:
+    """Message lists to round-trip, named."""
+    buttons = [
+        ser.pointer_button_message(button, action)
+        for button in ser.POINTER_BUTTONS
+        for action in ("down", "up")
+    ]
+    return {
+        "relative moves (int16 limits)": [
+            ser.pointer_move_message(dx, dy)
+            for dx, dy in ((0, 0), (1, -1), (32767, -32768), (-32768, 32767))
+        ],
+        "absolute moves (0..65535)": [
+            ser.pointer_absolute_message(x, y) for x, y in ((0, 0), (32768, 100), (65535, 65535))
+        ],
+        "buttons": buttons,
+        "wheel": [ser.pointer_wheel_message(0, 120), ser.pointer_wheel_message(-120, -240)],
+        "keys": [ser.key_message(code, action) for code in (0x10, 0x41, 0xFE) for action in ("down", "up")],
+        "text between records stays JSON": [
+            ser.key_message(0x41, "down"),
+            ser.text_message("é✓"),
+            ser.key_message(0x41, "up"),
+        ],
+        "out of range falls back to JSON": [
+            ser.pointer_move_message(40000, 0),
+            ser.pointer_absolute_message(70000, 0),
+            ser.pointer_wheel_message(0, 120),
+        ],
+        "frame split at the message cap": [
+            ser.pointer_move_message(i % 11 - 5, i % 7 - 3) for i in range(30000)
+        ],
+    }
+
+
+async def main_async() -> int:
+    ser = load_integration_module("serialization")
+    codec = load_integration_module("codec")
+    received: List[Dict[str, Any]] = []
+    frames = {"binary": 0, "text": 0}
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(max_msg_size=MAX_MESSAGE_BYTES)
+        await ws.prepare(request)
+        await ws.send_str(
+            json.dumps({"type": "hello", "agent_id": "stand-in", "capabilities": ["binary_input"]})
+        )
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.BINARY:
+                frames["binary"] += 1
+                received.extend(codec.decode_frame(msg.data))
+            elif msg.type == aiohttp.WSMsgType.TEXT:
+                frames["text"] += 1
+                received.append(json.loads(msg.data))
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws/desktop", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    failures = 0
+    async with aiohttp.ClientSession() as session:
+        for name, messages in cases(ser).items():
+            received.clear()
+            frames.update(binary=0, text=0)
+            async with session.ws_connect(f"ws://127.0.0.1:{port}/ws/desktop") as ws:
+                hello = await ws.receive_json()
+                assert "binary_input" in hello["capabilities"]
+                for frame in codec.encode_frames(messages, MAX_MESSAGE_BYTES):
+                    if isinstance(frame, bytes):
+                        await ws.send_bytes(frame)
+                    else:
+                        await ws.send_str(frame)
+            await asyncio.sleep(0.05)
+            expected = [json.loads(message) for message in messages]
+            ok = received == expected
+            failures += not ok
+            print(
+                f"{'ok  ' if ok else 'FAIL'} {name:<36}"
+                f"{len(messages):>6} events {frames['binary']:>3} binary {frames['text']:>3} text"
+            )
+
+    await runner.cleanup()
+    return 1 if failures else 0
+
+
+def main() -> None:
+    sys.exit(asyncio.run(main_async()))
+
+
+if __name__ == "__main__":
+    main()
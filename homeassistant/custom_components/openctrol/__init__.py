@@ -1,47 +1,117 @@
 """The Openctrol integration."""
 
-import asyncio
 import logging
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE, Platform
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr
 
-from .api import OpenctrolApiClient, OpenctrolApiError
+from .api import DEFAULT_CACHE_TTLS, OpenctrolApiClient, OpenctrolApiError
 from .const import (
     ATTR_ACTION,
     ATTR_BUTTON,
+    ATTR_DELAY,
     ATTR_DEVICE_ID,
+    ATTR_DURATION,
     ATTR_DX,
     ATTR_DY,
     ATTR_FORCE,
+    ATTR_INTERVAL,
     ATTR_KEYS,
     ATTR_MONITOR_ID,
     ATTR_MUTED,
+    ATTR_NAME,
+    ATTR_SPEED,
+    ATTR_STEPS,
+    ATTR_TEXT,
+    ATTR_TO_X,
+    ATTR_TO_Y,
     ATTR_VOLUME,
     CONF_API_KEY,
+    CONF_BINARY_INPUT,
+    CONF_COALESCE_WRITES,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSED_PONGS,
     CONF_HOST,
+    CONF_MAC_ADDRESS,
+    CONF_POINTER_ACCELERATION,
+    CONF_POINTER_MOTION,
+    CONF_POINTER_SMOOTHING,
     CONF_PORT,
+    CONF_RELIABLE_INPUT,
     CONF_USE_SSL,
+    CONF_VOLUME_SETTLE_TIME,
     DATA_API_CLIENT,
+    DATA_CONNECTIONS,
+    DATA_ENTITY_MAP,
+    DATA_MACROS,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSED_PONGS,
+    DEFAULT_POINTER_ACCELERATION,
+    DEFAULT_POINTER_SMOOTHING,
+    DEFAULT_VOLUME_SETTLE_TIME,
     DOMAIN,
+    SERVICE_DELETE_MACRO,
+    SERVICE_PLAY_MACRO,
     SERVICE_POWER_ACTION,
+    SERVICE_SEND_INPUT_SEQUENCE,
     SERVICE_SEND_KEY_COMBO,
     SERVICE_SEND_POINTER_EVENT,
     SERVICE_SELECT_MONITOR,
     SERVICE_SET_DEFAULT_OUTPUT_DEVICE,
     SERVICE_SET_DEVICE_VOLUME,
     SERVICE_SET_MASTER_VOLUME,
+    SERVICE_START_MACRO_RECORDING,
+    SERVICE_STOP_MACRO_RECORDING,
+    SERVICE_TYPE_TEXT,
+)
+from .breaker import CircuitBreaker
+from .connection import AgentConnection, OpenctrolConnectionManager, create_agent_session
+from .coordinator import OpenctrolDataUpdateCoordinator
+from .fanout import (
+    FANOUT_TARGET_TIMEOUT,
+    OpenctrolEntityMap,
+    TargetOperation,
+    async_extend_target_timeout,
+    async_fan_out,
 )
+from .geometry import NORMALIZED_MAX, default_monitor_id, monitor_layout, pixels_to_normalized
+from .macro import OpenctrolMacroRecorder, OpenctrolMacroStore
+from .sequence import (
+    DEFAULT_DOUBLE_CLICK_INTERVAL,
+    DEFAULT_DRAG_DURATION,
+    DEFAULT_LONG_PRESS_DURATION,
+    GESTURE_TYPES,
+    CompiledSequence,
+    async_run_sequence,
+    compile_double_click,
+    compile_drag,
+    compile_long_press,
+    compile_sequence,
+    compile_text,
+)
+from .wol import OpenctrolWakeError
 from .ws import OpenctrolWsClient
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = [Platform.SENSOR]
+PLATFORMS = [
+    Platform.BINARY_SENSOR,
+    Platform.BUTTON,
+    Platform.NUMBER,
+    Platform.SELECT,
+    Platform.SENSOR,
+]
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -50,18 +120,90 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     port = entry.data[CONF_PORT]
     use_ssl = entry.data.get(CONF_USE_SSL, False)
     api_key = entry.data.get(CONF_API_KEY) or None
+    input_options: Dict[str, Any] = {
+        "coalesce_writes": entry.options.get(CONF_COALESCE_WRITES, False),
+        "binary_input": entry.options.get(CONF_BINARY_INPUT, False),
+        "heartbeat_interval": entry.options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL),
+        "heartbeat_missed_pongs": entry.options.get(
+            CONF_HEARTBEAT_MISSED_PONGS, DEFAULT_HEARTBEAT_MISSED_PONGS
+        ),
+        "reliable_input": entry.options.get(CONF_RELIABLE_INPUT, False),
+        "pointer_motion": entry.options.get(CONF_POINTER_MOTION, False),
+        "pointer_acceleration": entry.options.get(
+            CONF_POINTER_ACCELERATION, DEFAULT_POINTER_ACCELERATION
+        ),
+        "pointer_smoothing": entry.options.get(CONF_POINTER_SMOOTHING, DEFAULT_POINTER_SMOOTHING),
+    }
 
-    session = async_get_clientsession(hass)
-    client = OpenctrolApiClient(
-        session=session,
-        host=host,
-        port=port,
-        use_ssl=use_ssl,
-        api_key=api_key,
+    def _create_connection() -> Tuple[OpenctrolApiClient, OpenctrolWsClient]:
+        # REST and WebSocket traffic to one agent share a circuit breaker so a
+        # powered-off PC fails calls immediately instead of waiting for timeouts
+        breaker = CircuitBreaker(f"{host}:{port}")
+
+        # Each agent gets its own keep-alive connection pool instead of HA's
+        # shared session; it is closed when the last entry using it unloads
+        session, connection_stats = create_agent_session(use_ssl)
+        client = OpenctrolApiClient(
+            session=session,
+            host=host,
+            port=port,
+            use_ssl=use_ssl,
+            api_key=api_key,
+            cache_ttls=DEFAULT_CACHE_TTLS,
+            breaker=breaker,
+            connection_stats=connection_stats,
+        )
+
+        # Create WebSocket client with entry_id for session management
+        ws_client = OpenctrolWsClient(
+            hass,
+            host,
+            port,
+            use_ssl,
+            api_key,
+            entry.entry_id,
+            api_client=client,
+            **input_options,
+        )
+        return client, ws_client
+
+    # Entries for the same agent share its REST client and WebSocket, so
+    # they take one of the agent's session slots between them. The input
+    # options are part of the settings, so an entry reloaded with other
+    # options never keeps a WebSocket built with the old ones.
+    if DATA_CONNECTIONS not in hass.data:
+        hass.data[DATA_CONNECTIONS] = OpenctrolConnectionManager()
+    connection = hass.data[DATA_CONNECTIONS].acquire(
+        entry.entry_id,
+        host,
+        port,
+        (use_ssl, api_key, tuple(sorted(input_options.items()))),
+        _create_connection,
     )
+    try:
+        await _async_setup_entry_data(hass, entry, connection)
+    except Exception:
+        # Nothing else holds the reference or the session on failure
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        await _async_release_connection(hass, entry.entry_id)
+        raise
+    return True
 
-    # Create WebSocket client with entry_id for session management
-    ws_client = OpenctrolWsClient(hass, host, port, use_ssl, api_key, entry.entry_id)
+
+async def _async_setup_entry_data(
+    hass: HomeAssistant, entry: ConfigEntry, connection: AgentConnection
+) -> None:
+    """Set up everything of an entry that uses its agent connection."""
+    host = entry.data[CONF_HOST]
+    port = entry.data[CONF_PORT]
+    client, ws_client = connection.api_client, connection.ws_client
+
+    async def _async_close_session(_: Event) -> None:
+        await client.session.close()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    )
 
     entry_data = {
         DATA_API_CLIENT: client,
@@ -72,25 +214,87 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "sessions": {},  # Initialize sessions dict
     }
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = entry_data
+    # Service targets resolve through one shared map instead of the registry
+    if DATA_ENTITY_MAP not in hass.data:
+        hass.data[DATA_ENTITY_MAP] = OpenctrolEntityMap(hass)
+    hass.data[DATA_ENTITY_MAP].async_invalidate()
+    # Macros are recorded on one agent and replayed on any of them
+    if DATA_MACROS not in hass.data:
+        macros = hass.data[DATA_MACROS] = OpenctrolMacroStore(hass)
+        await macros.async_load()
+
+    # One coordinator feeds every platform; each entity only writes its own slice
+    # A MAC from the options wins over one learned from the ARP table, which
+    # is kept as a connection on the device so it survives restarts
+    coordinator = OpenctrolDataUpdateCoordinator(
+        hass,
+        client,
+        volume_settle_time=entry.options.get(CONF_VOLUME_SETTLE_TIME, DEFAULT_VOLUME_SETTLE_TIME),
+        mac_address=entry.options.get(CONF_MAC_ADDRESS) or _async_get_device_mac(hass, entry),
+        on_mac_learned=lambda mac: _async_store_device_mac(hass, entry, mac),
+    )
+    entry_data["coordinator"] = coordinator
+    # Don't fail setup if the agent is offline - entities are created unavailable
+    await coordinator.async_refresh()
+    if not coordinator.last_update_success:
+        _LOGGER.warning(
+            "Initial coordinator refresh failed for entry %s (entities will still be created)",
+            entry.entry_id,
+        )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     # Register services
     await _async_register_services(hass, entry)
 
-    return True
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+
+async def _async_release_connection(hass: HomeAssistant, entry_id: str) -> None:
+    """Let go of an entry's agent connection; the last entry closes it."""
+    if connections := hass.data.get(DATA_CONNECTIONS):
+        await connections.async_release(entry_id)
+        if not connections:
+            hass.data.pop(DATA_CONNECTIONS)
+
+
+@callback
+def _async_get_device_mac(hass: HomeAssistant, entry: ConfigEntry) -> Optional[str]:
+    """Return the MAC address stored on the entry's device, if any."""
+    device = dr.async_get(hass).async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    if device is None:
+        return None
+    for connection_type, value in device.connections:
+        if connection_type == dr.CONNECTION_NETWORK_MAC:
+            return value
+    return None
+
+
+@callback
+def _async_store_device_mac(hass: HomeAssistant, entry: ConfigEntry, mac: str) -> None:
+    """Remember a learned MAC address as a connection of the entry's device."""
+    registry = dr.async_get(hass)
+    device = registry.async_get_device(identifiers={(DOMAIN, entry.entry_id)})
+    if device is not None:
+        registry.async_update_device(
+            device.id, merge_connections={(dr.CONNECTION_NETWORK_MAC, mac)}
+        )
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Close WebSocket connection if open
     entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
-    ws_client: Optional[OpenctrolWsClient] = entry_data.get("ws_client")
-    if ws_client:
-        try:
-            await ws_client.async_close()
-        except Exception:
-            pass
+    coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+    if coordinator:
+        await coordinator.async_shutdown()
+    recorder: Optional[OpenctrolMacroRecorder] = entry_data.pop("macro_recorder", None)
+    if recorder:
+        recorder.stop()
 
     # Unregister services for this entry
     try:
@@ -102,56 +306,125 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # The WebSocket and session close with the last entry using them
+        await _async_release_connection(hass, entry.entry_id)
+        if entity_map := hass.data.get(DATA_ENTITY_MAP):
+            entity_map.async_invalidate()
+            if not hass.data[DOMAIN]:
+                entity_map.async_stop()
+                hass.data.pop(DATA_ENTITY_MAP)
 
     return unload_ok
 
 
-def _get_entry_id_from_entity_id(hass: HomeAssistant, entity_id: str) -> Optional[str]:
-    """Get config entry ID from entity ID."""
-    registry = er.async_get(hass)
-    entity_entry = registry.async_get(entity_id)
-    if entity_entry and entity_entry.config_entry_id:
-        return entity_entry.config_entry_id
-    return None
-
-
-def _get_entry_data_from_entity_id(
-    hass: HomeAssistant, entity_id: str
-) -> Tuple[str, Dict[str, Any]]:
-    """Get entry ID and entry data from entity ID.
-    
-    Returns:
-        Tuple of (entry_id, entry_data)
-    
-    Raises:
-        HomeAssistantError: If entity_id is invalid or entry not found
-    """
-    if not entity_id:
-        raise HomeAssistantError("entity_id is required")
-    
-    entry_id = _get_entry_id_from_entity_id(hass, entity_id)
-    if not entry_id:
-        raise HomeAssistantError(f"Could not find config entry for entity {entity_id}")
-    
-    entry_data = hass.data[DOMAIN].get(entry_id)
-    if not entry_data:
-        raise HomeAssistantError(f"Config entry {entry_id} not found")
-    
-    return entry_id, entry_data
-
-
 async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Register all Openctrol services."""
 
-    async def send_pointer_event(call: ServiceCall) -> None:
-        """Handle send_pointer_event service call."""
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
+    async def _async_absolute_position(
+        call: ServiceCall,
+        entry_data: Dict[str, Any],
+        ws_client: OpenctrolWsClient,
+        fields: Sequence[Tuple[str, str]] = (("x", "y"),),
+    ) -> List[Tuple[int, int]]:
+        """Return normalized positions for the x/y field pairs of a pointer event.
+
+        With `monitor_id` the positions are pixels on that monitor (or on
+        the virtual desktop for "desktop") and must all be on one monitor;
+        the agent's selected monitor is switched first when it is another
+        one. Without it they are already normalized.
+        """
+        points: List[Tuple[float, float]] = []
+        for x_field, y_field in fields:
+            try:
+                points.append((float(call.data[x_field]), float(call.data[y_field])))
+            except (KeyError, TypeError, ValueError) as err:
+                raise HomeAssistantError(
+                    f"{x_field} and {y_field} are required for absolute pointer events"
+                ) from err
+        monitor = call.data.get(ATTR_MONITOR_ID)
+        if not monitor:
+            return [
+                (
+                    min(max(int(round(x)), 0), NORMALIZED_MAX),
+                    min(max(int(round(y)), 0), NORMALIZED_MAX),
+                )
+                for x, y in points
+            ]
+
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        data = (coordinator.data if coordinator else None) or {}
+        # Sizes polled from the agent, or announced when the socket opened
+        monitors = data.get("monitors") or ws_client.monitors
+        try:
+            converted = [pixels_to_normalized(monitors, x, y, str(monitor)) for x, y in points]
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+        monitor_ids = {monitor_id for monitor_id, _, _ in converted}
+        if len(monitor_ids) > 1:
+            # Absolute moves only reach the selected monitor
+            raise HomeAssistantError("A pointer gesture cannot span monitors")
+        monitor_id = converted[0][0]
+        selected = data.get("selected_monitor_id") or default_monitor_id(monitor_layout(monitors))
+        if monitor_id != selected:
+            if coordinator is None:
+                raise HomeAssistantError(f"Cannot switch the agent to monitor {monitor_id}")
+            await coordinator.async_select_monitor(monitor_id)
+        return [(normalized_x, normalized_y) for _, normalized_x, normalized_y in converted]
+
+    async def _async_send_gesture(
+        call: ServiceCall, entry_data: Dict[str, Any], ws_client: OpenctrolWsClient
+    ) -> Dict[str, Any]:
+        """Compile and run a double_click, drag or long_press pointer event."""
+        event_type = call.data["type"]
+        button = call.data.get(ATTR_BUTTON) or "left"
+        has_position = "x" in call.data or "y" in call.data
+        try:
+            if event_type == "drag":
+                duration = float(call.data.get(ATTR_DURATION, DEFAULT_DRAG_DURATION))
+                if has_position:
+                    start, end = await _async_absolute_position(
+                        call, entry_data, ws_client, (("x", "y"), (ATTR_TO_X, ATTR_TO_Y))
+                    )
+                    sequence = compile_drag(end, duration, button, start)
+                else:
+                    end = (float(call.data.get(ATTR_DX) or 0), float(call.data.get(ATTR_DY) or 0))
+                    sequence = compile_drag(end, duration, button)
+            else:
+                position = None
+                if has_position:
+                    (position,) = await _async_absolute_position(call, entry_data, ws_client)
+                if event_type == "double_click":
+                    interval = float(call.data.get(ATTR_INTERVAL, DEFAULT_DOUBLE_CLICK_INTERVAL))
+                    sequence = compile_double_click(button, interval, position)
+                else:
+                    duration = float(call.data.get(ATTR_DURATION, DEFAULT_LONG_PRESS_DURATION))
+                    sequence = compile_long_press(button, duration, position)
+        except (TypeError, ValueError) as err:
+            raise HomeAssistantError(f"Invalid {event_type}: {err}") from err
+        return await _async_send_sequence(entry_data, sequence)
+
+    async def send_pointer_event(
+        call: ServiceCall, entry_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Handle send_pointer_event for one agent."""
         ws_client: Optional[OpenctrolWsClient] = entry_data.get("ws_client")
         if not ws_client:
             raise HomeAssistantError("WebSocket client not available")
         
+        event_type = call.data.get("type")
+        if event_type in GESTURE_TYPES:
+            # Timed like a sequence, which also reports the timing
+            return await _async_send_gesture(call, entry_data, ws_client)
         try:
-            event_type = call.data.get("type")
+            if event_type == "click_at" or (
+                event_type == "move" and call.data.get("absolute") and call.data.get(ATTR_MONITOR_ID)
+            ):
+                ((x, y),) = await _async_absolute_position(call, entry_data, ws_client)
+                if event_type == "click_at":
+                    await ws_client.async_click_at(x, y, call.data.get(ATTR_BUTTON) or "left")
+                else:
+                    await ws_client.async_send_pointer_event("move", absolute=True, x=x, y=y)
+                return None
             # Handle button down/up events for toggle
             if event_type == "button":
                 button = call.data.get(ATTR_BUTTON)
@@ -226,15 +499,14 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             _LOGGER.error("Error sending pointer event: %s", err, exc_info=True)
             raise HomeAssistantError(f"Failed to send pointer event: {err}") from err
 
-    async def send_key_combo(call: ServiceCall) -> None:
-        """Handle send_key_combo service call."""
+    async def send_key_combo(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle send_key_combo for one agent."""
         keys = call.data.get(ATTR_KEYS, [])
         if not keys:
             _LOGGER.warning("send_key_combo called with empty keys list")
             raise HomeAssistantError("keys list cannot be empty")
         
         _LOGGER.debug("Received send_key_combo service call with keys: %s", keys)
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
         ws_client: Optional[OpenctrolWsClient] = entry_data.get("ws_client")
         if not ws_client:
             _LOGGER.error("WebSocket client not available for send_key_combo")
@@ -252,24 +524,113 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             _LOGGER.error("Error sending key combo: %s (keys: %s)", err, keys, exc_info=True)
             raise HomeAssistantError(f"Failed to send key combo: {err}") from err
 
-    async def power_action(call: ServiceCall) -> None:
-        """Handle power_action service call."""
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
+    async def _async_send_sequence(
+        entry_data: Dict[str, Any], sequence: CompiledSequence, speed: float = 1.0
+    ) -> Dict[str, Any]:
+        """Run a compiled input sequence on one agent's WebSocket."""
+        ws_client: Optional[OpenctrolWsClient] = entry_data.get("ws_client")
+        if not ws_client:
+            raise HomeAssistantError("WebSocket client not available")
+
+        if speed > 0:
+            # The plan may run longer than the fan-out timeout; connecting
+            # still gets the usual allowance on top of it
+            async_extend_target_timeout(sequence.duration / speed + FANOUT_TARGET_TIMEOUT)
+        try:
+            return await async_run_sequence(ws_client, sequence, speed)
+        except ValueError as err:
+            raise HomeAssistantError(str(err)) from err
+        except RuntimeError as err:
+            _LOGGER.error("WebSocket connection error sending input sequence: %s", err)
+            raise HomeAssistantError(f"WebSocket connection failed: {err}") from err
+        except Exception as err:
+            _LOGGER.error("Error sending input sequence: %s", err, exc_info=True)
+            raise HomeAssistantError(f"Failed to send input sequence: {err}") from err
+
+    async def send_input_sequence(
+        call: ServiceCall, entry_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Handle send_input_sequence for one agent."""
+        try:
+            sequence = compile_sequence(call.data.get(ATTR_STEPS) or [])
+        except ValueError as err:
+            raise HomeAssistantError(f"Invalid input sequence: {err}") from err
+        return await _async_send_sequence(entry_data, sequence)
+
+    async def type_text(call: ServiceCall, entry_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle type_text for one agent."""
+        try:
+            sequence = compile_text(
+                str(call.data.get(ATTR_TEXT, "")), float(call.data.get(ATTR_DELAY, 0))
+            )
+        except (TypeError, ValueError) as err:
+            raise HomeAssistantError(f"Invalid text: {err}") from err
+        return await _async_send_sequence(entry_data, sequence)
+
+    async def start_macro_recording(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle start_macro_recording for one agent."""
+        ws_client: Optional[OpenctrolWsClient] = entry_data.get("ws_client")
+        if not ws_client:
+            raise HomeAssistantError("WebSocket client not available")
+        name = call.data.get(ATTR_NAME)
+        if not name:
+            raise HomeAssistantError("name is required")
+        if recorder := entry_data.get("macro_recorder"):
+            raise HomeAssistantError(f"Already recording macro {recorder.name}")
+        entry_data["macro_recorder"] = OpenctrolMacroRecorder(str(name), ws_client)
+
+    async def stop_macro_recording(
+        call: ServiceCall, entry_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Handle stop_macro_recording for one agent."""
+        recorder: Optional[OpenctrolMacroRecorder] = entry_data.pop("macro_recorder", None)
+        if not recorder:
+            raise HomeAssistantError("No macro is being recorded")
+        recorder.stop()
+        return hass.data[DATA_MACROS].async_save_recording(recorder)
+
+    async def play_macro(call: ServiceCall, entry_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle play_macro for one agent."""
+        name = call.data.get(ATTR_NAME)
+        try:
+            sequence = hass.data[DATA_MACROS].get_compiled(name)
+        except KeyError as err:
+            raise HomeAssistantError(f"Unknown macro: {name}") from err
+        try:
+            speed = float(call.data.get(ATTR_SPEED, 1.0))
+        except (TypeError, ValueError) as err:
+            raise HomeAssistantError("speed must be a number") from err
+        if speed <= 0:
+            raise HomeAssistantError("speed must be greater than 0")
+        # Runs for the macro's length at this speed, not the fan-out timeout;
+        # keys still held when playback is cut short are released
+        return await _async_send_sequence(entry_data, sequence, speed)
+
+    async def power_action(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle power_action for one agent."""
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        if not coordinator:
             raise HomeAssistantError("API client not available")
-        
+
+        if call.data.get(ATTR_ACTION) == "wol":
+            # The agent cannot wake its own PC; send the magic packet from here
+            try:
+                await coordinator.async_wake()
+            except OpenctrolWakeError as err:
+                raise HomeAssistantError(str(err)) from err
+            return
+
         try:
-            await client.async_power_action(call.data.get(ATTR_ACTION), call.data.get(ATTR_FORCE))
+            # The coordinator follows restart/shutdown instead of polling blindly
+            await coordinator.async_power_action(call.data.get(ATTR_ACTION), call.data.get(ATTR_FORCE))
         except OpenctrolApiError as err:
             _LOGGER.error("Power action failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"Power action failed: {err}") from err
 
-    async def select_monitor(call: ServiceCall) -> None:
-        """Handle select_monitor service call."""
-        entity_id, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
+    async def select_monitor(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle select_monitor for one agent."""
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        if not coordinator:
             raise HomeAssistantError("API client not available")
         
         monitor_id = call.data.get(ATTR_MONITOR_ID)
@@ -277,49 +638,32 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             raise HomeAssistantError("monitor_id is required")
         
         try:
-            await client.async_select_monitor(monitor_id)
+            # Selection is applied to coordinator data immediately and
+            # confirmed by a single debounced re-read of the monitors endpoint
+            await coordinator.async_select_monitor(monitor_id)
             _LOGGER.info("Monitor selected successfully: %s", monitor_id)
-            
-            # Force immediate entity refresh to update monitor selection state
-            from homeassistant.helpers import entity_registry as er
-            registry = er.async_get(hass)
-            entity_entry = registry.async_get(entity_id)
-            if entity_entry:
-                entry_id = entity_entry.config_entry_id
-                # Get coordinator and force refresh
-                coordinator = hass.data.get(DOMAIN, {}).get(entry_id, {}).get("coordinator")
-                if coordinator:
-                    # Force immediate refresh
-                    await coordinator.async_request_refresh()
-                    # Also trigger a manual update via service call as backup
-                    await hass.services.async_call("homeassistant", "update_entity", {"entity_id": entity_id}, blocking=False)
-                else:
-                    # Fallback: just call update entity service
-                    await hass.services.async_call("homeassistant", "update_entity", {"entity_id": entity_id}, blocking=False)
         except OpenctrolApiError as err:
             _LOGGER.error("Select monitor failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"Select monitor failed: {err}") from err
 
-    async def set_master_volume(call: ServiceCall) -> None:
-        """Handle set_master_volume service call."""
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
+    async def set_master_volume(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle set_master_volume for one agent."""
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        if not coordinator:
             raise HomeAssistantError("API client not available")
         
         try:
-            await client.async_set_master_volume(
+            await coordinator.async_set_master_volume(
                 call.data.get(ATTR_VOLUME), call.data.get(ATTR_MUTED)
             )
         except OpenctrolApiError as err:
             _LOGGER.error("Set master volume failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"Set master volume failed: {err}") from err
 
-    async def set_device_volume(call: ServiceCall) -> None:
-        """Handle set_device_volume service call."""
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
+    async def set_device_volume(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle set_device_volume for one agent."""
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        if not coordinator:
             raise HomeAssistantError("API client not available")
         
         device_id = call.data.get(ATTR_DEVICE_ID)
@@ -327,7 +671,7 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             raise HomeAssistantError("device_id is required")
         
         try:
-            await client.async_set_device_volume(
+            await coordinator.async_set_device_volume(
                 device_id,
                 call.data.get(ATTR_VOLUME),
                 call.data.get(ATTR_MUTED),
@@ -336,11 +680,10 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             _LOGGER.error("Set device volume failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"Set device volume failed: {err}") from err
 
-    async def set_default_output_device(call: ServiceCall) -> None:
-        """Handle set_default_output_device service call."""
-        entity_id, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
+    async def set_default_output_device(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle set_default_output_device for one agent."""
+        coordinator: Optional[OpenctrolDataUpdateCoordinator] = entry_data.get("coordinator")
+        if not coordinator:
             raise HomeAssistantError("API client not available")
         
         device_id = call.data.get(ATTR_DEVICE_ID)
@@ -348,15 +691,9 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             raise HomeAssistantError("device_id is required")
         
         try:
-            await client.async_set_default_output_device(device_id)
-            # Wait a moment for the change to take effect
-            await asyncio.sleep(0.5)
-            # Refresh entity to update default device status
-            await hass.services.async_call("homeassistant", "update_entity", {"entity_id": entity_id})
-            # Also refresh coordinator if available
-            coordinator = entry_data.get("coordinator")
-            if coordinator:
-                await coordinator.async_request_refresh()
+            # The new default is shown right away; a debounced re-read of the
+            # audio endpoint confirms it once the agent has applied the change
+            await coordinator.async_set_default_output_device(device_id)
         except OpenctrolApiError as err:
             error_msg = str(err)
             # Provide more helpful error messages
@@ -370,56 +707,13 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             # Don't raise error for most cases - just log warning (some systems can't change default device)
             # The backend already handles this gracefully
 
-    # Service schemas - services.yaml will be used for schema definition
-    # These registrations use minimal schemas since services.yaml provides the full definition
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SEND_POINTER_EVENT,
-        send_pointer_event,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SEND_KEY_COMBO,
-        send_key_combo,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_POWER_ACTION,
-        power_action,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SELECT_MONITOR,
-        select_monitor,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_MASTER_VOLUME,
-        set_master_volume,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_DEVICE_VOLUME,
-        set_device_volume,
-    )
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_SET_DEFAULT_OUTPUT_DEVICE,
-        set_default_output_device,
-    )
-
-    async def create_desktop_session(call: ServiceCall) -> None:
-        """Handle create_desktop_session service call.
+    async def create_desktop_session(
+        call: ServiceCall, entry_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Handle create_desktop_session for one agent.
         
         Session info is stored in entry_data and exposed via entity attributes.
         """
-        entity_id, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
         client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
         if not client:
             raise HomeAssistantError("API client not available")
@@ -441,15 +735,10 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
                 "expires_at": session_data.get("expires_at", ""),
             }
             
-            # Update entity attributes to expose session info
-            from homeassistant.helpers import entity_registry as er
-            registry = er.async_get(hass)
-            entity_entry = registry.async_get(entity_id)
-            if entity_entry:
-                # Trigger entity update by requesting coordinator refresh
-                coordinator = entry_data.get("coordinator")
-                if coordinator:
-                    await coordinator.async_request_refresh()
+            # Trigger entity update by requesting coordinator refresh
+            coordinator = entry_data.get("coordinator")
+            if coordinator:
+                await coordinator.async_request_refresh()
             
             _LOGGER.info(
                 "Created desktop session %s. WebSocket URL: %s",
@@ -459,10 +748,10 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
         except OpenctrolApiError as err:
             _LOGGER.error("Create desktop session failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"Create desktop session failed: {err}") from err
+        return dict(entry_data["latest_session"])
 
-    async def end_desktop_session(call: ServiceCall) -> None:
-        """Handle end_desktop_session service call."""
-        _, entry_data = _get_entry_data_from_entity_id(hass, call.data.get("entity_id"))
+    async def end_desktop_session(call: ServiceCall, entry_data: Dict[str, Any]) -> None:
+        """Handle end_desktop_session for one agent."""
         client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
         if not client:
             raise HomeAssistantError("API client not available")
@@ -480,17 +769,54 @@ async def _async_register_services(hass: HomeAssistant, entry: ConfigEntry) -> N
             _LOGGER.error("End desktop session failed: %s", err, exc_info=True)
             raise HomeAssistantError(f"End desktop session failed: {err}") from err
 
-    hass.services.async_register(
-        DOMAIN,
-        "create_desktop_session",
-        create_desktop_session,
+    # Service schemas - services.yaml will be used for schema definition.
+    # Every service accepts entity, device, area and label targets and runs
+    # once per targeted agent; the audio services use device_id for the
+    # audio device, so HA devices cannot target them.
+    services: Tuple[Tuple[str, TargetOperation, bool], ...] = (
+        (SERVICE_SEND_POINTER_EVENT, send_pointer_event, True),
+        (SERVICE_SEND_KEY_COMBO, send_key_combo, True),
+        (SERVICE_SEND_INPUT_SEQUENCE, send_input_sequence, True),
+        (SERVICE_TYPE_TEXT, type_text, True),
+        (SERVICE_START_MACRO_RECORDING, start_macro_recording, True),
+        (SERVICE_STOP_MACRO_RECORDING, stop_macro_recording, True),
+        (SERVICE_PLAY_MACRO, play_macro, True),
+        (SERVICE_POWER_ACTION, power_action, True),
+        (SERVICE_SELECT_MONITOR, select_monitor, True),
+        (SERVICE_SET_MASTER_VOLUME, set_master_volume, True),
+        (SERVICE_SET_DEVICE_VOLUME, set_device_volume, False),
+        (SERVICE_SET_DEFAULT_OUTPUT_DEVICE, set_default_output_device, False),
+        ("create_desktop_session", create_desktop_session, True),
+        ("end_desktop_session", end_desktop_session, True),
     )
+    for service, operation, device_targets in services:
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            _fan_out_handler(hass, operation, device_targets),
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+
+    async def delete_macro(call: ServiceCall) -> None:
+        """Handle delete_macro; macros are shared, so it takes no target."""
+        name = call.data.get(ATTR_NAME)
+        try:
+            hass.data[DATA_MACROS].async_delete(name)
+        except KeyError as err:
+            raise HomeAssistantError(f"Unknown macro: {name}") from err
 
-    hass.services.async_register(
-        DOMAIN,
-        "end_desktop_session",
-        end_desktop_session,
-    )
+    hass.services.async_register(DOMAIN, SERVICE_DELETE_MACRO, delete_macro)
+
+
+def _fan_out_handler(
+    hass: HomeAssistant, operation: TargetOperation, device_targets: bool
+) -> Callable[[ServiceCall], Awaitable[ServiceResponse]]:
+    """Wrap a per-agent service operation so it runs for every target."""
+
+    async def _async_handle(call: ServiceCall) -> ServiceResponse:
+        return await async_fan_out(hass, call, operation, device_targets)
+
+    return _async_handle
 
 
 def _async_unregister_services(hass: HomeAssistant) -> None:
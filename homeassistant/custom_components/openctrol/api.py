@@ -1,7 +1,62 @@
 """API client for Openctrol Agent."""
 
+import asyncio
+import time
 import aiohttp
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+from .breaker import CircuitBreaker, describe_open
+from .serialization import dumps_bytes, loads
+
+if TYPE_CHECKING:
+    from .connection import ConnectionStats
+
+PATH_HEALTH = "/api/v1/health"
+PATH_POWER = "/api/v1/power"
+PATH_AUDIO_STATUS = "/api/v1/audio/status"
+PATH_AUDIO_MASTER = "/api/v1/audio/master"
+PATH_AUDIO_DEVICE = "/api/v1/audio/device"
+PATH_AUDIO_DEFAULT = "/api/v1/audio/default"
+PATH_MONITORS = "/api/v1/rd/monitors"
+PATH_MONITOR_SELECT = "/api/v1/rd/monitor"
+PATH_DESKTOP_SESSIONS = "/api/v1/sessions/desktop"
+
+_ALL_PATHS = (
+    PATH_HEALTH,
+    PATH_POWER,
+    PATH_AUDIO_STATUS,
+    PATH_AUDIO_MASTER,
+    PATH_AUDIO_DEVICE,
+    PATH_AUDIO_DEFAULT,
+    PATH_MONITORS,
+    PATH_MONITOR_SELECT,
+    PATH_DESKTOP_SESSIONS,
+)
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+# Suggested cache lifetimes (seconds) for GET endpoints. Monitors rarely
+# change; health is only cached long enough to merge bursts of callers.
+DEFAULT_CACHE_TTLS: Mapping[str, float] = {
+    PATH_HEALTH: 2.0,
+    PATH_MONITORS: 60.0,
+}
+
+# GET endpoints whose cached responses a successful POST makes stale
+_INVALIDATES: Mapping[str, Tuple[str, ...]] = {
+    PATH_MONITOR_SELECT: (PATH_MONITORS,),
+    PATH_AUDIO_MASTER: (PATH_AUDIO_STATUS,),
+    PATH_AUDIO_DEVICE: (PATH_AUDIO_STATUS,),
+    PATH_AUDIO_DEFAULT: (PATH_AUDIO_STATUS,),
+    PATH_DESKTOP_SESSIONS: (PATH_HEALTH,),
+    PATH_POWER: (PATH_HEALTH, PATH_MONITORS, PATH_AUDIO_STATUS),
+}
+
+
+# Errors that mean the agent could not be reached at all
+CONNECT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError, OSError)
 
 
 class OpenctrolApiError(Exception):
@@ -10,6 +65,39 @@ class OpenctrolApiError(Exception):
     pass
 
 
+class OpenctrolCircuitOpenError(OpenctrolApiError):
+    """Raised without a network call while the agent's circuit is open."""
+
+    pass
+
+
+@asynccontextmanager
+async def guarded(breaker: Optional[CircuitBreaker]) -> AsyncIterator[None]:
+    """Run a network call through the agent's circuit breaker.
+
+    Only connect failures and timeouts count against the breaker; an HTTP
+    error status still proves the agent is reachable.
+    """
+    if breaker is None:
+        yield
+        return
+    if not breaker.allow_request():
+        raise OpenctrolCircuitOpenError(describe_open(breaker))
+    try:
+        yield
+    except CONNECT_ERRORS:
+        breaker.record_failure()
+        raise
+    except OpenctrolApiError:
+        breaker.record_success()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    else:
+        breaker.record_success()
+
+
 class OpenctrolApiClient:
     """Async client for Openctrol Agent API."""
 
@@ -20,61 +108,143 @@ class OpenctrolApiClient:
         port: int,
         use_ssl: bool,
         api_key: Optional[str] = None,
+        cache_ttls: Optional[Mapping[str, float]] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        connection_stats: Optional["ConnectionStats"] = None,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        Concurrent identical GETs always share one request. `cache_ttls`
+        optionally keeps responses per path for a few seconds; matching
+        POSTs invalidate them. With a `breaker`, calls fail immediately
+        while the agent is known to be unreachable.
+        """
         self._session = session
         self._host = host
         self._port = port
         self._use_ssl = use_ssl
         self._api_key = api_key
+        self.breaker = breaker
+        self.connection_stats = connection_stats
+        # URLs and headers never change for a client, so build them once
+        self._base_url = f"{'https' if use_ssl else 'http'}://{host}:{port}"
+        self._urls = {path: f"{self._base_url}{path}" for path in _ALL_PATHS}
+        headers: Dict[str, str] = {}
+        if api_key:
+            headers["X-Openctrol-Key"] = api_key
+        self._headers: Mapping[str, str] = MappingProxyType(headers)
+        self._json_headers: Mapping[str, str] = MappingProxyType(
+            {**headers, "Content-Type": "application/json"}
+        )
+        self._cache_ttls: Mapping[str, float] = cache_ttls or {}
+        self._cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self._generation: Dict[str, int] = {}
+        self.requests_shared = 0
+        self.cache_hits = 0
+
+    @property
+    def host(self) -> str:
+        """Return the agent host."""
+        return self._host
+
+    @property
+    def port(self) -> int:
+        """Return the agent port."""
+        return self._port
 
     @property
     def base_url(self) -> str:
         """Get the base URL for the API."""
-        protocol = "https" if self._use_ssl else "http"
-        return f"{protocol}://{self._host}:{self._port}"
+        return self._base_url
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the HTTP session used to reach the agent."""
+        return self._session
+
+    def _url(self, path: str) -> str:
+        """Return the full URL for an API path."""
+        return self._urls.get(path) or f"{self._base_url}{path}"
+
+    async def _get_json(self, path: str) -> Dict[str, Any]:
+        """GET JSON from API, sharing in-flight requests and cached responses.
+
+        The returned dict may be shared between callers and must be treated
+        as read-only.
+        """
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] > time.monotonic():
+            self.cache_hits += 1
+            return cached[1]
+
+        task = self._inflight.get(path)
+        if task is not None:
+            self.requests_shared += 1
+        else:
+            generation = self._generation.get(path, 0)
+            task = asyncio.ensure_future(self._fetch_json(path))
+            self._inflight[path] = task
+            task.add_done_callback(
+                lambda done: self._async_finish_get(path, generation, done)
+            )
+        # Shield so one cancelled caller does not abort the request for the others
+        return await asyncio.shield(task)
+
+    def _async_finish_get(
+        self, path: str, generation: int, task: "asyncio.Task[Dict[str, Any]]"
+    ) -> None:
+        """Drop the finished request and cache its result if still current."""
+        if self._inflight.get(path) is task:
+            del self._inflight[path]
+        if task.cancelled() or task.exception() is not None:
+            return
+        ttl = self._cache_ttls.get(path, 0)
+        # A POST during the request bumps the generation; its result is stale
+        if ttl > 0 and self._generation.get(path, 0) == generation:
+            self._cache[path] = (time.monotonic() + ttl, task.result())
 
-    def _get_headers(self) -> Dict[str, str]:
-        """Get headers with API key if available."""
-        headers = {}
-        if self._api_key:
-            headers["X-Openctrol-Key"] = self._api_key
-        return headers
+    def _invalidate(self, post_path: str) -> None:
+        """Forget cached and in-flight GETs made stale by a POST."""
+        for path in _INVALIDATES.get(post_path, ()):
+            self._cache.pop(path, None)
+            self._inflight.pop(path, None)
+            self._generation[path] = self._generation.get(path, 0) + 1
 
-    async def _get_json(self, url: str) -> Dict[str, Any]:
+    async def _fetch_json(self, path: str) -> Dict[str, Any]:
         """Helper to GET JSON from API."""
-        headers = self._get_headers()
-        async with self._session.get(
-            url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)
+        async with guarded(self.breaker), self._session.get(
+            self._url(path), headers=self._headers, timeout=REQUEST_TIMEOUT
         ) as response:
             if response.status != 200:
                 error_text = await response.text()
                 raise OpenctrolApiError(
                     f"API request failed with status {response.status}: {error_text}"
                 )
-            return await response.json()
+            return await response.json(loads=loads)
 
     async def _post_json(
-        self, url: str, payload: Optional[Dict[str, Any]] = None
+        self, path: str, payload: Optional[Dict[str, Any]] = None
     ) -> None:
         """Helper to POST JSON to API (no response body expected)."""
-        headers = self._get_headers()
-        headers["Content-Type"] = "application/json"
-        async with self._session.post(
-            url,
-            headers=headers,
-            json=payload or {},
-            timeout=aiohttp.ClientTimeout(total=10),
+        # Invalidate up front too, so GETs racing with the POST are not cached
+        self._invalidate(path)
+        async with guarded(self.breaker), self._session.post(
+            self._url(path),
+            headers=self._json_headers,
+            data=dumps_bytes(payload or {}),
+            timeout=REQUEST_TIMEOUT,
         ) as response:
             if response.status != 200:
                 error_text = await response.text()
                 raise OpenctrolApiError(
                     f"API request failed with status {response.status}: {error_text}"
                 )
+        self._invalidate(path)
 
     async def async_get_health(self) -> Dict[str, Any]:
         """Get health status from the agent."""
-        return await self._get_json(f"{self.base_url}/api/v1/health")
+        return await self._get_json(PATH_HEALTH)
 
     async def async_power_action(
         self, action: str, force: Optional[bool] = None
@@ -83,11 +253,11 @@ class OpenctrolApiClient:
         payload: Dict[str, Any] = {"action": action}
         if force is not None:
             payload["force"] = force
-        await self._post_json(f"{self.base_url}/api/v1/power", payload)
+        await self._post_json(PATH_POWER, payload)
 
     async def async_get_audio_status(self) -> Dict[str, Any]:
         """Get audio status (master volume and devices)."""
-        return await self._get_json(f"{self.base_url}/api/v1/audio/status")
+        return await self._get_json(PATH_AUDIO_STATUS)
 
     async def async_set_master_volume(
         self, volume: Optional[int] = None, muted: Optional[bool] = None
@@ -98,7 +268,7 @@ class OpenctrolApiClient:
             payload["volume"] = float(volume)  # API expects float
         if muted is not None:
             payload["muted"] = muted
-        await self._post_json(f"{self.base_url}/api/v1/audio/master", payload)
+        await self._post_json(PATH_AUDIO_MASTER, payload)
 
     async def async_set_device_volume(
         self,
@@ -113,51 +283,51 @@ class OpenctrolApiClient:
             payload["Volume"] = float(volume)  # API expects float
         if muted is not None:
             payload["Muted"] = muted
-        await self._post_json(f"{self.base_url}/api/v1/audio/device", payload)
+        await self._post_json(PATH_AUDIO_DEVICE, payload)
 
     async def async_set_default_output_device(self, device_id: str) -> None:
         """Set default audio output device."""
         # Backend expects DeviceId (capital D) but accepts case-insensitive JSON
         await self._post_json(
-            f"{self.base_url}/api/v1/audio/default", {"DeviceId": device_id}
+            PATH_AUDIO_DEFAULT, {"DeviceId": device_id}
         )
 
     async def async_get_monitors(self) -> Dict[str, Any]:
         """Get available monitors and current selection."""
-        return await self._get_json(f"{self.base_url}/api/v1/rd/monitors")
+        return await self._get_json(PATH_MONITORS)
 
     async def async_select_monitor(self, monitor_id: str) -> None:
         """Select monitor for remote desktop capture."""
         # Backend expects MonitorId (capital M) but accepts case-insensitive JSON
         await self._post_json(
-            f"{self.base_url}/api/v1/rd/monitor", {"MonitorId": monitor_id}
+            PATH_MONITOR_SELECT, {"MonitorId": monitor_id}
         )
 
     async def async_create_desktop_session(
         self, ha_id: str, ttl_seconds: int = 900
     ) -> Dict[str, Any]:
         """Create a desktop session and return session details."""
-        headers = self._get_headers()
-        headers["Content-Type"] = "application/json"
         # Backend expects HaId (capital H and I) and TtlSeconds
         payload = {"HaId": ha_id, "TtlSeconds": ttl_seconds}
         
-        async with self._session.post(
-            f"{self.base_url}/api/v1/sessions/desktop",
-            headers=headers,
-            json=payload,
-            timeout=aiohttp.ClientTimeout(total=10),
+        self._invalidate(PATH_DESKTOP_SESSIONS)
+        async with guarded(self.breaker), self._session.post(
+            self._url(PATH_DESKTOP_SESSIONS),
+            headers=self._json_headers,
+            data=dumps_bytes(payload),
+            timeout=REQUEST_TIMEOUT,
         ) as response:
             if response.status != 200:
                 error_text = await response.text()
                 raise OpenctrolApiError(
                     f"Create desktop session failed with status {response.status}: {error_text}"
                 )
-            return await response.json()
+            return await response.json(loads=loads)
 
     async def async_end_desktop_session(self, session_id: str) -> None:
         """End a desktop session."""
         await self._post_json(
-            f"{self.base_url}/api/v1/sessions/desktop/{session_id}/end"
+            f"{PATH_DESKTOP_SESSIONS}/{session_id}/end"
         )
+        self._invalidate(PATH_DESKTOP_SESSIONS)
 
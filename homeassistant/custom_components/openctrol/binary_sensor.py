@@ -0,0 +1,51 @@
+"""Binary sensor platform for Openctrol integration."""
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import OpenctrolDataUpdateCoordinator
+from .entity import OpenctrolEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Openctrol binary sensor platform."""
+    coordinator: OpenctrolDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities([OpenctrolOnlineBinarySensor(coordinator, entry)])
+
+
+class OpenctrolOnlineBinarySensor(OpenctrolEntity, BinarySensorEntity):
+    """Reports whether the agent answers its health endpoint."""
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+
+    def __init__(
+        self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator, entry, "online", "Online")
+
+    def _data_slice(self) -> Any:
+        """Online state is derived from the poll result alone."""
+        return self.is_on
+
+    @property
+    def is_on(self) -> bool:
+        """Return true if the agent is reachable."""
+        return bool(self.coordinator.last_update_success and self.coordinator.data)
+
+    @property
+    def available(self) -> bool:
+        """Connectivity is always known, so the entity is always available."""
+        return True
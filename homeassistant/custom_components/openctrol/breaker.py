@@ -0,0 +1,157 @@
+"""Circuit breaker shared by the REST and WebSocket clients of one agent."""
+
+import logging
+import time
+from typing import Callable, List, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 15.0
+DEFAULT_MAX_RESET_TIMEOUT = 120.0
+
+
+class CircuitBreaker:
+    """Fail fast while an agent is unreachable.
+
+    After `failure_threshold` consecutive connect failures the breaker opens
+    and calls are rejected without touching the network. Once the reset
+    timeout has passed a single call is let through as a half-open probe:
+    success closes the breaker, failure opens it again with a doubled
+    timeout (capped at `max_reset_timeout`).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        max_reset_timeout: float = DEFAULT_MAX_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker."""
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._base_reset_timeout = reset_timeout
+        self._max_reset_timeout = max_reset_timeout
+        self._reset_timeout = reset_timeout
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._listeners: List[Callable[[], None]] = []
+        self.rejected_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Return the current state (closed, open or half_open)."""
+        if self._state == STATE_OPEN and self.retry_in == 0:
+            return STATE_HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while calls are being rejected."""
+        return self._state != STATE_CLOSED
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Return the number of consecutive connect failures."""
+        return self._failures
+
+    @property
+    def retry_in(self) -> float:
+        """Return seconds until the next half-open probe is allowed."""
+        if self._state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` on every state change; returns a remove function."""
+        self._listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go to the network now."""
+        if self._state == STATE_CLOSED:
+            return True
+        if self._probe_in_flight or self.retry_in > 0:
+            self.rejected_calls += 1
+            return False
+        # Let exactly one probe through
+        self._probe_in_flight = True
+        self._set_state(STATE_HALF_OPEN)
+        return True
+
+    def record_success(self) -> None:
+        """Record that the agent answered."""
+        self._failures = 0
+        self._probe_in_flight = False
+        self._reset_timeout = self._base_reset_timeout
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("Agent %s reachable again, closing circuit", self.name)
+            self._set_state(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a connect failure or timeout."""
+        self._failures += 1
+        if self._state == STATE_HALF_OPEN:
+            self._probe_in_flight = False
+            self._reset_timeout = min(self._reset_timeout * 2, self._max_reset_timeout)
+            self._open()
+        elif self._state == STATE_CLOSED and self._failures >= self._failure_threshold:
+            _LOGGER.warning(
+                "Agent %s failed %d consecutive connects, failing calls fast for %.0f s",
+                self.name,
+                self._failures,
+                self._reset_timeout,
+            )
+            self._open()
+
+    def release(self) -> None:
+        """Release a probe slot without an outcome (e.g. the call was cancelled)."""
+        if self._probe_in_flight:
+            self._probe_in_flight = False
+            self._set_state(STATE_OPEN)
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._set_state(STATE_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        changed = state != self._state
+        self._state = state
+        if changed:
+            for listener in list(self._listeners):
+                listener()
+
+    def as_dict(self) -> dict:
+        """Return breaker state for diagnostics and entity attributes."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in, 1),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+        }
+
+
+def describe_open(breaker: Optional[CircuitBreaker]) -> str:
+    """Return a user-facing message for a rejected call."""
+    if breaker is None:
+        return "Agent is unreachable"
+    return (
+        f"Agent {breaker.name} is unreachable "
+        f"({breaker.consecutive_failures} failed connects); "
+        f"next attempt in {breaker.retry_in:.0f} s"
+    )
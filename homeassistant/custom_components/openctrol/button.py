@@ -0,0 +1,95 @@
+"""Button platform for Openctrol integration."""
+
+import logging
+from typing import Any
+
+from homeassistant.components.button import (
+    ButtonDeviceClass,
+    ButtonEntity,
+    ButtonEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .api import OpenctrolApiError
+from .const import DOMAIN
+from .coordinator import OpenctrolDataUpdateCoordinator
+from .entity import OpenctrolEntity
+from .wol import OpenctrolWakeError
+
+_LOGGER = logging.getLogger(__name__)
+
+POWER_BUTTONS: tuple[ButtonEntityDescription, ...] = (
+    ButtonEntityDescription(
+        key="restart",
+        name="Restart",
+        device_class=ButtonDeviceClass.RESTART,
+    ),
+    ButtonEntityDescription(
+        key="shutdown",
+        name="Shutdown",
+        icon="mdi:power",
+    ),
+    ButtonEntityDescription(
+        key="wol",
+        name="Wake",
+        icon="mdi:power-on",
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Openctrol button platform."""
+    coordinator: OpenctrolDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities(
+        OpenctrolPowerButton(coordinator, entry, description)
+        for description in POWER_BUTTONS
+    )
+
+
+class OpenctrolPowerButton(OpenctrolEntity, ButtonEntity):
+    """Triggers a power action on the agent."""
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        description: ButtonEntityDescription,
+    ) -> None:
+        """Initialize the button."""
+        super().__init__(coordinator, entry, description.key, str(description.name))
+        self.entity_description = description
+
+    def _data_slice(self) -> Any:
+        """Buttons are stateless; only availability matters."""
+        return self.available
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available.
+
+        Wake is sent from Home Assistant, so it only needs a known MAC.
+        """
+        if self.entity_description.key == "wol":
+            return self.coordinator.waker.mac is not None
+        return self.coordinator.last_update_success
+
+    async def async_press(self) -> None:
+        """Run the power action."""
+        if self.entity_description.key == "wol":
+            try:
+                await self.coordinator.async_wake()
+            except OpenctrolWakeError as err:
+                raise HomeAssistantError(str(err)) from err
+            return
+        try:
+            await self.coordinator.async_power_action(self.entity_description.key)
+        except OpenctrolApiError as err:
+            _LOGGER.error("Power action failed: %s", err, exc_info=True)
+            raise HomeAssistantError(f"Power action failed: {err}") from err
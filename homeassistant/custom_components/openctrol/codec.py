@@ -0,0 +1,162 @@
+"""Binary input encoding for Openctrol agents.
+
+An agent that lists "binary_input" in its hello capabilities accepts
+input events as BINARY WebSocket frames: the magic `OINP` followed by
+fixed-width 5-byte records, one per event.
+
+    type (u8) + payload (4 bytes, little-endian)
+    0x01 pointer_move  dx (i16), dy (i16)
+    0x02 pointer_move  absolute x (u16), y (u16)
+    0x03 pointer_button  button (u8: left, right, middle), action (u8: down, up), 2 pad
+    0x04 pointer_wheel  delta_x (i16), delta_y (i16)
+    0x05 key  key_code (u16), action (u8: down, up), modifiers (u8)
+
+Input messages are built as JSON throughout the integration. The
+builders in `serialization.py` make each message's record along with it,
+so the encoder only looks it up; any other JSON is parsed once and the
+result kept in a bounded LRU. Messages without a record type (such as
+`text`) are sent as JSON text frames in order.
+"""
+
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .serialization import (
+    BUTTON_RECORD,
+    KEY_RECORD,
+    POINTER_BUTTONS,
+    RECORD_BUTTON,
+    RECORD_KEY,
+    RECORD_MOVE,
+    RECORD_MOVE_ABSOLUTE,
+    RECORD_WHEEL,
+    SIGNED_RECORD,
+    UNSIGNED_RECORD,
+    loads,
+    message_record,
+)
+
+MAGIC = b"OINP"
+RECORD_SIZE = SIGNED_RECORD.size
+
+_ACTIONS = ("down", "up")
+_INT16 = range(-32768, 32768)
+_UINT16 = range(0x10000)
+
+# Encoded JSON not built by serialization.py -> record (None when the
+# message has no binary form), least recently used first
+_CACHE_SIZE = 4096
+_cache: "OrderedDict[str, Optional[bytes]]" = OrderedDict()
+
+
+def _encode_event(event: Dict[str, Any]) -> Optional[bytes]:
+    """Return the record for a decoded event, or None."""
+    event_type = event.get("type")
+    try:
+        if event_type == "pointer_move":
+            if event.get("absolute"):
+                x, y = event["x"], event["y"]
+                if x in _UINT16 and y in _UINT16:
+                    return UNSIGNED_RECORD.pack(RECORD_MOVE_ABSOLUTE, x, y)
+                return None
+            dx, dy = event.get("dx", 0), event.get("dy", 0)
+            if dx in _INT16 and dy in _INT16:
+                return SIGNED_RECORD.pack(RECORD_MOVE, dx, dy)
+        elif event_type == "pointer_wheel":
+            dx, dy = event.get("delta_x", 0), event.get("delta_y", 0)
+            if dx in _INT16 and dy in _INT16:
+                return SIGNED_RECORD.pack(RECORD_WHEEL, dx, dy)
+        elif event_type == "pointer_button":
+            return BUTTON_RECORD.pack(
+                RECORD_BUTTON,
+                POINTER_BUTTONS.index(event["button"]),
+                _ACTIONS.index(event["action"]),
+            )
+        elif event_type == "key" and set(event) <= {"type", "key_code", "action"}:
+            if event["key_code"] in _UINT16:
+                return KEY_RECORD.pack(RECORD_KEY, event["key_code"], _ACTIONS.index(event["action"]), 0)
+    except (KeyError, TypeError, ValueError, struct.error):
+        pass
+    return None
+
+
+def encode_message(message_json: str) -> Optional[bytes]:
+    """Return the binary record for an encoded JSON input message, or None."""
+    record = message_record(message_json)
+    if record is not None:
+        return record
+    try:
+        record = _cache[message_json]
+    except KeyError:
+        pass
+    else:
+        _cache.move_to_end(message_json)
+        return record
+    try:
+        event = loads(message_json)
+    except ValueError:
+        return None
+    record = _encode_event(event) if isinstance(event, dict) else None
+    _cache[message_json] = record
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return record
+
+
+def encode_frames(messages: Sequence[str], max_bytes: int) -> List[Union[bytes, str]]:
+    """Encode messages into BINARY frames, keeping unencodable ones as JSON.
+
+    Consecutive records share a frame of at most `max_bytes`; order is
+    preserved across binary and text frames.
+    """
+    frames: List[Union[bytes, str]] = []
+    records: List[bytes] = []
+    max_records = (max_bytes - len(MAGIC)) // RECORD_SIZE
+    for message_json in messages:
+        record = encode_message(message_json)
+        if record is None:
+            if records:
+                frames.append(MAGIC + b"".join(records))
+                records = []
+            frames.append(message_json)
+            continue
+        records.append(record)
+        if len(records) == max_records:
+            frames.append(MAGIC + b"".join(records))
+            records = []
+    if records:
+        frames.append(MAGIC + b"".join(records))
+    return frames
+
+
+def decode_frame(frame: bytes) -> List[Dict[str, Any]]:
+    """Decode a BINARY input frame into session-format events.
+
+    Used by stand-in agents and tests; raises ValueError for a bad frame.
+    """
+    if not frame.startswith(MAGIC) or (len(frame) - len(MAGIC)) % RECORD_SIZE:
+        raise ValueError("Not an Openctrol binary input frame")
+    events: List[Dict[str, Any]] = []
+    for offset in range(len(MAGIC), len(frame), RECORD_SIZE):
+        record_type = frame[offset]
+        if record_type == RECORD_MOVE:
+            _, dx, dy = SIGNED_RECORD.unpack_from(frame, offset)
+            events.append({"type": "pointer_move", "dx": dx, "dy": dy})
+        elif record_type == RECORD_MOVE_ABSOLUTE:
+            _, x, y = UNSIGNED_RECORD.unpack_from(frame, offset)
+            events.append({"type": "pointer_move", "x": x, "y": y, "absolute": True})
+        elif record_type == RECORD_WHEEL:
+            _, dx, dy = SIGNED_RECORD.unpack_from(frame, offset)
+            events.append({"type": "pointer_wheel", "delta_x": dx, "delta_y": dy})
+        elif record_type == RECORD_BUTTON:
+            _, button, action = BUTTON_RECORD.unpack_from(frame, offset)
+            events.append(
+                {"type": "pointer_button", "button": POINTER_BUTTONS[button], "action": _ACTIONS[action]}
+            )
+        elif record_type == RECORD_KEY:
+            _, key_code, action, _modifiers = KEY_RECORD.unpack_from(frame, offset)
+            events.append({"type": "key", "key_code": key_code, "action": _ACTIONS[action]})
+        else:
+            raise ValueError(f"Unknown input record type {record_type:#x}")
+    return events
@@ -6,6 +6,7 @@ from typing import Any, Dict, Optional
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 _LOGGER = logging.getLogger(__name__)
@@ -13,14 +14,30 @@ _LOGGER = logging.getLogger(__name__)
 from .api import OpenctrolApiClient, OpenctrolApiError
 from .const import (
     CONF_API_KEY,
+    CONF_BINARY_INPUT,
+    CONF_COALESCE_WRITES,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSED_PONGS,
     CONF_HOST,
+    CONF_MAC_ADDRESS,
+    CONF_POINTER_ACCELERATION,
+    CONF_POINTER_MOTION,
+    CONF_POINTER_SMOOTHING,
     CONF_PORT,
+    CONF_RELIABLE_INPUT,
     CONF_USE_SSL,
+    CONF_VOLUME_SETTLE_TIME,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSED_PONGS,
+    DEFAULT_POINTER_ACCELERATION,
+    DEFAULT_POINTER_SMOOTHING,
     DEFAULT_NAME,
     DEFAULT_PORT,
     DEFAULT_USE_SSL,
+    DEFAULT_VOLUME_SETTLE_TIME,
     DOMAIN,
 )
+from .wol import normalize_mac
 
 
 class OpenctrolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -28,6 +45,14 @@ class OpenctrolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "OpenctrolOptionsFlow":
+        """Get the options flow for this handler."""
+        return OpenctrolOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ):
@@ -94,3 +119,75 @@ class OpenctrolConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=data_schema, errors=errors
         )
 
+
+class OpenctrolOptionsFlow(config_entries.OptionsFlow):
+    """Handle Openctrol options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._entry = config_entry
+
+    async def async_step_init(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ):
+        """Manage the options."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            # Leave the MAC empty to learn it from the ARP table
+            if mac := (user_input.get(CONF_MAC_ADDRESS) or "").strip():
+                try:
+                    user_input[CONF_MAC_ADDRESS] = normalize_mac(mac)
+                except ValueError:
+                    errors[CONF_MAC_ADDRESS] = "invalid_mac"
+            else:
+                user_input.pop(CONF_MAC_ADDRESS, None)
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_VOLUME_SETTLE_TIME,
+                    default=options.get(CONF_VOLUME_SETTLE_TIME, DEFAULT_VOLUME_SETTLE_TIME),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=2)),
+                vol.Optional(
+                    CONF_MAC_ADDRESS,
+                    description={"suggested_value": options.get(CONF_MAC_ADDRESS)},
+                ): str,
+                vol.Required(
+                    CONF_COALESCE_WRITES,
+                    default=options.get(CONF_COALESCE_WRITES, False),
+                ): bool,
+                vol.Required(
+                    CONF_BINARY_INPUT,
+                    default=options.get(CONF_BINARY_INPUT, False),
+                ): bool,
+                vol.Required(
+                    CONF_RELIABLE_INPUT,
+                    default=options.get(CONF_RELIABLE_INPUT, False),
+                ): bool,
+                vol.Required(
+                    CONF_HEARTBEAT_INTERVAL,
+                    default=options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL),
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                vol.Required(
+                    CONF_HEARTBEAT_MISSED_PONGS,
+                    default=options.get(CONF_HEARTBEAT_MISSED_PONGS, DEFAULT_HEARTBEAT_MISSED_PONGS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                vol.Required(
+                    CONF_POINTER_MOTION,
+                    default=options.get(CONF_POINTER_MOTION, False),
+                ): bool,
+                vol.Required(
+                    CONF_POINTER_ACCELERATION,
+                    default=options.get(CONF_POINTER_ACCELERATION, DEFAULT_POINTER_ACCELERATION),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3)),
+                vol.Required(
+                    CONF_POINTER_SMOOTHING,
+                    default=options.get(CONF_POINTER_SMOOTHING, DEFAULT_POINTER_SMOOTHING),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=0.9)),
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=data_schema, errors=errors)
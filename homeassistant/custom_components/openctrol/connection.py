@@ -0,0 +1,185 @@
+"""HTTP connection handling for Openctrol agents.
+
+Config entries that point at the same agent (same host and port) share
+one REST client, HTTP session and input WebSocket through
+`OpenctrolConnectionManager`, so they use one of the agent's session
+slots instead of competing for them.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from homeassistant.util import ssl as ssl_util
+
+if TYPE_CHECKING:
+    from .api import OpenctrolApiClient
+    from .ws import OpenctrolWsClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# One agent is a single LAN host: a handful of pooled connections covers the
+# coordinator poll, service calls and the input WebSocket.
+AGENT_CONNECTION_LIMIT = 4
+KEEPALIVE_TIMEOUT = 60.0  # seconds an idle connection is kept for the next poll
+DNS_CACHE_TTL = 300  # seconds
+
+
+class ConnectionStats:
+    """Counts requests and whether they rode a pooled connection."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Return the share of connection acquisitions served from the pool."""
+        acquired = self.connections_created + self.connections_reused
+        if not acquired:
+            return 0.0
+        return round(self.connections_reused / acquired, 3)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters for diagnostics and entity attributes."""
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+        }
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return an aiohttp trace config feeding these counters."""
+        trace = aiohttp.TraceConfig()
+
+        async def _on_request_start(*_: Any) -> None:
+            self.requests += 1
+
+        async def _on_connection_create_end(*_: Any) -> None:
+            self.connections_created += 1
+
+        async def _on_connection_reuseconn(*_: Any) -> None:
+            self.connections_reused += 1
+
+        trace.on_request_start.append(_on_request_start)
+        trace.on_connection_create_end.append(_on_connection_create_end)
+        trace.on_connection_reuseconn.append(_on_connection_reuseconn)
+        return trace
+
+
+def create_agent_session(use_ssl: bool) -> Tuple[aiohttp.ClientSession, ConnectionStats]:
+    """Create a long-lived HTTP session dedicated to one agent.
+
+    Keeps connections alive between polls, caps connections to the host,
+    caches DNS and uses one SSL context for every TLS connection to the
+    agent. The caller owns the session and must close it on unload.
+    """
+    stats = ConnectionStats()
+    connector = aiohttp.TCPConnector(
+        limit=AGENT_CONNECTION_LIMIT,
+        limit_per_host=AGENT_CONNECTION_LIMIT,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=ssl_util.get_default_context() if use_ssl else False,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        trace_configs=[stats.trace_config()],
+    )
+    return session, stats
+
+
+class AgentConnection:
+    """REST client and input WebSocket of one agent, shared by its config entries."""
+
+    def __init__(
+        self,
+        key: str,
+        settings: Tuple[Any, ...],
+        api_client: "OpenctrolApiClient",
+        ws_client: "OpenctrolWsClient",
+    ) -> None:
+        """Initialize a connection with no entries using it yet."""
+        self.key = key
+        self.settings = settings
+        self.api_client = api_client
+        self.ws_client = ws_client
+        # In the order they were added; the first one's desktop sessions are used
+        self.entry_ids: List[str] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return sharing state for diagnostics."""
+        return {"key": self.key, "entries": len(self.entry_ids)}
+
+
+class OpenctrolConnectionManager:
+    """Agent connections keyed by host:port, closed when the last entry lets go."""
+
+    def __init__(self) -> None:
+        """Initialize with no connections."""
+        self._connections: Dict[str, AgentConnection] = {}
+
+    def __len__(self) -> int:
+        """Return the number of open agent connections."""
+        return len(self._connections)
+
+    def acquire(
+        self,
+        entry_id: str,
+        host: str,
+        port: int,
+        settings: Tuple[Any, ...],
+        create: Callable[[], Tuple["OpenctrolApiClient", "OpenctrolWsClient"]],
+    ) -> AgentConnection:
+        """Return the connection for `host:port`, creating it on first use.
+
+        `settings` (TLS, API key, input options) must match for entries to
+        share; an entry with different ones gets a connection of its own.
+        """
+        key = f"{host.lower()}:{port}"
+        connection = self._connections.get(key)
+        if connection is not None and connection.settings != settings:
+            _LOGGER.warning(
+                "%s is configured twice with different settings; not sharing its connection",
+                key,
+            )
+            key = f"{key}/{entry_id}"
+            connection = self._connections.get(key)
+        if connection is None:
+            api_client, ws_client = create()
+            connection = self._connections[key] = AgentConnection(
+                key, settings, api_client, ws_client
+            )
+        elif entry_id not in connection.entry_ids:
+            _LOGGER.debug("Sharing the connection to %s with entry %s", key, entry_id)
+        if entry_id not in connection.entry_ids:
+            connection.entry_ids.append(entry_id)
+        return connection
+
+    def get(self, entry_id: str) -> Optional[AgentConnection]:
+        """Return the connection an entry uses, if any."""
+        for connection in self._connections.values():
+            if entry_id in connection.entry_ids:
+                return connection
+        return None
+
+    async def async_release(self, entry_id: str) -> None:
+        """Drop an entry's reference; the last one closes the WebSocket and session."""
+        if (connection := self.get(entry_id)) is None:
+            return
+        connection.entry_ids.remove(entry_id)
+        if connection.entry_ids:
+            # Desktop sessions are looked up under the entry that remains
+            connection.ws_client.set_entry_id(connection.entry_ids[0])
+            return
+        del self._connections[connection.key]
+        try:
+            await connection.ws_client.async_close()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Error closing WebSocket to %s: %s", connection.key, err)
+        await connection.api_client.session.close()
@@ -12,6 +12,12 @@ DEFAULT_PORT = 44325
 DEFAULT_USE_SSL = False
 
 DATA_API_CLIENT = "api_client"
+# hass.data key of the entity_id -> config entry map shared by all entries
+DATA_ENTITY_MAP = f"{DOMAIN}_entity_map"
+# hass.data key of the connection manager sharing agents between entries
+DATA_CONNECTIONS = f"{DOMAIN}_connections"
+# hass.data key of the macro store shared by all entries
+DATA_MACROS = f"{DOMAIN}_macros"
 
 # Service names
 SERVICE_SEND_POINTER_EVENT = "send_pointer_event"
@@ -21,6 +27,12 @@ SERVICE_SELECT_MONITOR = "select_monitor"
 SERVICE_SET_MASTER_VOLUME = "set_master_volume"
 SERVICE_SET_DEVICE_VOLUME = "set_device_volume"
 SERVICE_SET_DEFAULT_OUTPUT_DEVICE = "set_default_output_device"
+SERVICE_SEND_INPUT_SEQUENCE = "send_input_sequence"
+SERVICE_TYPE_TEXT = "type_text"
+SERVICE_START_MACRO_RECORDING = "start_macro_recording"
+SERVICE_STOP_MACRO_RECORDING = "stop_macro_recording"
+SERVICE_PLAY_MACRO = "play_macro"
+SERVICE_DELETE_MACRO = "delete_macro"
 
 # Service attribute keys
 ATTR_DX = "dx"
@@ -34,4 +46,32 @@ ATTR_VOLUME = "volume"
 ATTR_MUTED = "muted"
 ATTR_DEVICE_ID = "device_id"
 ATTR_EVENT = "event"
+ATTR_STEPS = "steps"
+ATTR_TEXT = "text"
+ATTR_DELAY = "delay"
+ATTR_NAME = "name"
+ATTR_SPEED = "speed"
+ATTR_DURATION = "duration"
+ATTR_INTERVAL = "interval"
+ATTR_TO_X = "to_x"
+ATTR_TO_Y = "to_y"
 
+
+# Options
+CONF_VOLUME_SETTLE_TIME = "volume_settle_time"
+CONF_MAC_ADDRESS = "mac_address"
+CONF_COALESCE_WRITES = "coalesce_writes"
+CONF_BINARY_INPUT = "binary_input"
+CONF_RELIABLE_INPUT = "reliable_input"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+CONF_HEARTBEAT_MISSED_PONGS = "heartbeat_missed_pongs"
+CONF_POINTER_MOTION = "pointer_motion"
+CONF_POINTER_ACCELERATION = "pointer_acceleration"
+CONF_POINTER_SMOOTHING = "pointer_smoothing"
+
+DEFAULT_VOLUME_SETTLE_TIME = 0.15  # seconds between coalesced volume writes
+# A WebSocket that misses this many consecutive pongs is treated as dead
+DEFAULT_HEARTBEAT_INTERVAL = 5.0  # seconds
+DEFAULT_HEARTBEAT_MISSED_PONGS = 2
+DEFAULT_POINTER_ACCELERATION = 0.0  # linear
+DEFAULT_POINTER_SMOOTHING = 0.0
@@ -0,0 +1,475 @@
+"""Data update coordinator for Openctrol integration."""
+
+import copy
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import OpenctrolApiClient, OpenctrolApiError
+from .breaker import CircuitBreaker
+from .const import DEFAULT_VOLUME_SETTLE_TIME, DOMAIN
+from .wol import OpenctrolWaker, async_probe_port
+from .writer import TARGET_MASTER, OpenctrolVolumeWriter, device_target
+
+_LOGGER = logging.getLogger(__name__)
+
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Delay before re-reading an endpoint to confirm an optimistic update; audio
+# is not re-read while the volume writer still holds a value (settle time)
+CONFIRM_COOLDOWN = 1.0
+
+# Known power transitions after a power action
+POWER_RESTARTING = "restarting"
+POWER_SHUTTING_DOWN = "shutting_down"
+POWER_OFF = "off"
+
+# While restarting or shutting down, the agent port is probed this often
+TRANSITION_PROBE_INTERVAL = timedelta(seconds=2)
+# How long the agent may stay unreachable before the transition is abandoned
+RESTART_DOWNTIME_WINDOW = 300.0
+SHUTDOWN_WINDOW = 120.0
+
+ENDPOINT_MONITORS = "monitors"
+ENDPOINT_AUDIO = "audio"
+
+# Keys of the coordinator data owned by each confirmable endpoint
+_ENDPOINT_KEYS = {
+    ENDPOINT_MONITORS: ("monitors", "selected_monitor_id"),
+    ENDPOINT_AUDIO: ("audio",),
+}
+
+
+class OpenctrolDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+    """Class to manage fetching Openctrol data."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: OpenctrolApiClient,
+        volume_settle_time: float = DEFAULT_VOLUME_SETTLE_TIME,
+        mac_address: Optional[str] = None,
+        on_mac_learned: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Initialize."""
+        super().__init__(
+            hass,
+            logger=_LOGGER,
+            name=DOMAIN,
+            update_interval=SCAN_INTERVAL,
+        )
+        self.client = client
+        self.volume_writer = OpenctrolVolumeWriter(hass, volume_settle_time)
+        self.waker = OpenctrolWaker(
+            hass,
+            client.host,
+            client.port,
+            self._async_agent_port_open,
+            mac=mac_address,
+            on_mac_learned=on_mac_learned,
+        )
+        self._remove_waker_listener = self.waker.add_listener(self.async_update_listeners)
+        self._power_state: Optional[str] = None
+        self._transition_deadline = 0.0
+        self._agent_went_down = False
+        self._expected: Dict[str, Dict[str, Any]] = {}
+        self._confirm_debouncers: Dict[str, Debouncer] = {
+            endpoint: Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=CONFIRM_COOLDOWN,
+                immediate=False,
+                function=self._confirm_function(endpoint),
+            )
+            for endpoint in _ENDPOINT_KEYS
+        }
+        self._remove_breaker_listener = (
+            client.breaker.add_listener(self._handle_breaker_change)
+            if client.breaker is not None
+            else None
+        )
+
+    @property
+    def breaker(self) -> Optional[CircuitBreaker]:
+        """Return the agent's circuit breaker."""
+        return self.client.breaker
+
+    @callback
+    def _handle_breaker_change(self) -> None:
+        """Let entities pick up circuit breaker state changes right away."""
+        self.async_update_listeners()
+
+    @property
+    def power_state(self) -> Optional[str]:
+        """Return the power transition being followed, if any."""
+        return self._power_state
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Fetch data, or follow a power transition with cheap port probes."""
+        if self._power_state is not None and not await self._async_track_power_state():
+            return self.data
+        data = await self._async_fetch_all()
+        if self._power_state is not None:
+            _LOGGER.info("Agent %s is back after %s", self.client.host, self._power_state)
+            self._async_end_transition()
+        return data
+
+    async def _async_fetch_all(self) -> Dict[str, Any]:
+        """Fetch data from Openctrol API."""
+        data: Dict[str, Any] = {}
+
+        # Fetch health status (required)
+        try:
+            health_data = await self.client.async_get_health()
+            data.update(health_data)
+        except OpenctrolApiError as err:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        # Fetch monitors (optional - don't fail if unavailable)
+        try:
+            data.update(await self._async_fetch_monitors())
+        except Exception as err:
+            _LOGGER.debug("Failed to fetch monitors: %s", err)
+            data["monitors"] = []
+            data["selected_monitor_id"] = ""
+
+        # Fetch audio status (optional - don't fail if unavailable)
+        try:
+            data.update(await self._async_fetch_audio())
+        except Exception as err:
+            _LOGGER.debug("Failed to fetch audio status: %s", err)
+            data["audio"] = {}
+
+        # The agent just answered, so its MAC should be in the ARP table
+        self.waker.async_schedule_learn()
+
+        return data
+
+    async def _async_fetch_monitors(self) -> Dict[str, Any]:
+        """Fetch and normalize the monitor list and current selection."""
+        monitors_data = await self.client.async_get_monitors()
+        # API returns {"Monitors": [...], "CurrentMonitorId": "..."}
+        monitors_raw = monitors_data.get("Monitors") or monitors_data.get("monitors", [])
+        return {
+            # Normalize monitor data to snake_case for consistency
+            "monitors": [
+                {
+                    "id": m.get("Id") or m.get("id", ""),
+                    "name": m.get("Name") or m.get("name", ""),
+                    "width": m.get("Width") or m.get("width", 0),
+                    "height": m.get("Height") or m.get("height", 0),
+                    "is_primary": m.get("IsPrimary") or m.get("isPrimary") or m.get("is_primary", False),
+                }
+                for m in monitors_raw
+            ],
+            "selected_monitor_id": (
+                monitors_data.get("CurrentMonitorId")
+                or monitors_data.get("currentMonitorId")
+                or monitors_data.get("current_monitor_id")
+                or monitors_data.get("selected_monitor_id", "")
+            ),
+        }
+
+    async def _async_fetch_audio(self) -> Dict[str, Any]:
+        """Fetch the audio status."""
+        return {"audio": await self.client.async_get_audio_status()}
+
+    async def async_power_action(self, action: str, force: Optional[bool] = None) -> None:
+        """Run a power action and follow the transition it starts.
+
+        Restart and shutdown switch polling to short TCP probes right away,
+        so the status shows the transition instead of a run of failed polls.
+        """
+        await self.client.async_power_action(action, force)
+        if action == "restart":
+            self._async_begin_transition(POWER_RESTARTING, RESTART_DOWNTIME_WINDOW)
+        elif action == "shutdown":
+            self._async_begin_transition(POWER_SHUTTING_DOWN, SHUTDOWN_WINDOW)
+        else:
+            return
+        await self.async_request_refresh()
+
+    @callback
+    def _async_begin_transition(self, state: str, window: float) -> None:
+        """Start following a power transition."""
+        self._power_state = state
+        self._transition_deadline = time.monotonic() + window
+        self._agent_went_down = False
+        self.update_interval = TRANSITION_PROBE_INTERVAL
+        self.async_update_listeners()
+
+    @callback
+    def _async_end_transition(self) -> None:
+        """Return to regular polling."""
+        self._power_state = None
+        self.update_interval = SCAN_INTERVAL
+
+    async def _async_track_power_state(self) -> bool:
+        """Probe the agent port during a power transition.
+
+        Returns True when a full poll should run. While the agent is still
+        going down the current data is kept; once it is gone polls fail
+        quietly. A shut down agent stays parked on a probe every
+        SCAN_INTERVAL until its port answers again.
+        """
+        reachable = await async_probe_port(self.client.host, self.client.port)
+        if self._power_state == POWER_OFF:
+            if not reachable:
+                raise UpdateFailed("Agent is shut down")
+            _LOGGER.info("Agent %s is reachable again after shutdown", self.client.host)
+            self._async_end_transition()
+            return True
+
+        if time.monotonic() > self._transition_deadline:
+            _LOGGER.warning(
+                "Agent %s did not finish %s within the expected window, resuming regular polling",
+                self.client.host,
+                self._power_state,
+            )
+            self._async_end_transition()
+            return True
+
+        if reachable:
+            if not self._agent_went_down:
+                # The agent has not stopped yet
+                return False
+            # Back after a restart; the port answering is enough to stop failing fast
+            if self.breaker is not None:
+                self.breaker.record_success()
+            return True
+
+        self._agent_went_down = True
+        if self._power_state == POWER_SHUTTING_DOWN:
+            self._power_state = POWER_OFF
+            self.update_interval = SCAN_INTERVAL
+        raise UpdateFailed(f"Agent is down ({self._power_state})")
+
+    async def async_wake(self) -> None:
+        """Wake the agent's PC and flip online as soon as the agent answers.
+
+        Raises OpenctrolWakeError when the MAC address is unknown or the
+        packet cannot be sent.
+        """
+        # Already online: the packet is harmless, but there is nothing to time
+        await self.waker.async_wake(probe=not (self.last_update_success and self.data))
+
+    async def _async_agent_port_open(self) -> bool:
+        """Refresh right away once the wake probe reaches the agent port."""
+        # A TCP connect succeeded, so stop failing calls fast
+        if self.breaker is not None:
+            self.breaker.record_success()
+        await self.async_refresh()
+        return self.last_update_success
+
+    def _confirm_function(self, endpoint: str) -> Callable[[], Awaitable[None]]:
+        """Build the debounced confirmation callback for one endpoint."""
+
+        async def _async_confirm() -> None:
+            await self._async_confirm_endpoint(endpoint)
+
+        return _async_confirm
+
+    async def _async_confirm_endpoint(self, endpoint: str) -> None:
+        """Re-fetch a single endpoint and replace the optimistic values with it."""
+        if endpoint == ENDPOINT_AUDIO and self.volume_writer.busy:
+            # A newer value is still waiting out the settle time; reading now
+            # would undo it mid-drag. Its caller confirms once it is written.
+            return
+        expected = self._expected.pop(endpoint, None)
+        if self.data is None:
+            return
+        try:
+            if endpoint == ENDPOINT_MONITORS:
+                fresh = await self._async_fetch_monitors()
+            else:
+                fresh = await self._async_fetch_audio()
+        except Exception as err:
+            # Keep the optimistic state, the next regular poll will settle it
+            _LOGGER.debug("Confirmation refresh of %s failed: %s", endpoint, err)
+            return
+
+        if expected is not None and expected != fresh:
+            _LOGGER.debug(
+                "Agent state for %s disagrees with optimistic update, rolling back to reported state",
+                endpoint,
+            )
+        data = dict(self.data)
+        data.update(fresh)
+        self.async_set_updated_data(data)
+
+    async def _async_apply_action(
+        self,
+        endpoint: str,
+        apply: Callable[[Dict[str, Any]], None],
+        action: Callable[[], Awaitable[None]],
+    ) -> None:
+        """Apply the expected result of an action right away and confirm it later.
+
+        The optimistic data is published before the request is sent. One
+        debounced refresh of the affected endpoint confirms (or rolls back)
+        the change. If the request fails, see `_async_roll_back`.
+        """
+        previous = self.data if self.last_update_success else None
+        expected: Optional[Dict[str, Any]] = None
+        # Whether the endpoint's values before this call came from the agent
+        confirmed = endpoint not in self._expected
+        if previous is not None:
+            optimistic = copy.deepcopy(previous)
+            apply(optimistic)
+            self.async_set_updated_data(optimistic)
+            expected = {key: optimistic.get(key) for key in _ENDPOINT_KEYS[endpoint]}
+            self._expected[endpoint] = expected
+
+        try:
+            await action()
+        except Exception:
+            if previous is not None and expected is not None:
+                await self._async_roll_back(endpoint, previous, expected, confirmed)
+            raise
+
+        await self._confirm_debouncers[endpoint].async_call()
+
+    async def _async_roll_back(
+        self,
+        endpoint: str,
+        previous: Dict[str, Any],
+        expected: Dict[str, Any],
+        confirmed: bool,
+    ) -> None:
+        """Undo a failed action's optimistic values for its endpoint only.
+
+        The endpoint's keys are put back only while they still hold this
+        call's values and the ones replaced came from the agent. Otherwise a
+        poll, a confirmation or a later call has published newer data, or
+        the previous values were themselves optimistic (e.g. slider values
+        collapsed into the same failed write), so the endpoint is re-read.
+        """
+        current = self.data or {}
+        if self._expected.get(endpoint) is expected:
+            self._expected.pop(endpoint)
+        if confirmed and all(current.get(key) is value for key, value in expected.items()):
+            data = dict(current)
+            data.update({key: previous.get(key) for key in expected})
+            self.async_set_updated_data(data)
+            return
+        await self._confirm_debouncers[endpoint].async_call()
+
+    async def async_select_monitor(self, monitor_id: str) -> None:
+        """Select a monitor and reflect the selection immediately."""
+
+        def _apply(data: Dict[str, Any]) -> None:
+            data["selected_monitor_id"] = monitor_id
+
+        await self._async_apply_action(
+            ENDPOINT_MONITORS, _apply, lambda: self.client.async_select_monitor(monitor_id)
+        )
+
+    async def async_set_master_volume(
+        self, volume: Optional[int] = None, muted: Optional[bool] = None
+    ) -> None:
+        """Set master volume and/or mute and reflect it immediately."""
+
+        def _apply(data: Dict[str, Any]) -> None:
+            audio = data.setdefault("audio", {})
+            master = audio.setdefault("master", {})
+            if volume is not None:
+                master["volume"] = float(volume)
+            if muted is not None:
+                master["muted"] = muted
+            # The master volume is the default device's volume on the agent
+            for device in audio.get("devices") or []:
+                if device.get("isDefault") or device.get("is_default"):
+                    _apply_volume(device, volume, muted)
+
+        await self._async_apply_action(
+            ENDPOINT_AUDIO,
+            _apply,
+            lambda: self.volume_writer.async_write(
+                TARGET_MASTER,
+                _volume_values(volume, muted),
+                lambda values: self.client.async_set_master_volume(
+                    values.get("volume"), values.get("muted")
+                ),
+            ),
+        )
+
+    async def async_set_device_volume(
+        self,
+        device_id: str,
+        volume: Optional[int] = None,
+        muted: Optional[bool] = None,
+    ) -> None:
+        """Set a device's volume and/or mute and reflect it immediately."""
+
+        def _apply(data: Dict[str, Any]) -> None:
+            audio = data.get("audio") or {}
+            for device in audio.get("devices") or []:
+                if (device.get("id") or device.get("Id")) != device_id:
+                    continue
+                _apply_volume(device, volume, muted)
+                if (device.get("isDefault") or device.get("is_default")) and "master" in audio:
+                    _apply_volume(audio["master"], volume, muted)
+
+        await self._async_apply_action(
+            ENDPOINT_AUDIO,
+            _apply,
+            lambda: self.volume_writer.async_write(
+                device_target(device_id),
+                _volume_values(volume, muted),
+                lambda values: self.client.async_set_device_volume(
+                    device_id, values.get("volume"), values.get("muted")
+                ),
+            ),
+        )
+
+    async def async_set_default_output_device(self, device_id: str) -> None:
+        """Set the default output device and reflect it immediately."""
+
+        def _apply(data: Dict[str, Any]) -> None:
+            audio = data.get("audio") or {}
+            for device in audio.get("devices") or []:
+                is_default = (device.get("id") or device.get("Id")) == device_id
+                device["isDefault"] = is_default
+                if is_default and "master" in audio:
+                    audio["master"]["volume"] = device.get("volume", audio["master"].get("volume"))
+                    audio["master"]["muted"] = device.get("muted", audio["master"].get("muted"))
+
+        await self._async_apply_action(
+            ENDPOINT_AUDIO,
+            _apply,
+            lambda: self.client.async_set_default_output_device(device_id),
+        )
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending volume writes, confirmation refreshes and wake probes."""
+        await super().async_shutdown()
+        if self._remove_breaker_listener is not None:
+            self._remove_breaker_listener()
+        self._remove_waker_listener()
+        self.waker.async_cancel()
+        self.volume_writer.async_cancel()
+        for debouncer in self._confirm_debouncers.values():
+            debouncer.async_cancel()
+
+
+def _apply_volume(target: Dict[str, Any], volume: Optional[int], muted: Optional[bool]) -> None:
+    """Write volume/mute into an audio dict from the agent."""
+    if volume is not None:
+        target["volume"] = float(volume)
+    if muted is not None:
+        target["muted"] = muted
+
+
+def _volume_values(volume: Optional[int], muted: Optional[bool]) -> Dict[str, Any]:
+    """Return only the volume fields being changed."""
+    values: Dict[str, Any] = {}
+    if volume is not None:
+        values["volume"] = volume
+    if muted is not None:
+        values["muted"] = muted
+    return values
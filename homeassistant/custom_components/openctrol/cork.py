@@ -0,0 +1,104 @@
+"""Write coalescing for the Openctrol input WebSocket.
+
+aiohttp writes every WebSocket frame to the transport on its own, which
+is one `send()` syscall and usually one TCP segment per input event. The
+corked transport collects the frames written during one event loop
+iteration and passes them to the real transport as a single write at the
+end of it. Frames are untouched, so the agent receives the same messages.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CorkStats:
+    """Frames queued and transport writes made, across reconnects."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.frames = 0
+        self.writes = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return write counters for diagnostics."""
+        return {
+            "frames": self.frames,
+            "transport_writes": self.writes,
+            "frames_per_write": round(self.frames / self.writes, 2) if self.writes else 0.0,
+        }
+
+
+class CorkedTransport:
+    """Transport proxy that merges the writes of one loop iteration."""
+
+    def __init__(
+        self,
+        transport: asyncio.Transport,
+        loop: asyncio.AbstractEventLoop,
+        stats: Optional[CorkStats] = None,
+    ) -> None:
+        """Wrap `transport`; everything except writes is passed through."""
+        self._transport = transport
+        self._loop = loop
+        self._chunks: List[bytes] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self.stats = stats or CorkStats()
+
+    def write(self, data: Any) -> None:
+        """Buffer `data` until the end of the current loop iteration."""
+        self._chunks.append(bytes(data))
+        self.stats.frames += 1
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_soon(self.flush)
+
+    def writelines(self, list_of_data: Any) -> None:
+        """Buffer several chunks."""
+        for data in list_of_data:
+            self.write(data)
+
+    def flush(self) -> None:
+        """Hand buffered frames to the transport as one write."""
+        self._flush_handle = None
+        if not self._chunks:
+            return
+        data = b"".join(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+        self._chunks.clear()
+        if self._transport.is_closing():
+            return
+        self._transport.write(data)
+        self.stats.writes += 1
+
+    def close(self) -> None:
+        """Flush pending frames and close the transport."""
+        self.flush()
+        self._transport.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._transport, name)
+
+
+def cork_websocket(
+    ws: aiohttp.ClientWebSocketResponse,
+    loop: asyncio.AbstractEventLoop,
+    stats: Optional[CorkStats] = None,
+) -> Optional[CorkedTransport]:
+    """Route a WebSocket's frame writes through a `CorkedTransport`.
+
+    Relies on aiohttp's WebSocket writer keeping its transport in
+    `_writer.transport`; returns None (writes stay uncorked) if it does not.
+    """
+    writer = getattr(ws, "_writer", None)
+    transport = getattr(writer, "transport", None)
+    if transport is None or not hasattr(transport, "write"):
+        _LOGGER.debug("WebSocket writer layout not recognized; write coalescing disabled")
+        return None
+    if isinstance(transport, CorkedTransport):
+        return transport
+    corked = CorkedTransport(transport, loop, stats)
+    writer.transport = corked
+    return corked
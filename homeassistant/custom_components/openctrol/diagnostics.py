@@ -0,0 +1,50 @@
+"""Diagnostics support for Openctrol integration."""
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, CONF_MAC_ADDRESS, DATA_CONNECTIONS, DOMAIN
+
+TO_REDACT = {CONF_API_KEY, CONF_MAC_ADDRESS, "websocket_url", "token"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    coordinator = entry_data.get("coordinator")
+
+    diagnostics: Dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+    }
+    if coordinator is not None:
+        diagnostics["coordinator"] = {
+            "last_update_success": coordinator.last_update_success,
+            "power_state": coordinator.power_state,
+            "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+        }
+        diagnostics["volume_writer"] = coordinator.volume_writer.stats
+        diagnostics["api_client"] = {
+            "requests_shared": coordinator.client.requests_shared,
+            "cache_hits": coordinator.client.cache_hits,
+        }
+        if coordinator.client.connection_stats is not None:
+            diagnostics["connection"] = coordinator.client.connection_stats.as_dict()
+        if coordinator.breaker is not None:
+            diagnostics["circuit_breaker"] = coordinator.breaker.as_dict()
+        diagnostics["wake"] = coordinator.waker.as_dict()
+    ws_client = entry_data.get("ws_client")
+    if ws_client is not None:
+        diagnostics["websocket"] = ws_client.as_dict()
+    connections = hass.data.get(DATA_CONNECTIONS)
+    if connections is not None and (connection := connections.get(entry.entry_id)):
+        diagnostics["shared_connection"] = connection.as_dict()
+
+    return diagnostics
@@ -0,0 +1,85 @@
+"""Base entity for Openctrol integration."""
+
+from typing import Any, Dict, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC, DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import OpenctrolDataUpdateCoordinator
+
+_UNSET = object()
+
+
+class OpenctrolEntity(CoordinatorEntity[OpenctrolDataUpdateCoordinator]):
+    """Base class for Openctrol entities.
+
+    Each entity reads a small slice of the coordinator data and only writes
+    its state when that slice changes, so a volume change does not rewrite
+    the monitor select or the power buttons.
+    """
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        name: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._entry = entry
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_name = f"{entry.title} {name}"
+        self._last_slice: Any = _UNSET
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info so all entities of one agent are grouped."""
+        data = self.coordinator.data or {}
+        mac = self.coordinator.waker.mac
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._entry.entry_id)},
+            connections={(CONNECTION_NETWORK_MAC, mac)} if mac else set(),
+            name=self._entry.title,
+            manufacturer="Openctrol",
+            model="Openctrol Agent",
+            sw_version=data.get("version"),
+        )
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Return the current coordinator data (empty when unavailable)."""
+        return self.coordinator.data or {}
+
+    def _data_slice(self) -> Any:
+        """Return the part of the coordinator data this entity depends on.
+
+        Subclasses return plain values or tuples so that the comparison in
+        `_handle_coordinator_update` does not depend on object identity.
+        """
+        return None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this entity's slice of data changed."""
+        current = (self.coordinator.last_update_success, self._data_slice())
+        if current == self._last_slice:
+            return
+        self._last_slice = current
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the initial slice when added."""
+        await super().async_added_to_hass()
+        self._last_slice = (self.coordinator.last_update_success, self._data_slice())
+
+
+def find_audio_device(data: Dict[str, Any], device_id: str) -> Optional[Dict[str, Any]]:
+    """Return the audio device with the given id from coordinator data."""
+    for device in (data.get("audio") or {}).get("devices") or []:
+        if isinstance(device, dict) and (device.get("id") or device.get("Id")) == device_id:
+            return device
+    return None
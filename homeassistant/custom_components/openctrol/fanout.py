@@ -0,0 +1,315 @@
+"""Run Openctrol services against every agent they target.
+
+A service call may name entities, devices, areas or labels. They are
+resolved to config entries, and the per-agent operation runs for all of
+them concurrently, with a cap on parallel agents and a timeout per agent.
+Operations that take a known, longer time (input sequences) extend their
+own timeout with `async_extend_target_timeout`.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Set
+
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import Event, HomeAssistant, ServiceCall, ServiceResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .const import DATA_ENTITY_MAP, DOMAIN
+from .latency import dispatch_started
+
+_LOGGER = logging.getLogger(__name__)
+
+FANOUT_CONCURRENCY = 8
+# Longer than the REST timeout so a slow agent reports its own error first
+FANOUT_TARGET_TIMEOUT = 15.0
+
+TargetOperation = Callable[[ServiceCall, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+# The timeout of the per-agent operation running in the current task
+_target_timeout: contextvars.ContextVar[Optional[asyncio.Timeout]] = contextvars.ContextVar(
+    "openctrol_target_timeout", default=None
+)
+
+# Target keys that need the full registry expansion
+_EXPANDED_TARGET_KEYS = frozenset({ATTR_AREA_ID, "floor_id", "label_id"})
+
+
+class OpenctrolEntityMap:
+    """Map of entity_id to config entry id for all loaded Openctrol entries.
+
+    Built on first use and dropped on entry load/unload and on entity
+    registry changes to Openctrol entities, so plain entity_id targets
+    resolve with one dict lookup.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the map and listen for registry changes."""
+        self._hass = hass
+        self._entities: Optional[Dict[str, str]] = None
+        self.rebuilds = 0
+        self._unsub = hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_handle_registry_update
+        )
+
+    @callback
+    def _async_handle_registry_update(self, event: Event) -> None:
+        """Drop the map when one of its entities, or a new Openctrol one, changes."""
+        if self._entities is None:
+            return
+        entity_id = event.data["entity_id"]
+        if entity_id in self._entities or event.data.get("old_entity_id") in self._entities:
+            self.async_invalidate()
+            return
+        # Created, or moved to an Openctrol entry; other integrations' changes are ignored
+        entity_entry = er.async_get(self._hass).async_get(entity_id)
+        if entity_entry is not None and entity_entry.platform == DOMAIN:
+            self.async_invalidate()
+
+    @callback
+    def async_invalidate(self) -> None:
+        """Drop the map; the next lookup rebuilds it."""
+        self._entities = None
+
+    @callback
+    def async_lookup(self, entity_id: str) -> Optional[str]:
+        """Return the config entry id owning `entity_id`, if it is loaded."""
+        if self._entities is None:
+            registry = er.async_get(self._hass)
+            self._entities = {
+                entity_entry.entity_id: entry_id
+                for entry_id in self._hass.data.get(DOMAIN, {})
+                for entity_entry in er.async_entries_for_config_entry(registry, entry_id)
+            }
+            self.rebuilds += 1
+        return self._entities.get(entity_id)
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening for registry changes."""
+        self._unsub()
+        self._entities = None
+
+
+@callback
+def async_extend_target_timeout(seconds: float) -> None:
+    """Let the running per-agent operation take at least `seconds` more.
+
+    Does nothing outside a fan-out, and never shortens the timeout.
+    """
+    timeout = _target_timeout.get()
+    if timeout is None or (when := timeout.when()) is None:
+        return
+    timeout.reschedule(max(when, asyncio.get_running_loop().time() + seconds))
+
+
+@callback
+def _async_lookup_entity_targets(
+    hass: HomeAssistant, call: ServiceCall, device_targets: bool
+) -> Optional[List[str]]:
+    """Resolve a call that only names entities through the cached map.
+
+    Returns None when the call needs the full target expansion.
+    """
+    entity_map: Optional[OpenctrolEntityMap] = hass.data.get(DATA_ENTITY_MAP)
+    if entity_map is None or not _EXPANDED_TARGET_KEYS.isdisjoint(call.data):
+        return None
+    if device_targets and ATTR_DEVICE_ID in call.data:
+        return None
+    entity_ids = call.data.get(ATTR_ENTITY_ID)
+    if not entity_ids:
+        return None
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    entry_ids: Dict[str, None] = {}
+    for entity_id in entity_ids:
+        # Groups and unknown entities take the slow path
+        if (entry_id := entity_map.async_lookup(entity_id)) is None:
+            return None
+        entry_ids[entry_id] = None
+    return list(entry_ids)
+
+
+@callback
+def async_resolve_entry_ids(
+    hass: HomeAssistant, call: ServiceCall, device_targets: bool = True
+) -> List[str]:
+    """Return the Openctrol config entries targeted by a service call.
+
+    With `device_targets=False`, `device_id` in the call data is left to the
+    service (the audio services use it for the audio device).
+    """
+    if (entry_ids := _async_lookup_entity_targets(hass, call, device_targets)) is not None:
+        return entry_ids
+
+    if not device_targets and ATTR_DEVICE_ID in call.data:
+        return _async_match_entry_ids(hass, call.data)
+    selected = async_extract_referenced_entity_ids(hass, call)
+    loaded = hass.data.get(DOMAIN, {})
+    found: Dict[str, None] = {}
+
+    entity_registry = er.async_get(hass)
+    for entity_id in sorted(selected.referenced | selected.indirectly_referenced):
+        entity_entry = entity_registry.async_get(entity_id)
+        if entity_entry and entity_entry.config_entry_id in loaded:
+            found[entity_entry.config_entry_id] = None
+        elif entity_id in selected.referenced:
+            _LOGGER.warning("Entity %s does not belong to a loaded Openctrol agent", entity_id)
+
+    device_registry = dr.async_get(hass)
+    for device_id in sorted(selected.referenced_devices):
+        if device := device_registry.async_get(device_id):
+            for entry_id in device.config_entries:
+                if entry_id in loaded:
+                    found[entry_id] = None
+
+    return list(found)
+
+
+def _target_ids(value: Any) -> Set[str]:
+    """Return the ids of one target field (a list or a comma separated string)."""
+    if isinstance(value, str):
+        return {part.strip() for part in value.split(",") if part.strip()}
+    return {str(item) for item in value or ()}
+
+
+@callback
+def _async_group_members(hass: HomeAssistant, entity_ids: Set[str]) -> Set[str]:
+    """Return the entity ids with the members of any groups among them."""
+    expanded: Set[str] = set()
+    pending = list(entity_ids)
+    while pending:
+        if (entity_id := pending.pop()) in expanded:
+            continue
+        expanded.add(entity_id)
+        if entity_id.startswith("group.") and (state := hass.states.get(entity_id)):
+            pending.extend(state.attributes.get(ATTR_ENTITY_ID) or ())
+    return expanded
+
+
+@callback
+def _async_match_entry_ids(hass: HomeAssistant, data: Mapping[str, Any]) -> List[str]:
+    """Resolve entity, area, floor and label targets without `device_id`.
+
+    Used when `device_id` belongs to the service. The registries are matched
+    directly instead of through a ServiceCall copy, whose constructor
+    differs between Home Assistant versions.
+    """
+    loaded = hass.data.get(DOMAIN, {})
+    entity_ids = _async_group_members(hass, _target_ids(data.get(ATTR_ENTITY_ID)))
+    area_ids = _target_ids(data.get(ATTR_AREA_ID))
+    label_ids = _target_ids(data.get("label_id"))
+    if floor_ids := _target_ids(data.get("floor_id")):
+        area_ids |= {
+            area.id
+            for area in ar.async_get(hass).async_list_areas()
+            if getattr(area, "floor_id", None) in floor_ids
+        }
+
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+    found: Dict[str, None] = {}
+    matched: Set[str] = set()
+    for entry_id in loaded:
+        for entity_entry in er.async_entries_for_config_entry(entity_registry, entry_id):
+            device = (
+                device_registry.async_get(entity_entry.device_id) if entity_entry.device_id else None
+            )
+            area_id = entity_entry.area_id or (device.area_id if device else None)
+            labels = set(getattr(entity_entry, "labels", ()))
+            if device is not None:
+                labels.update(getattr(device, "labels", ()))
+            if entity_entry.entity_id in entity_ids:
+                matched.add(entity_entry.entity_id)
+            elif area_id not in area_ids and labels.isdisjoint(label_ids):
+                continue
+            found[entry_id] = None
+
+    for entity_id in sorted(entity_ids - matched):
+        if entity_id.startswith("group."):
+            continue
+        _LOGGER.warning("Entity %s does not belong to a loaded Openctrol agent", entity_id)
+    return list(found)
+
+
+async def async_fan_out(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    operation: TargetOperation,
+    device_targets: bool = True,
+    concurrency: int = FANOUT_CONCURRENCY,
+    timeout: float = FANOUT_TARGET_TIMEOUT,
+) -> ServiceResponse:
+    """Run `operation` for every targeted agent and collect the results.
+
+    Returns a response with one result per agent when the caller asked for
+    one. Otherwise any failure is raised; a single target raises its own
+    error unchanged.
+    """
+    # Input writes report how long they waited after this point
+    dispatch_started.set(time.monotonic())
+    entry_ids = async_resolve_entry_ids(hass, call, device_targets)
+    if not entry_ids:
+        entity_id = call.data.get(ATTR_ENTITY_ID)
+        if isinstance(entity_id, str):
+            raise HomeAssistantError(f"Could not find config entry for entity {entity_id}")
+        raise HomeAssistantError("No Openctrol agent matches the service target")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors: Dict[str, Exception] = {}
+
+    async def _async_run(entry_id: str) -> Dict[str, Any]:
+        entry_data = hass.data[DOMAIN][entry_id]
+        entry = hass.config_entries.async_get_entry(entry_id)
+        result: Dict[str, Any] = {
+            "entry_id": entry_id,
+            "name": entry.title if entry else entry_id,
+        }
+        data: Optional[Dict[str, Any]] = None
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(timeout) as target_timeout:
+                    _target_timeout.set(target_timeout)
+                    data = await operation(call, entry_data)
+            except TimeoutError:
+                errors[entry_id] = HomeAssistantError(
+                    f"{result['name']} did not respond in time"
+                )
+            except HomeAssistantError as err:
+                errors[entry_id] = err
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected error in %s for %s", call.service, result["name"])
+                errors[entry_id] = err
+            result["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+        result["success"] = entry_id not in errors
+        if entry_id in errors:
+            result["error"] = str(errors[entry_id])
+        elif data:
+            result.update(data)
+        return result
+
+    results = await asyncio.gather(*(_async_run(entry_id) for entry_id in entry_ids))
+
+    if call.return_response:
+        return {
+            "targets": results,
+            "succeeded": len(results) - len(errors),
+            "failed": len(errors),
+        }
+    if len(entry_ids) == 1 and errors:
+        raise errors[entry_ids[0]]
+    if errors:
+        raise HomeAssistantError(
+            f"{call.service} failed for {len(errors)} of {len(results)} Openctrol agents: "
+            + "; ".join(f"{result['name']}: {result['error']}" for result in results if not result["success"])
+        )
+    return None
@@ -0,0 +1,107 @@
+"""Pixel to normalized pointer coordinates for Openctrol agents.
+
+The agent takes absolute pointer moves as 0-65535 on both axes and maps
+them onto its currently selected monitor. Pixel positions are converted
+with the monitor sizes already known to the integration (coordinator
+data or the WebSocket hello), either on a named monitor or on the
+virtual desktop spanning all of them.
+
+The agent reports sizes but not positions, so unless a monitor carries
+`x`/`y` the layout is assumed to be left to right in the agent's order
+(DISPLAY1, DISPLAY2, ...), top-aligned.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+NORMALIZED_MAX = 65535
+# Monitor name for pixel positions on the virtual desktop
+VIRTUAL_DESKTOP = "desktop"
+
+
+class MonitorRect(NamedTuple):
+    """A monitor's bounds on the virtual desktop, in pixels."""
+
+    id: str
+    name: str
+    x: int
+    y: int
+    width: int
+    height: int
+    is_primary: bool
+
+
+def monitor_layout(monitors: Sequence[Dict[str, Any]]) -> List[MonitorRect]:
+    """Place the reported monitors on the virtual desktop."""
+    layout: List[MonitorRect] = []
+    next_x = 0
+    for monitor in monitors:
+        width, height = int(monitor.get("width") or 0), int(monitor.get("height") or 0)
+        if width <= 0 or height <= 0:
+            continue
+        x = int(monitor["x"]) if monitor.get("x") is not None else next_x
+        y = int(monitor["y"]) if monitor.get("y") is not None else 0
+        layout.append(
+            MonitorRect(
+                str(monitor.get("id", "")),
+                str(monitor.get("name", "")),
+                x,
+                y,
+                width,
+                height,
+                bool(monitor.get("is_primary")),
+            )
+        )
+        next_x = max(next_x, x + width)
+    return layout
+
+
+def default_monitor_id(layout: Sequence[MonitorRect]) -> str:
+    """Return the monitor the agent uses before one is selected."""
+    for rect in layout:
+        if rect.is_primary:
+            return rect.id
+    return layout[0].id if layout else ""
+
+
+def _find_monitor(layout: Sequence[MonitorRect], monitor: str) -> MonitorRect:
+    wanted = monitor.casefold()
+    for rect in layout:
+        if wanted in (rect.id.casefold(), rect.name.casefold()):
+            return rect
+    raise ValueError(f"Unknown monitor {monitor}")
+
+
+def pixels_to_normalized(
+    monitors: Sequence[Dict[str, Any]], x: float, y: float, monitor: str
+) -> Tuple[str, int, int]:
+    """Convert a pixel position to (monitor id, normalized x, normalized y).
+
+    `monitor` is a monitor id or name, with `x`/`y` relative to its top
+    left corner, or VIRTUAL_DESKTOP for a position on the whole desktop.
+    Each pixel maps to the normalized value of its centre, so the agent's
+    truncating conversion lands on the same pixel. Raises ValueError for
+    an unknown monitor or a position outside it.
+    """
+    layout = monitor_layout(monitors)
+    if not layout:
+        raise ValueError("Monitor sizes are not known yet")
+    if monitor.casefold() == VIRTUAL_DESKTOP:
+        desktop_x = x + min(rect.x for rect in layout)
+        desktop_y = y + min(rect.y for rect in layout)
+        for rect in layout:
+            if rect.x <= desktop_x < rect.x + rect.width and rect.y <= desktop_y < rect.y + rect.height:
+                target, x, y = rect, desktop_x - rect.x, desktop_y - rect.y
+                break
+        else:
+            raise ValueError(f"Position {x:g},{y:g} is not on any monitor")
+    else:
+        target = _find_monitor(layout, monitor)
+        if not (0 <= x < target.width and 0 <= y < target.height):
+            raise ValueError(
+                f"Position {x:g},{y:g} is outside {target.id} ({target.width}x{target.height})"
+            )
+    return (
+        target.id,
+        min(NORMALIZED_MAX, round((int(x) + 0.5) * NORMALIZED_MAX / target.width)),
+        min(NORMALIZED_MAX, round((int(y) + 0.5) * NORMALIZED_MAX / target.height)),
+    )
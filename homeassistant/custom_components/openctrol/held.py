@@ -0,0 +1,57 @@
+"""Tracking of keys and pointer buttons held down on an Openctrol agent.
+
+Windows keeps a key or button down until it sees the matching up event.
+If the connection drops between the two, the tracker still knows what is
+held, so the client can release it on the next connection. Only the
+pre-encoded `key` and `pointer_button` templates can press anything, so
+an input message is classified with one dictionary lookup.
+"""
+
+from typing import Dict, List, Sequence
+
+from .serialization import POINTER_BUTTONS, key_message, pointer_button_message
+
+# Down message -> its release
+_RELEASES: Dict[str, str] = {
+    **{
+        pointer_button_message(button, "down"): pointer_button_message(button, "up")
+        for button in POINTER_BUTTONS
+    },
+    # Virtual key codes are a single byte on Windows
+    **{key_message(key_code, "down"): key_message(key_code, "up") for key_code in range(0x100)},
+}
+_RELEASE_MESSAGES = frozenset(_RELEASES.values())
+
+
+class HeldInputTracker:
+    """Outstanding down events of one agent, in press order."""
+
+    def __init__(self) -> None:
+        """Initialize with nothing held."""
+        # Release message -> None; a dict keeps the press order
+        self._held: Dict[str, None] = {}
+        self.releases_sent = 0
+
+    def __len__(self) -> int:
+        """Return the number of keys and buttons held."""
+        return len(self._held)
+
+    def observe(self, messages: Sequence[str], delivered: bool = True) -> None:
+        """Update the held set from input messages written in order.
+
+        With `delivered=False` (the write failed part-way) every press is
+        assumed to have reached the agent and no release, so nothing is
+        forgotten that might still be down.
+        """
+        held = self._held
+        for message_json in messages:
+            if (release := _RELEASES.get(message_json)) is not None:
+                # A repeated press moves to the end, like the key itself
+                held.pop(release, None)
+                held[release] = None
+            elif delivered and message_json in _RELEASE_MESSAGES:
+                held.pop(message_json, None)
+
+    def releases(self) -> List[str]:
+        """Return the up events for everything held, last pressed first."""
+        return list(reversed(self._held))
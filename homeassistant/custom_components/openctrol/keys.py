@@ -0,0 +1,138 @@
+"""Key names and Windows virtual key codes for Openctrol keyboard input."""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .serialization import key_message, text_message
+
+VK_SHIFT = 0x10
+VK_CONTROL = 0x11
+VK_MENU = 0x12  # Alt
+VK_LWIN = 0x5B
+
+# Modifiers are pressed before and released after the other keys of a combo
+MODIFIER_KEY_CODES: Dict[str, int] = {
+    "CTRL": VK_CONTROL,
+    "CONTROL": VK_CONTROL,
+    "ALT": VK_MENU,
+    "SHIFT": VK_SHIFT,
+    "WIN": VK_LWIN,
+    "WINDOWS": VK_LWIN,
+}
+
+KEY_CODES: Dict[str, int] = {
+    "TAB": 0x09,
+    "ENTER": 0x0D,
+    "ESC": 0x1B,
+    "ESCAPE": 0x1B,
+    "SPACE": 0x20,
+    "BACKSPACE": 0x08,
+    "DEL": 0x2E,
+    "DELETE": 0x2E,
+    "INSERT": 0x2D,
+    "HOME": 0x24,
+    "END": 0x23,
+    "PAGEUP": 0x21,
+    "PAGEDOWN": 0x22,
+    "UP": 0x26,
+    "DOWN": 0x28,
+    "LEFT": 0x25,
+    "RIGHT": 0x27,
+    "F1": 0x70,
+    "F2": 0x71,
+    "F3": 0x72,
+    "F4": 0x73,
+    "F5": 0x74,
+    "F6": 0x75,
+    "F7": 0x76,
+    "F8": 0x77,
+    "F9": 0x78,
+    "F10": 0x79,
+    "F11": 0x7A,
+    "F12": 0x7B,
+    **MODIFIER_KEY_CODES,
+}
+
+
+def map_key_name_to_code(key_name: str) -> Optional[int]:
+    """Map a key name to its Windows virtual key code."""
+    key_upper = key_name.upper()
+
+    # Letters (A-Z) and digits (0-9) use their ASCII code
+    if len(key_upper) == 1 and (key_upper.isalpha() or key_upper.isdigit()) and key_upper.isascii():
+        return ord(key_upper)
+
+    return KEY_CODES.get(key_upper)
+
+
+def split_combo(keys: Iterable[str]) -> Tuple[List[int], List[int], List[str]]:
+    """Split combo key names into modifier codes, main key codes and unknown names."""
+    modifiers: List[int] = []
+    main_keys: List[int] = []
+    unknown: List[str] = []
+    for key in keys:
+        key_upper = key.upper()
+        if key_upper in MODIFIER_KEY_CODES:
+            modifiers.append(MODIFIER_KEY_CODES[key_upper])
+        elif (key_code := map_key_name_to_code(key)) is not None:
+            main_keys.append(key_code)
+        else:
+            unknown.append(key)
+    return modifiers, main_keys, unknown
+
+
+def combo_messages(modifiers: List[int], main_keys: List[int]) -> List[str]:
+    """Return the encoded key events of a combo.
+
+    Modifiers go down first, then the main keys; keys are released in
+    reverse order. Modifiers are sent as physical keys, so no modifier
+    flags are set on the other events (the agent would inject them twice).
+    """
+    pressed = modifiers + main_keys
+    return [key_message(key_code, "down") for key_code in pressed] + [
+        key_message(key_code, "up") for key_code in reversed(pressed)
+    ]
+
+
+# Characters typed with key events, as (virtual key code, needs Shift).
+# Only keys whose virtual key code types the same character on the common
+# Latin layouts are listed; punctuation moves between layouts (Shift+7 is
+# "/" on a German keyboard), so it and everything else is sent as text.
+CHARACTER_KEYS: Dict[str, Tuple[int, bool]] = {
+    " ": (0x20, False),
+    "\n": (0x0D, False),
+    "\t": (0x09, False),
+    **{chr(code).lower(): (code, False) for code in range(0x41, 0x5B)},
+    **{chr(code): (code, True) for code in range(0x41, 0x5B)},
+    **{str(digit): (0x30 + digit, False) for digit in range(10)},
+}
+
+
+def text_messages(text: str) -> List[List[str]]:
+    """Return the encoded events that type `text`, one list per character.
+
+    Shift is pressed once for a run of shifted characters and released
+    before the next unshifted one, so "HELLO" costs 12 events instead of 20.
+    A "\r\n" pair types a single Enter.
+    """
+    shift_up = key_message(VK_SHIFT, "up")
+    characters: List[List[str]] = []
+    shifted = False
+    for index, char in enumerate(text):
+        if char == "\r" and text[index + 1 : index + 2] == "\n":
+            continue
+        key = CHARACTER_KEYS.get("\n" if char == "\r" else char)
+        events: List[str] = []
+        needs_shift = key is not None and key[1]
+        if shifted and not needs_shift:
+            events.append(shift_up)
+        elif needs_shift and not shifted:
+            events.append(key_message(VK_SHIFT, "down"))
+        shifted = needs_shift
+        if key is None:
+            events.append(text_message(char))
+        else:
+            events += (key_message(key[0], "down"), key_message(key[0], "up"))
+        characters.append(events)
+    if shifted:
+        characters[-1].append(shift_up)
+    return characters
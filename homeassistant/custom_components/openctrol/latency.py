@@ -0,0 +1,154 @@
+"""Input latency histograms for Openctrol agents.
+
+Three latencies are tracked per agent:
+
+- rtt: WebSocket ping to pong (or app-level echo when the agent supports it)
+- queue_wait: Openctrol service dispatched to its first input write started
+- send: time spent handing one batch of input frames to the socket
+
+Histograms are HDR-style: exact below 64 µs, then 32 buckets per power of
+two, so every percentile is within about 3% of the true value at a fixed
+cost per sample. Samples older than one to two windows are dropped by
+rotating between two bucket arrays.
+"""
+
+import contextvars
+import time
+from array import array
+from typing import Any, Dict, Optional
+
+# When the current Openctrol service call was dispatched (time.monotonic),
+# set by the service fan-out and consumed by the first input write
+dispatch_started: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "openctrol_dispatch_started", default=None
+)
+
+
+
+def detach_dispatch() -> None:
+    """Forget the dispatch time in a task started from a service call.
+
+    Tasks copy the caller's context, so a long-lived task (pointer motion,
+    heartbeats, the receive loop) would otherwise record its own waiting
+    as the call's queue wait on its first write.
+    """
+    dispatch_started.set(None)
+
+
+LATENCY_WINDOW = 300.0  # seconds
+PERCENTILES = (50, 95, 99)
+
+_LINEAR = 64  # values below this (µs) have their own bucket
+_SUB_BUCKETS = 32  # buckets per power of two above it
+_MAX_US = 60_000_000  # larger samples are clamped to 60 s
+_SIZE = _LINEAR + (_MAX_US.bit_length() - 6) * _SUB_BUCKETS
+
+
+def _bucket(value_us: int) -> int:
+    """Return the bucket index for a value in microseconds."""
+    if value_us < _LINEAR:
+        return value_us
+    shift = value_us.bit_length() - 6
+    return _LINEAR + (shift - 1) * _SUB_BUCKETS + (value_us >> shift) - _SUB_BUCKETS
+
+
+def _bucket_value(index: int) -> int:
+    """Return the highest value (µs) that falls into bucket `index`."""
+    if index < _LINEAR:
+        return index
+    shift, sub = divmod(index - _LINEAR, _SUB_BUCKETS)
+    shift += 1
+    return ((sub + _SUB_BUCKETS + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Rolling histogram of latencies with percentile queries."""
+
+    def __init__(self, window: float = LATENCY_WINDOW) -> None:
+        """Initialize an empty histogram covering the last `window` seconds."""
+        self._window = window
+        self._current = array("L", bytes(_SIZE * array("L").itemsize))
+        self._previous = array("L", self._current)
+        self._rotated_at = time.monotonic()
+        self.total = 0
+
+    def record(self, seconds: float) -> None:
+        """Add one sample."""
+        self._maybe_rotate()
+        value_us = min(max(int(seconds * 1_000_000), 0), _MAX_US)
+        self._current[_bucket(value_us)] += 1
+        self.total += 1
+
+    def _maybe_rotate(self) -> None:
+        now = time.monotonic()
+        if now - self._rotated_at < self._window:
+            return
+        if now - self._rotated_at >= 2 * self._window:
+            # Idle for a whole window: both halves are stale
+            self._previous = array("L", bytes(len(self._current) * self._current.itemsize))
+        else:
+            self._previous = self._current
+        self._current = array("L", bytes(len(self._previous) * self._previous.itemsize))
+        self._rotated_at = now
+
+    @property
+    def count(self) -> int:
+        """Return the number of samples in the window."""
+        self._maybe_rotate()
+        return sum(self._current) + sum(self._previous)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return the `percent` percentile in milliseconds, or None without samples."""
+        self._maybe_rotate()
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = max(1, -(-total * percent // 100))
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                return _bucket_value(index) / 1000
+        return _bucket_value(_SIZE - 1) / 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return sample counts and percentiles in milliseconds."""
+        result: Dict[str, Any] = {"count": self.count, "total": self.total}
+        for percent in (*PERCENTILES, 100):
+            value = self.percentile(percent)
+            key = f"p{percent}_ms" if percent < 100 else "max_ms"
+            result[key] = round(value, 3) if value is not None else None
+        return result
+
+
+class InputLatency:
+    """Latency histograms of one agent's input connection."""
+
+    def __init__(self, window: float = LATENCY_WINDOW) -> None:
+        """Initialize the histograms."""
+        self.window = window
+        self.rtt = LatencyHistogram(window)
+        self.queue_wait = LatencyHistogram(window)
+        self.send = LatencyHistogram(window)
+        self.pings_sent = 0
+        self.pongs_received = 0
+
+    def record_write(self, started: float, finished: float) -> None:
+        """Record a write of input frames between two time.monotonic() stamps."""
+        self.send.record(finished - started)
+        if (dispatched := dispatch_started.get()) is not None:
+            # Only the first write of a service call waited in the queue
+            self.queue_wait.record(started - dispatched)
+            dispatch_started.set(None)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all histograms for diagnostics."""
+        return {
+            "window_s": self.window,
+            "pings_sent": self.pings_sent,
+            "pongs_received": self.pongs_received,
+            "rtt": self.rtt.as_dict(),
+            "queue_wait": self.queue_wait.as_dict(),
+            "send": self.send.as_dict(),
+        }
@@ -0,0 +1,124 @@
+"""Input macro recording and storage for Openctrol agents.
+
+A recording captures every input message written by one agent's
+WebSocket client, with its offset from the first event. Macros are kept
+in Home Assistant's storage, shared by all agents, and compiled once into
+a `CompiledSequence` of pre-encoded messages for replay.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .sequence import MAX_SEQUENCE_DURATION, CompiledSequence
+
+if TYPE_CHECKING:
+    from .ws import OpenctrolWsClient
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.macros"
+SAVE_DELAY = 1.0  # seconds
+
+MAX_MACRO_EVENTS = 10000
+
+
+class OpenctrolMacroRecorder:
+    """Records the input messages one WebSocket client writes."""
+
+    def __init__(self, name: str, ws_client: "OpenctrolWsClient") -> None:
+        """Start recording; call `stop` to detach from the client."""
+        self.name = name
+        self._loop = asyncio.get_running_loop()
+        self._start: Optional[float] = None
+        self.offsets: List[float] = []
+        self.messages: List[str] = []
+        self.dropped = 0
+        self._remove: Optional[Callable[[], None]] = ws_client.add_write_listener(self._record)
+
+    def _record(self, messages: Sequence[str]) -> None:
+        now = self._loop.time()
+        if self._start is None:
+            # Time before the first event is not part of the macro
+            self._start = now
+        offset = now - self._start
+        if len(self.messages) + len(messages) > MAX_MACRO_EVENTS or offset > MAX_SEQUENCE_DURATION:
+            self.dropped += len(messages)
+            return
+        for message_json in messages:
+            self.offsets.append(offset)
+            self.messages.append(message_json)
+
+    def stop(self) -> None:
+        """Stop recording."""
+        if self._remove is not None:
+            self._remove()
+            self._remove = None
+
+
+def compile_macro(macro: Dict[str, Any]) -> CompiledSequence:
+    """Compile a stored macro; events written together stay one burst."""
+    sequence = CompiledSequence()
+    for offset_ms, message_json in zip(macro["offsets"], macro["messages"]):
+        sequence.append(offset_ms / 1000, (message_json,))
+    sequence.steps = len(macro["messages"])
+    return sequence
+
+
+class OpenctrolMacroStore:
+    """Named macros shared by all Openctrol agents."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._macros: Dict[str, Dict[str, Any]] = {}
+        self._compiled: Dict[str, CompiledSequence] = {}
+
+    async def async_load(self) -> None:
+        """Load stored macros."""
+        data = await self._store.async_load()
+        self._macros = (data or {}).get("macros", {})
+
+    @property
+    def names(self) -> List[str]:
+        """Return the names of all macros."""
+        return sorted(self._macros)
+
+    def async_save_recording(self, recorder: OpenctrolMacroRecorder) -> Dict[str, Any]:
+        """Store a finished recording under its name; returns a summary."""
+        macro = {
+            "offsets": [round(offset * 1000, 1) for offset in recorder.offsets],
+            "messages": list(recorder.messages),
+            "created": dt_util.utcnow().isoformat(),
+        }
+        self._macros[recorder.name] = macro
+        self._compiled.pop(recorder.name, None)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        _LOGGER.debug("Saved macro %s with %d events", recorder.name, len(recorder.messages))
+        return {
+            "name": recorder.name,
+            "events": len(macro["messages"]),
+            "duration_ms": macro["offsets"][-1] if macro["offsets"] else 0.0,
+            "dropped": recorder.dropped,
+        }
+
+    def async_delete(self, name: str) -> None:
+        """Delete a macro; raises KeyError if it does not exist."""
+        del self._macros[name]
+        self._compiled.pop(name, None)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get_compiled(self, name: str) -> CompiledSequence:
+        """Return a macro compiled for replay; raises KeyError if unknown."""
+        if (sequence := self._compiled.get(name)) is None:
+            sequence = self._compiled[name] = compile_macro(self._macros[name])
+        return sequence
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {"macros": self._macros}
@@ -0,0 +1,99 @@
+"""Relative pointer motion shaping for Openctrol agents.
+
+Touchpads and joysticks report small fractional deltas many times a
+second. Rounding each one on its own loses the fractions, so slow motion
+drifts and stutters. `PointerMotion` adds the deltas up as floats and
+emits one `pointer_move` per tick with the whole pixels, carrying the
+remainder to the next tick. On top of that it can apply:
+
+- acceleration: a gain that grows with pointer speed, capped at
+  `MAX_GAIN`; 0 keeps motion linear
+- smoothing: the share of this tick's motion held back to the next tick
+  while input keeps coming; it is all emitted on the first quiet tick
+
+Nothing is lost: the pixels emitted always add up to the accelerated
+input, give or take the carried fraction.
+"""
+
+import math
+import time
+from typing import Any, Dict, Optional
+
+from .serialization import pointer_move_message
+
+# About one display refresh; touch input usually arrives faster than this
+MOTION_INTERVAL = 1 / 60  # seconds
+# Speed (pixels per second) at which the gain is 1 + acceleration
+ACCELERATION_SPEED = 1000.0
+MAX_GAIN = 4.0
+
+
+class PointerMotion:
+    """Accumulated relative motion of one agent's pointer."""
+
+    def __init__(self, acceleration: float = 0.0, smoothing: float = 0.0) -> None:
+        """Initialize with nothing pending."""
+        self.acceleration = acceleration
+        self.smoothing = smoothing
+        self._x = 0.0
+        self._y = 0.0
+        self._last_added: Optional[float] = None
+        self._added_since_take = False
+        self.moves_in = 0
+        self.moves_out = 0
+
+    @property
+    def pending(self) -> bool:
+        """Return True while at least one whole pixel is waiting to be emitted."""
+        return abs(round(self._x, 6)) >= 1 or abs(round(self._y, 6)) >= 1
+
+    def add(self, dx: float, dy: float) -> None:
+        """Add a relative move, applying the acceleration curve."""
+        now = time.monotonic()
+        gain = 1.0
+        if self.acceleration > 0:
+            elapsed = MOTION_INTERVAL
+            if self._last_added is not None:
+                elapsed = max(now - self._last_added, MOTION_INTERVAL)
+            speed = math.hypot(dx, dy) / elapsed
+            gain = min(1.0 + self.acceleration * speed / ACCELERATION_SPEED, MAX_GAIN)
+        self._last_added = now
+        self._x += dx * gain
+        self._y += dy * gain
+        self._added_since_take = True
+        self.moves_in += 1
+
+    def take(self, settle: bool = False) -> Optional[str]:
+        """Return the move to emit this tick, or None if under a pixel.
+
+        With `settle`, all whole pixels are emitted without smoothing, so
+        other input written right after lands where the pointer should be.
+        """
+        share = 1.0
+        if self._added_since_take and not settle:
+            share -= self.smoothing
+        self._added_since_take = False
+        # Rounded first so 10 x 0.3 is 3 pixels, not 2.9999...
+        dx = math.trunc(round(self._x * share, 6))
+        dy = math.trunc(round(self._y * share, 6))
+        if not dx and not dy:
+            return None
+        self._x -= dx
+        self._y -= dy
+        self.moves_out += 1
+        return pointer_move_message(dx, dy)
+
+    def reset(self) -> None:
+        """Drop pending motion, e.g. when it could not be delivered."""
+        self._x = self._y = 0.0
+        self._last_added = None
+        self._added_since_take = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return settings and counters for diagnostics."""
+        return {
+            "acceleration": self.acceleration,
+            "smoothing": self.smoothing,
+            "moves_in": self.moves_in,
+            "moves_out": self.moves_out,
+        }
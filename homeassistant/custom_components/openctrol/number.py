@@ -0,0 +1,156 @@
+"""Number platform for Openctrol integration."""
+
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .api import OpenctrolApiError
+from .const import DOMAIN
+from .coordinator import OpenctrolDataUpdateCoordinator
+from .entity import OpenctrolEntity, find_audio_device
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Openctrol number platform."""
+    coordinator: OpenctrolDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    known_devices: Set[str] = set()
+
+    @callback
+    def _async_add_new_devices() -> None:
+        """Add a volume entity for every audio device not seen before."""
+        new_entities = []
+        for device in ((coordinator.data or {}).get("audio") or {}).get("devices") or []:
+            device_id = device.get("id") or device.get("Id")
+            if not device_id or device_id in known_devices:
+                continue
+            known_devices.add(device_id)
+            new_entities.append(
+                OpenctrolDeviceVolumeNumber(
+                    coordinator, entry, device_id, device.get("name") or device.get("Name") or device_id
+                )
+            )
+        if new_entities:
+            async_add_entities(new_entities)
+
+    async_add_entities([OpenctrolMasterVolumeNumber(coordinator, entry)])
+    _async_add_new_devices()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_devices))
+
+
+# Returns the dict holding `volume` (and `muted`) from coordinator data
+VolumeSource = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class OpenctrolVolumeNumber(OpenctrolEntity, NumberEntity):
+    """Base class for volume numbers (0-100%)."""
+
+    _attr_native_min_value = 0
+    _attr_native_max_value = 100
+    _attr_native_step = 1
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_mode = NumberMode.SLIDER
+    _attr_icon = "mdi:volume-high"
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        key: str,
+        name: str,
+        volume_source: VolumeSource,
+    ) -> None:
+        """Initialize the number with the accessor for its volume."""
+        super().__init__(coordinator, entry, key, name)
+        self._get_volume_source = volume_source
+
+    def _volume_source(self) -> Optional[Dict[str, Any]]:
+        """Return the dict holding `volume` for this entity."""
+        return self._get_volume_source(self.data)
+
+    def _data_slice(self) -> Any:
+        """Only the volume and mute flag drive state writes."""
+        return (self.native_value, self.extra_state_attributes)
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the current volume."""
+        source = self._volume_source()
+        if source is None or source.get("volume") is None:
+            return None
+        return round(float(source["volume"]))
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Expose the mute state next to the volume."""
+        source = self._volume_source() or {}
+        return {"muted": bool(source.get("muted", False))}
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.last_update_success and self._volume_source() is not None
+
+
+class OpenctrolMasterVolumeNumber(OpenctrolVolumeNumber):
+    """Master volume of the agent's default output device."""
+
+    def __init__(
+        self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the number."""
+        super().__init__(
+            coordinator,
+            entry,
+            "master_volume",
+            "Master Volume",
+            lambda data: (data.get("audio") or {}).get("master"),
+        )
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the master volume."""
+        try:
+            await self.coordinator.async_set_master_volume(int(value))
+        except OpenctrolApiError as err:
+            _LOGGER.error("Set master volume failed: %s", err, exc_info=True)
+            raise HomeAssistantError(f"Set master volume failed: {err}") from err
+
+
+class OpenctrolDeviceVolumeNumber(OpenctrolVolumeNumber):
+    """Volume of a single audio output device."""
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        device_id: str,
+        device_name: str,
+    ) -> None:
+        """Initialize the number."""
+        super().__init__(
+            coordinator,
+            entry,
+            f"volume_{device_id}",
+            f"{device_name} Volume",
+            lambda data: find_audio_device(data, device_id),
+        )
+        self._device_id = device_id
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the device volume."""
+        try:
+            await self.coordinator.async_set_device_volume(self._device_id, int(value))
+        except OpenctrolApiError as err:
+            _LOGGER.error("Set device volume failed: %s", err, exc_info=True)
+            raise HomeAssistantError(f"Set device volume failed: {err}") from err
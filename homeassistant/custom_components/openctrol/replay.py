@@ -0,0 +1,91 @@
+"""Sequence numbers and replay of unacknowledged input for Openctrol agents.
+
+In reliable mode every input message carries a `seq` number that keeps
+counting across reconnects. An agent that lists "ack" in its hello
+capabilities acknowledges with `{"type": "ack", "seq": N}`, meaning every
+event up to N was applied. Events not acknowledged yet stay in a small
+buffer and are written again, in order, on the next connection; the
+agent drops any `seq` it has already applied.
+
+The buffer is bounded in size and age: input that could not be delivered
+within `REPLAY_MAX_AGE` is stale and is dropped rather than replayed.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Sequence, Tuple
+
+# The agent accepts at most 1000 events per second
+REPLAY_BUFFER_SIZE = 1000
+REPLAY_MAX_AGE = 30.0  # seconds
+
+
+def stamp_message(message_json: str, seq: int) -> str:
+    """Add a sequence number to an encoded JSON object message."""
+    return f'{message_json[:-1]},"seq":{seq}}}'
+
+
+class ReplayBuffer:
+    """Messages written but not yet acknowledged, oldest first."""
+
+    def __init__(self, size: int = REPLAY_BUFFER_SIZE, max_age: float = REPLAY_MAX_AGE) -> None:
+        """Initialize an empty buffer."""
+        self._size = size
+        self._max_age = max_age
+        # (seq, written at, stamped message, original message)
+        self._entries: Deque[Tuple[int, float, str, str]] = deque()
+        self.last_seq = 0
+        self.acked_seq = 0
+        self.replayed = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        """Return the number of unacknowledged messages."""
+        return len(self._entries)
+
+    def stamp(self, messages: Sequence[str]) -> List[str]:
+        """Number messages, keep them until acknowledged and return them stamped."""
+        now = time.monotonic()
+        stamped: List[str] = []
+        for message_json in messages:
+            self.last_seq += 1
+            stamped_json = stamp_message(message_json, self.last_seq)
+            self._entries.append((self.last_seq, now, stamped_json, message_json))
+            stamped.append(stamped_json)
+        if (overflow := len(self._entries) - self._size) > 0:
+            # Too far behind the agent; the oldest can no longer be replayed
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.dropped += overflow
+        return stamped
+
+    def ack(self, seq: int) -> None:
+        """Forget every message up to and including `seq`."""
+        entries = self._entries
+        while entries and entries[0][0] <= seq:
+            entries.popleft()
+        self.acked_seq = max(self.acked_seq, seq)
+
+    def pending(self) -> List[Tuple[str, str]]:
+        """Return (stamped, original) messages to replay, dropping stale ones."""
+        cutoff = time.monotonic() - self._max_age
+        entries = self._entries
+        while entries and entries[0][1] < cutoff:
+            entries.popleft()
+            self.dropped += 1
+        return [(stamped_json, message_json) for _, _, stamped_json, message_json in entries]
+
+    def clear(self) -> None:
+        """Drop every unacknowledged message (the agent cannot take a replay)."""
+        self.dropped += len(self._entries)
+        self._entries.clear()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return sequence and replay counters for diagnostics."""
+        return {
+            "last_seq": self.last_seq,
+            "acked_seq": self.acked_seq,
+            "unacknowledged": len(self._entries),
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,70 @@
+"""Select platform for Openctrol integration."""
+
+import logging
+from typing import Any, List, Optional
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .api import OpenctrolApiError
+from .const import DOMAIN
+from .coordinator import OpenctrolDataUpdateCoordinator
+from .entity import OpenctrolEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Openctrol select platform."""
+    coordinator: OpenctrolDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities([OpenctrolMonitorSelect(coordinator, entry)])
+
+
+class OpenctrolMonitorSelect(OpenctrolEntity, SelectEntity):
+    """Selects the monitor captured for remote desktop."""
+
+    _attr_icon = "mdi:monitor-multiple"
+
+    def __init__(
+        self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the select."""
+        super().__init__(coordinator, entry, "monitor", "Monitor")
+
+    def _data_slice(self) -> Any:
+        """Only the monitor ids and the current selection drive state writes."""
+        return (tuple(self.options), self.current_option)
+
+    @property
+    def options(self) -> List[str]:
+        """Return the available monitor ids."""
+        return [
+            monitor.get("id", "")
+            for monitor in self.data.get("monitors") or []
+            if monitor.get("id")
+        ]
+
+    @property
+    def current_option(self) -> Optional[str]:
+        """Return the currently selected monitor id."""
+        return self.data.get("selected_monitor_id") or None
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.last_update_success and bool(self.options)
+
+    async def async_select_option(self, option: str) -> None:
+        """Select the given monitor on the agent."""
+        try:
+            await self.coordinator.async_select_monitor(option)
+        except OpenctrolApiError as err:
+            _LOGGER.error("Select monitor failed: %s", err, exc_info=True)
+            raise HomeAssistantError(f"Select monitor failed: {err}") from err
@@ -1,21 +1,109 @@
 """Sensor platform for Openctrol integration."""
 
 import logging
-from datetime import timedelta
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .api import OpenctrolApiClient, OpenctrolApiError
-from .const import DATA_API_CLIENT, DOMAIN
+from .breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+from .const import DOMAIN
+from .coordinator import (
+    POWER_OFF,
+    POWER_RESTARTING,
+    POWER_SHUTTING_DOWN,
+    OpenctrolDataUpdateCoordinator,
+)
+from .entity import OpenctrolEntity
+from .latency import LatencyHistogram
+from .ws import OpenctrolWsClient
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=30)
+# Power transitions shown as the status state
+_TRANSITION_STATES = (POWER_RESTARTING, POWER_SHUTTING_DOWN)
+
+# Input latency histograms of the WebSocket client: (key, name, icon)
+LATENCY_SENSORS = (
+    ("rtt", "Input Round Trip", "mdi:timer-sync-outline"),
+    ("queue_wait", "Input Queue Wait", "mdi:timer-sand"),
+    ("send", "Input Send Time", "mdi:timer-arrow-right-outline"),
+)
+
+# Status attributes that have their own entities (volume numbers, monitor select)
+_SLICE_EXCLUDED_ATTRIBUTES = frozenset(
+    {"master_volume", "master_muted", "audio_devices", "audio_sessions", "selected_monitor_id"}
+)
+# Boot time estimates closer than this to the previous one keep it
+BOOT_TIME_TOLERANCE = timedelta(seconds=60)
+
+
+def _boot_time(data: Dict[str, Any]) -> Optional[datetime]:
+    """Estimate the boot timestamp from the reported uptime.
+
+    The estimate moves by the poll's timing on every poll; the sensor keeps
+    the previous value while they agree within `BOOT_TIME_TOLERANCE`.
+    """
+    uptime = data.get("uptime_seconds")
+    if uptime is None:
+        return None
+    boot = dt_util.utcnow() - timedelta(seconds=float(uptime))
+    return boot.replace(microsecond=0)
+
+
+@dataclass(frozen=True, kw_only=True)
+class OpenctrolSensorEntityDescription(SensorEntityDescription):
+    """Describes an Openctrol diagnostic sensor."""
+
+    value_fn: Callable[[Dict[str, Any]], Any]
+    # New values within this of the previous one keep the previous value
+    tolerance: Optional[timedelta] = None
+
+
+DIAGNOSTIC_SENSORS: tuple[OpenctrolSensorEntityDescription, ...] = (
+    OpenctrolSensorEntityDescription(
+        key="version",
+        name="Version",
+        icon="mdi:information-outline",
+        value_fn=lambda data: data.get("version"),
+    ),
+    OpenctrolSensorEntityDescription(
+        key="last_boot",
+        name="Last Boot",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_boot_time,
+        tolerance=BOOT_TIME_TOLERANCE,
+    ),
+    OpenctrolSensorEntityDescription(
+        key="active_sessions",
+        name="Active Sessions",
+        icon="mdi:monitor-account",
+        value_fn=lambda data: data.get("active_sessions", 0),
+    ),
+    OpenctrolSensorEntityDescription(
+        key="remote_desktop_state",
+        name="Remote Desktop State",
+        icon="mdi:remote-desktop",
+        value_fn=lambda data: (data.get("remote_desktop") or {}).get("state"),
+    ),
+    OpenctrolSensorEntityDescription(
+        key="desktop_state",
+        name="Desktop State",
+        icon="mdi:monitor-lock",
+        value_fn=lambda data: (data.get("remote_desktop") or {}).get("desktop_state"),
+    ),
+)
 
 
 async def async_setup_entry(
@@ -24,119 +112,74 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Openctrol sensor platform."""
-    try:
-        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
-        if not entry_data:
-            _LOGGER.error("Openctrol entry data not found for entry %s", entry.entry_id)
-            return
-
-        client: Optional[OpenctrolApiClient] = entry_data.get(DATA_API_CLIENT)
-        if not client:
-            _LOGGER.error("Openctrol API client not found for entry %s", entry.entry_id)
-            return
-
-        coordinator = OpenctrolDataUpdateCoordinator(hass, client)
-        
-        # Store coordinator in entry_data so service handlers can trigger refreshes
-        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
-        if isinstance(entry_data, dict):
-            entry_data["coordinator"] = coordinator
-        
-        # Try to refresh, but don't fail if it doesn't work initially
-        try:
-            await coordinator.async_config_entry_first_refresh()
-        except Exception as refresh_err:
-            _LOGGER.warning(
-                "Initial coordinator refresh failed for entry %s (entity will still be created): %s",
-                entry.entry_id,
-                refresh_err,
-            )
-
-        sensor = OpenctrolStatusSensor(coordinator, entry)
-        async_add_entities([sensor], update_before_add=True)
-        _LOGGER.info(
-            "Openctrol sensor entity created for entry %s: unique_id=%s, name=%s",
-            entry.entry_id,
-            sensor.unique_id,
-            sensor.name,
-        )
-    except Exception as err:
-        _LOGGER.error("Failed to set up Openctrol sensor for entry %s: %s", entry.entry_id, err, exc_info=True)
-        raise
-
-
-class OpenctrolDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
-    """Class to manage fetching Openctrol data."""
+    coordinator: OpenctrolDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
 
-    def __init__(self, hass: HomeAssistant, client: OpenctrolApiClient) -> None:
-        """Initialize."""
-        super().__init__(
-            hass,
-            logger=_LOGGER,
-            name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
+    sensor = OpenctrolStatusSensor(coordinator, entry)
+    entities: list[SensorEntity] = [sensor]
+    entities.extend(
+        OpenctrolDiagnosticSensor(coordinator, entry, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
+    if coordinator.breaker is not None:
+        entities.append(OpenctrolConnectionSensor(coordinator, entry))
+    entities.append(OpenctrolWakeSensor(coordinator, entry))
+    if (ws_client := hass.data[DOMAIN][entry.entry_id].get("ws_client")) is not None:
+        entities.extend(
+            OpenctrolLatencySensor(coordinator, entry, ws_client, key, name, icon)
+            for key, name, icon in LATENCY_SENSORS
         )
-        self.client = client
-
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch data from Openctrol API."""
-        data: Dict[str, Any] = {}
-        
-        # Fetch health status (required)
-        try:
-            health_data = await self.client.async_get_health()
-            data.update(health_data)
-        except OpenctrolApiError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-        
-        # Fetch monitors (optional - don't fail if unavailable)
-        try:
-            monitors_data = await self.client.async_get_monitors()
-            # API returns {"Monitors": [...], "CurrentMonitorId": "..."}
-            monitors_raw = monitors_data.get("Monitors") or monitors_data.get("monitors", [])
-            # Normalize monitor data to snake_case for consistency
-            data["monitors"] = [
-                {
-                    "id": m.get("Id") or m.get("id", ""),
-                    "name": m.get("Name") or m.get("name", ""),
-                    "width": m.get("Width") or m.get("width", 0),
-                    "height": m.get("Height") or m.get("height", 0),
-                    "is_primary": m.get("IsPrimary") or m.get("is_primary", False),
-                }
-                for m in monitors_raw
-            ]
-            data["selected_monitor_id"] = monitors_data.get("CurrentMonitorId") or monitors_data.get("current_monitor_id") or monitors_data.get("selected_monitor_id", "")
-        except Exception as err:
-            _LOGGER.debug("Failed to fetch monitors: %s", err)
-            data["monitors"] = []
-            data["selected_monitor_id"] = ""
-        
-        # Fetch audio status (optional - don't fail if unavailable)
-        try:
-            data["audio"] = await self.client.async_get_audio_status()
-        except Exception as err:
-            _LOGGER.debug("Failed to fetch audio status: %s", err)
-            data["audio"] = {}
-        
-        return data
+    async_add_entities(entities)
+    _LOGGER.info(
+        "Openctrol sensor entity created for entry %s: unique_id=%s, name=%s",
+        entry.entry_id,
+        sensor.unique_id,
+        sensor.name,
+    )
 
 
-class OpenctrolStatusSensor(CoordinatorEntity, SensorEntity):
+class OpenctrolStatusSensor(OpenctrolEntity, SensorEntity):
     """Representation of an Openctrol status sensor."""
 
+    # Lists are kept as attributes for the Lovelace card but would otherwise be
+    # copied into the recorder on every change. The dedicated entities carry the
+    # history for the values that matter.
+    _unrecorded_attributes = frozenset(
+        {
+            "available_monitors",
+            "audio_devices",
+            "audio_sessions",
+            "uptime_seconds",
+            "latest_session_id",
+            "latest_websocket_url",
+            "latest_session_expires_at",
+        }
+    )
+
     def __init__(
         self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_status"
-        self._attr_name = f"{entry.title} Status"
+        super().__init__(coordinator, entry, "status", "Status")
         self._attr_device_class = None
 
+    def _data_slice(self) -> Any:
+        """Everything exposed except what the volume and monitor entities cover.
+
+        Those attributes are kept for the Lovelace card and stay current on
+        the writes the other fields cause (uptime changes on every poll),
+        but a volume change or slider tick alone does not write this entity.
+        """
+        attrs = self.extra_state_attributes
+        return (
+            self.native_value,
+            {key: value for key, value in attrs.items() if key not in _SLICE_EXCLUDED_ATTRIBUTES},
+        )
+
     @property
     def native_value(self) -> str:
         """Return the state of the sensor."""
+        if self.coordinator.power_state in _TRANSITION_STATES:
+            return self.coordinator.power_state
         if not self.coordinator.last_update_success or not self.coordinator.data:
             return "offline"
         
@@ -155,9 +198,6 @@ class OpenctrolStatusSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return {}
 
-        from homeassistant.core import callback
-        from homeassistant.helpers import entity_registry as er
-        
         data = self.coordinator.data
         # Get computer name from entry title or host
         computer_name = self._entry.title if hasattr(self._entry, 'title') else None
@@ -220,10 +260,11 @@ class OpenctrolStatusSensor(CoordinatorEntity, SensorEntity):
                 attrs["audio_sessions"] = sessions
                 attrs["audio_session_count"] = len(sessions)
 
+        if (breaker := self.coordinator.breaker) is not None:
+            attrs["connection_state"] = breaker.state
+
         # Include latest session info if available (from service calls)
-        from homeassistant.core import HomeAssistant
-        hass: HomeAssistant = self.hass
-        entry_data = hass.data.get(DOMAIN, {}).get(self._entry.entry_id, {})
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self._entry.entry_id, {})
         if latest_session := entry_data.get("latest_session"):
             attrs["latest_session_id"] = latest_session.get("session_id", "")
             attrs["latest_websocket_url"] = latest_session.get("websocket_url", "")
@@ -231,8 +272,188 @@ class OpenctrolStatusSensor(CoordinatorEntity, SensorEntity):
 
         return attrs
 
+    @property
+    def available(self) -> bool:
+        """Return if entity is available.
+
+        Stays available through a restart or shutdown to show the transition,
+        and reports a PC that was shut down from here as offline.
+        """
+        return self.coordinator.last_update_success or self.coordinator.power_state in (
+            *_TRANSITION_STATES,
+            POWER_OFF,
+        )
+
+
+class OpenctrolDiagnosticSensor(OpenctrolEntity, SensorEntity):
+    """Diagnostic sensor backed by a single field of the coordinator data."""
+
+    entity_description: OpenctrolSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        description: OpenctrolSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, description.key, str(description.name))
+        self.entity_description = description
+        self._last_value: Any = None
+
+    def _data_slice(self) -> Any:
+        """Only the sensor's own value drives state writes."""
+        return self.native_value
+
+    @property
+    def native_value(self) -> Any:
+        """Return the value for this sensor."""
+        if not self.coordinator.data:
+            return None
+        value = self.entity_description.value_fn(self.coordinator.data)
+        tolerance = self.entity_description.tolerance
+        if (
+            tolerance is not None
+            and value is not None
+            and self._last_value is not None
+            and abs(value - self._last_value) <= tolerance
+        ):
+            return self._last_value
+        self._last_value = value
+        return value
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return self.coordinator.last_update_success
 
+
+class OpenctrolConnectionSensor(OpenctrolEntity, SensorEntity):
+    """Circuit breaker state of the connection to the agent.
+
+    Attributes also carry the connection pool reuse ratio, which shows
+    whether polls ride warm keep-alive connections.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN]
+    _attr_icon = "mdi:connection"
+
+    def __init__(
+        self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "connection", "Connection")
+
+    def _data_slice(self) -> Any:
+        """Breaker state and failure count drive state writes."""
+        breaker = self.coordinator.breaker
+        return (breaker.state, breaker.consecutive_failures) if breaker else None
+
+    @property
+    def native_value(self) -> Optional[str]:
+        """Return the breaker state."""
+        breaker = self.coordinator.breaker
+        return breaker.state if breaker else None
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return breaker and connection pool counters."""
+        breaker = self.coordinator.breaker
+        attrs: Dict[str, Any] = breaker.as_dict() if breaker else {}
+        if (stats := self.coordinator.client.connection_stats) is not None:
+            attrs["connection_reuse_ratio"] = stats.reuse_ratio
+            attrs["connections_created"] = stats.connections_created
+        return attrs
+
+    @property
+    def available(self) -> bool:
+        """The connection state is known even when polls fail."""
+        return True
+
+
+class OpenctrolWakeSensor(OpenctrolEntity, SensorEntity):
+    """Time from the last Wake-on-LAN packet until the agent answered."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_icon = "mdi:timer-play-outline"
+
+    def __init__(
+        self, coordinator: OpenctrolDataUpdateCoordinator, entry: ConfigEntry
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, "wake_duration", "Wake Duration")
+
+    def _data_slice(self) -> Any:
+        """Wake results and probe state drive state writes."""
+        waker = self.coordinator.waker
+        return (waker.last_wake_duration, waker.waking, waker.mac is not None, waker.wake_timeouts)
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the last wake-to-online time."""
+        return self.coordinator.waker.last_wake_duration
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return wake counters."""
+        return self.coordinator.waker.as_dict()
+
+    @property
+    def available(self) -> bool:
+        """Wake results are kept while the PC is off."""
+        return True
+
+
+class OpenctrolLatencySensor(OpenctrolEntity, SensorEntity):
+    """95th percentile of one input latency histogram.
+
+    The histograms live on the WebSocket client and record every sample;
+    the state is only sampled on each coordinator refresh (every 30 s), so
+    it trails them by up to one poll. Diagnostics read them live.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 1
+    # Percentiles move with every sample; the state carries the history
+    _unrecorded_attributes = frozenset({"count", "total", "p50_ms", "p95_ms", "p99_ms", "max_ms"})
+
+    def __init__(
+        self,
+        coordinator: OpenctrolDataUpdateCoordinator,
+        entry: ConfigEntry,
+        ws_client: OpenctrolWsClient,
+        key: str,
+        name: str,
+        icon: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry, f"latency_{key}", name)
+        self._histogram: LatencyHistogram = getattr(ws_client.latency, key)
+        self._attr_icon = icon
+
+    def _data_slice(self) -> Any:
+        """New samples drive state writes."""
+        return self._histogram.total
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the 95th percentile in milliseconds."""
+        return self._histogram.percentile(95)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the sample count and the other percentiles."""
+        return self._histogram.as_dict()
+
+    @property
+    def available(self) -> bool:
+        """Latency is measured on the WebSocket, independent of polling."""
+        return True
@@ -0,0 +1,415 @@
+"""Compiled input sequences for Openctrol agents.
+
+A sequence is a list of steps (move, click, button, key, combo, wheel,
+text, wait). It is validated and encoded once into a `CompiledSequence`: an
+array of planned offsets and, per offset, the messages to write. The
+runner writes every burst at its absolute deadline on the event loop
+timer, so waits do not add up scheduling error the way chained sleeps
+do, and reports how far the writes drifted from the plan.
+
+Pointer gestures (double click, drag, long press) compile to the same
+form, so their timing is kept by Home Assistant rather than by the
+client that asked for them.
+"""
+
+import asyncio
+import math
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .keys import combo_messages, map_key_name_to_code, split_combo, text_messages
+from .serialization import (
+    POINTER_BUTTONS,
+    key_message,
+    pointer_absolute_message,
+    pointer_button_message,
+    pointer_move_message,
+    pointer_wheel_message,
+)
+
+if TYPE_CHECKING:
+    from .ws import OpenctrolWsClient
+
+MAX_SEQUENCE_STEPS = 1000
+MAX_SEQUENCE_DURATION = 600.0  # seconds
+MAX_TEXT_LENGTH = 10000
+
+# The agent drops input beyond 1000 events in any one-second window;
+# sequences stay below that so pointer input sent meanwhile is not dropped
+INPUT_EVENTS_PER_SECOND = 900
+# Events written per burst; larger bursts are split and spaced out
+BURST_EVENTS = 100
+
+STEP_TYPES = ("move", "click", "button", "key", "combo", "wheel", "text", "wait")
+GESTURE_TYPES = ("double_click", "drag", "long_press")
+
+# Gesture defaults; Windows accepts a second click within 500 ms
+DEFAULT_DOUBLE_CLICK_INTERVAL = 100.0  # ms
+DEFAULT_DRAG_DURATION = 300.0  # ms
+DEFAULT_LONG_PRESS_DURATION = 800.0  # ms
+# Interpolated moves per second during a drag
+DRAG_MOVES_PER_SECOND = 60
+
+
+class CompiledSequence:
+    """Planned offsets (seconds from start) and the messages due at each."""
+
+    __slots__ = ("offsets", "bursts", "duration", "steps", "events")
+
+    def __init__(self) -> None:
+        """Initialize an empty sequence."""
+        self.offsets = array("d")
+        self.bursts: List[Tuple[str, ...]] = []
+        self.duration = 0.0
+        self.steps = 0
+        self.events = 0
+
+    def append(self, offset: float, messages: Sequence[str]) -> None:
+        """Add messages due at `offset`; merges with a burst at the same time."""
+        if not messages:
+            return
+        if self.offsets and self.offsets[-1] == offset:
+            self.bursts[-1] += tuple(messages)
+        else:
+            self.offsets.append(offset)
+            self.bursts.append(tuple(messages))
+        self.events += len(messages)
+        self.duration = max(self.duration, offset)
+
+    def __len__(self) -> int:
+        """Return the number of bursts."""
+        return len(self.bursts)
+
+
+def _number(step: Mapping[str, Any], field: str, index: int, default: Any = None) -> float:
+    """Return a numeric step field or raise ValueError naming the step."""
+    value = step.get(field, default)
+    if value is None:
+        raise ValueError(f"Step {index} ({step.get('type')}): {field} is required")
+    try:
+        return float(value)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Step {index} ({step.get('type')}): {field} must be a number") from err
+
+
+def _button(step: Mapping[str, Any], index: int) -> str:
+    button = str(step.get("button", "left")).lower()
+    if button not in POINTER_BUTTONS:
+        raise ValueError(f"Step {index} ({step.get('type')}): unknown button {button}")
+    return button
+
+
+def _step_messages(step: Mapping[str, Any], index: int) -> List[str]:
+    """Encode one non-wait step."""
+    step_type = step["type"]
+    if step_type == "move":
+        if step.get("absolute"):
+            return [
+                pointer_absolute_message(
+                    int(round(_number(step, "x", index))), int(round(_number(step, "y", index)))
+                )
+            ]
+        return [
+            pointer_move_message(
+                int(round(_number(step, "dx", index, 0))), int(round(_number(step, "dy", index, 0)))
+            )
+        ]
+    if step_type == "click":
+        button = _button(step, index)
+        return [pointer_button_message(button, "down"), pointer_button_message(button, "up")]
+    if step_type == "button":
+        action = str(step.get("action", "down")).lower()
+        if action not in ("down", "up"):
+            raise ValueError(f"Step {index} (button): action must be down or up")
+        return [pointer_button_message(_button(step, index), action)]
+    if step_type == "wheel":
+        return [
+            pointer_wheel_message(
+                int(round(_number(step, "dx", index, 0))), int(round(_number(step, "dy", index, 0)))
+            )
+        ]
+    if step_type == "key":
+        key = step.get("key")
+        key_code = map_key_name_to_code(str(key)) if key is not None else None
+        if key_code is None:
+            raise ValueError(f"Step {index} (key): unknown key {key}")
+        action = str(step.get("action", "press")).lower()
+        if action == "press":
+            return [key_message(key_code, "down"), key_message(key_code, "up")]
+        if action not in ("down", "up"):
+            raise ValueError(f"Step {index} (key): action must be press, down or up")
+        return [key_message(key_code, action)]
+    # combo
+    keys = step.get("keys")
+    if isinstance(keys, str):
+        keys = [keys]
+    modifiers, main_keys, unknown = split_combo(keys or [])
+    if unknown or not (modifiers or main_keys):
+        raise ValueError(f"Step {index} (combo): unknown keys {unknown or keys}")
+    return combo_messages(modifiers, main_keys)
+
+
+def _append_paced(
+    sequence: CompiledSequence, offset: float, ready: float, messages: Sequence[str]
+) -> Tuple[float, float]:
+    """Add `messages` due at `offset` without outrunning the agent.
+
+    They are split into bursts of up to BURST_EVENTS events. No burst is
+    due before `ready`, when the previous one has been applied at
+    INPUT_EVENTS_PER_SECOND. Returns the offset of the last burst, which
+    later waits count from, and the new `ready`.
+    """
+    for start in range(0, len(messages), BURST_EVENTS):
+        burst = messages[start : start + BURST_EVENTS]
+        offset = max(offset, ready)
+        sequence.append(offset, burst)
+        ready = offset + len(burst) / INPUT_EVENTS_PER_SECOND
+    if ready > MAX_SEQUENCE_DURATION:
+        raise ValueError(f"Sequences are limited to {MAX_SEQUENCE_DURATION:.0f} s")
+    return offset, ready
+
+
+def _append_text(sequence: CompiledSequence, offset: float, text: str, delay: float) -> float:
+    """Add the events typing `text` starting at `offset`; returns the next free offset.
+
+    With a delay every character is its own burst. Without one, whole
+    characters are packed into bursts of up to BURST_EVENTS events,
+    spaced so the text types at INPUT_EVENTS_PER_SECOND.
+    """
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f"Text is limited to {MAX_TEXT_LENGTH} characters")
+    burst: List[str] = []
+    for events in text_messages(text):
+        if delay > 0:
+            sequence.append(offset, events)
+            offset += max(delay, len(events) / INPUT_EVENTS_PER_SECOND)
+            continue
+        if burst and len(burst) + len(events) > BURST_EVENTS:
+            sequence.append(offset, burst)
+            offset += len(burst) / INPUT_EVENTS_PER_SECOND
+            burst = []
+        burst += events
+    if burst:
+        sequence.append(offset, burst)
+        offset += len(burst) / INPUT_EVENTS_PER_SECOND
+    if offset > MAX_SEQUENCE_DURATION:
+        raise ValueError(f"Sequences are limited to {MAX_SEQUENCE_DURATION:.0f} s")
+    return offset
+
+
+def compile_text(text: str, delay_ms: float = 0) -> CompiledSequence:
+    """Compile typing `text` with `delay_ms` between characters (0 = agent rate)."""
+    if delay_ms < 0:
+        raise ValueError("delay cannot be negative")
+    sequence = CompiledSequence()
+    sequence.steps = 1
+    _append_text(sequence, 0.0, text, delay_ms / 1000)
+    return sequence
+
+
+def compile_sequence(steps: Iterable[Mapping[str, Any]]) -> CompiledSequence:
+    """Validate and encode input steps.
+
+    `wait` steps advance the plan by `milliseconds`; `text` steps by the
+    time their characters take to type. Other steps without a wait
+    between them are written together, in bursts of up to BURST_EVENTS
+    events that are held back when the previous burst could still push
+    the agent over its input rate. Raises ValueError for an invalid step.
+    """
+    sequence = CompiledSequence()
+    offset = ready = 0.0
+    pending: List[str] = []
+    for index, step in enumerate(steps, start=1):
+        if not isinstance(step, Mapping) or step.get("type") not in STEP_TYPES:
+            raise ValueError(f"Step {index}: type must be one of {', '.join(STEP_TYPES)}")
+        if index > MAX_SEQUENCE_STEPS:
+            raise ValueError(f"Sequences are limited to {MAX_SEQUENCE_STEPS} steps")
+        sequence.steps += 1
+        if step["type"] not in ("wait", "text"):
+            pending += _step_messages(step, index)
+            continue
+        if pending:
+            offset, ready = _append_paced(sequence, offset, ready, pending)
+            pending = []
+        if step["type"] == "wait":
+            milliseconds = _number(step, "milliseconds", index)
+            if milliseconds < 0:
+                raise ValueError(f"Step {index} (wait): milliseconds cannot be negative")
+            offset += milliseconds / 1000
+            if offset > MAX_SEQUENCE_DURATION:
+                raise ValueError(f"Sequences are limited to {MAX_SEQUENCE_DURATION:.0f} s")
+            sequence.duration = offset
+            continue
+        if step["type"] == "text":
+            delay = _number(step, "delay", index, 0)
+            if delay < 0:
+                raise ValueError(f"Step {index} (text): delay cannot be negative")
+            offset = ready = _append_text(
+                sequence, max(offset, ready), str(step.get("text", "")), delay / 1000
+            )
+    if pending:
+        _append_paced(sequence, offset, ready, pending)
+    return sequence
+
+
+def _gesture_seconds(milliseconds: float, field: str) -> float:
+    """Return a gesture time in seconds or raise ValueError."""
+    if milliseconds < 0:
+        raise ValueError(f"{field} cannot be negative")
+    if milliseconds / 1000 > MAX_SEQUENCE_DURATION:
+        raise ValueError(f"Gestures are limited to {MAX_SEQUENCE_DURATION:.0f} s")
+    return milliseconds / 1000
+
+
+def _gesture_button(button: str) -> str:
+    button = button.lower()
+    if button not in POINTER_BUTTONS:
+        raise ValueError(f"Unknown button {button}")
+    return button
+
+
+def _gesture_start(position: Optional[Tuple[int, int]]) -> List[str]:
+    """Return the absolute move to a gesture's position, if it has one."""
+    return [pointer_absolute_message(*position)] if position is not None else []
+
+
+def compile_double_click(
+    button: str = "left",
+    interval_ms: float = DEFAULT_DOUBLE_CLICK_INTERVAL,
+    position: Optional[Tuple[int, int]] = None,
+) -> CompiledSequence:
+    """Compile two clicks `interval_ms` apart, at `position` (0-65535) if given."""
+    button = _gesture_button(button)
+    interval = _gesture_seconds(interval_ms, "interval")
+    click = [pointer_button_message(button, "down"), pointer_button_message(button, "up")]
+    sequence = CompiledSequence()
+    sequence.steps = 1
+    sequence.append(0.0, _gesture_start(position) + click)
+    sequence.append(interval, click)
+    return sequence
+
+
+def compile_long_press(
+    button: str = "left",
+    duration_ms: float = DEFAULT_LONG_PRESS_DURATION,
+    position: Optional[Tuple[int, int]] = None,
+) -> CompiledSequence:
+    """Compile holding `button` down for `duration_ms`, at `position` if given."""
+    button = _gesture_button(button)
+    duration = _gesture_seconds(duration_ms, "duration")
+    sequence = CompiledSequence()
+    sequence.steps = 1
+    sequence.append(0.0, _gesture_start(position) + [pointer_button_message(button, "down")])
+    sequence.append(duration, [pointer_button_message(button, "up")])
+    return sequence
+
+
+def compile_drag(
+    end: Tuple[float, float],
+    duration_ms: float = DEFAULT_DRAG_DURATION,
+    button: str = "left",
+    start: Optional[Tuple[int, int]] = None,
+) -> CompiledSequence:
+    """Compile pressing `button`, moving to `end` over `duration_ms` and releasing.
+
+    With `start` both points are absolute (0-65535) and the pointer moves
+    to `start` before pressing; without it `end` is a relative (dx, dy)
+    from wherever the pointer is. The path is split into evenly timed
+    moves at DRAG_MOVES_PER_SECOND, and the release is written with the
+    last one.
+    """
+    button = _gesture_button(button)
+    duration = _gesture_seconds(duration_ms, "duration")
+    moves = max(1, math.ceil(duration * DRAG_MOVES_PER_SECOND))
+    sequence = CompiledSequence()
+    sequence.steps = 1
+    sequence.append(0.0, _gesture_start(start) + [pointer_button_message(button, "down")])
+    done_x = done_y = 0
+    for index in range(1, moves + 1):
+        fraction = index / moves
+        if start is not None:
+            message = pointer_absolute_message(
+                int(round(start[0] + (end[0] - start[0]) * fraction)),
+                int(round(start[1] + (end[1] - start[1]) * fraction)),
+            )
+        else:
+            # Steps are taken from the rounded running total, so they add up to end
+            step_x = int(round(end[0] * fraction)) - done_x
+            step_y = int(round(end[1] * fraction)) - done_y
+            done_x += step_x
+            done_y += step_y
+            if not step_x and not step_y:
+                continue
+            message = pointer_move_message(step_x, step_y)
+        sequence.append(duration * fraction, [message])
+    sequence.append(duration, [pointer_button_message(button, "up")])
+    return sequence
+
+
+async def async_wait_until(loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+    """Sleep until the loop clock reaches `deadline`."""
+    if deadline <= loop.time():
+        return
+    future = loop.create_future()
+    handle = loop.call_at(deadline, _set_done, future)
+    try:
+        await future
+    finally:
+        handle.cancel()
+
+
+def _set_done(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def async_run_sequence(
+    ws_client: "OpenctrolWsClient", sequence: CompiledSequence, speed: float = 1.0
+) -> Dict[str, Any]:
+    """Write a compiled sequence on one connection and report its timing.
+
+    `speed` scales the plan (2.0 plays twice as fast). Drift is how late
+    each burst was written compared to its deadline. A run that fails or
+    is cancelled part-way releases the keys and buttons it left held.
+    """
+    if speed <= 0:
+        raise ValueError("speed must be greater than 0")
+    loop = asyncio.get_running_loop()
+    await ws_client.async_ensure_connected()
+
+    start = loop.time()
+    max_drift = total_drift = 0.0
+    completed = False
+    try:
+        for offset, burst in zip(sequence.offsets, sequence.bursts):
+            deadline = start + offset / speed
+            await async_wait_until(loop, deadline)
+            drift = loop.time() - deadline
+            max_drift = max(max_drift, drift)
+            total_drift += drift
+            await ws_client.async_send_messages(burst)
+        # A trailing wait is part of the plan
+        await async_wait_until(loop, start + sequence.duration / speed)
+        completed = True
+    finally:
+        if not completed:
+            await ws_client.async_release_held_inputs()
+
+    return {
+        "steps": sequence.steps,
+        "events": sequence.events,
+        "planned_ms": round(sequence.duration / speed * 1000, 1),
+        "elapsed_ms": round((loop.time() - start) * 1000, 1),
+        "max_drift_ms": round(max_drift * 1000, 2),
+        "mean_drift_ms": round(total_drift / len(sequence) * 1000, 2) if len(sequence) else 0.0,
+    }
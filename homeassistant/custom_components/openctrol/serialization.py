@@ -0,0 +1,201 @@
+"""JSON encoding and decoding for Openctrol REST and WebSocket traffic.
+
+orjson is used when it is installed (it ships with Home Assistant) and the
+standard library `json` module otherwise. Both backends produce the same
+compact output, so the agent sees identical messages either way.
+
+Fixed-shape input messages (`pointer_button` and `key`) are encoded once
+at import time and looked up afterwards instead of being serialized on
+every event; pointer messages are cached by their arguments.
+
+Input messages are built together with their binary input record (see
+`codec.py`), so the binary codec looks the record up by the message's
+JSON instead of parsing the JSON back.
+"""
+
+import json
+import struct
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode an object to compact JSON bytes."""
+        return orjson.dumps(obj)
+
+    def dumps(obj: Any) -> str:
+        """Encode an object to a compact JSON string."""
+        return orjson.dumps(obj).decode()
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode JSON text or bytes."""
+        return orjson.loads(data)
+
+else:
+    JSON_BACKEND = "json"
+
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Encode an object to compact JSON bytes."""
+        return _encoder.encode(obj).encode()
+
+    def dumps(obj: Any) -> str:
+        """Encode an object to a compact JSON string."""
+        return _encoder.encode(obj)
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Decode JSON text or bytes."""
+        return json.loads(data)
+
+
+POINTER_BUTTONS = ("left", "right", "middle")
+BUTTON_ACTIONS = ("down", "up", "click")
+KEY_ACTIONS = ("down", "up")
+
+# Virtual key codes are a single byte on Windows
+_KEY_CODE_RANGE = range(0x100)
+
+# Binary input record layout: type (u8) + 4-byte little-endian payload
+RECORD_MOVE = 0x01
+RECORD_MOVE_ABSOLUTE = 0x02
+RECORD_BUTTON = 0x03
+RECORD_WHEEL = 0x04
+RECORD_KEY = 0x05
+
+SIGNED_RECORD = struct.Struct("<Bhh")
+UNSIGNED_RECORD = struct.Struct("<BHH")
+BUTTON_RECORD = struct.Struct("<BBBxx")
+KEY_RECORD = struct.Struct("<BHBB")
+
+# Pointer messages (and their records) kept for repeated deltas and positions
+MESSAGE_CACHE_SIZE = 4096
+
+_POINTER_BUTTON_TEMPLATES: Dict[Tuple[str, str], str] = {
+    (button, action): dumps({"type": "pointer_button", "button": button, "action": action})
+    for button in POINTER_BUTTONS
+    for action in BUTTON_ACTIONS
+}
+
+_KEY_TEMPLATES: Dict[Tuple[int, str], str] = {
+    (key_code, action): dumps({"type": "key", "key_code": key_code, "action": action})
+    for key_code in _KEY_CODE_RANGE
+    for action in KEY_ACTIONS
+}
+
+# Encoded JSON -> binary record. Templates are kept for good; pointer
+# messages are dropped oldest first once there are more than the three
+# pointer builders' caches hold.
+_RECORD_CACHE_SIZE = 3 * MESSAGE_CACHE_SIZE
+_records: Dict[str, bytes] = {
+    **{
+        message: BUTTON_RECORD.pack(
+            RECORD_BUTTON, POINTER_BUTTONS.index(button), KEY_ACTIONS.index(action)
+        )
+        for (button, action), message in _POINTER_BUTTON_TEMPLATES.items()
+        if action in KEY_ACTIONS
+    },
+    **{
+        message: KEY_RECORD.pack(RECORD_KEY, key_code, KEY_ACTIONS.index(action), 0)
+        for (key_code, action), message in _KEY_TEMPLATES.items()
+    },
+}
+_pointer_records: Deque[str] = deque()
+
+
+def _remember_record(message_json: str, record: bytes) -> None:
+    """Keep the record of a pointer message, dropping the oldest past the limit."""
+    if message_json not in _records:
+        _pointer_records.append(message_json)
+    _records[message_json] = record
+    if len(_pointer_records) > _RECORD_CACHE_SIZE:
+        _records.pop(_pointer_records.popleft(), None)
+
+
+# message_record(message_json) -> the binary record of a message built
+# here, or None if unknown; bound directly, it is on every binary write
+message_record: Callable[[str], Optional[bytes]] = _records.get
+
+
+def pointer_button_message(button: str, action: str) -> str:
+    """Return the encoded `pointer_button` message for a button and action."""
+    message = _POINTER_BUTTON_TEMPLATES.get((button, action))
+    if message is None:
+        message = dumps({"type": "pointer_button", "button": button, "action": action})
+    return message
+
+
+def key_message(key_code: int, action: str) -> str:
+    """Return the encoded `key` message for a virtual key code and action."""
+    message = _KEY_TEMPLATES.get((key_code, action))
+    if message is None:
+        message = dumps({"type": "key", "key_code": key_code, "action": action})
+    return message
+
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def pointer_move_message(dx: int, dy: int) -> str:
+    """Return the encoded relative `pointer_move` message."""
+    message = dumps({"type": "pointer_move", "dx": dx, "dy": dy})
+    try:
+        _remember_record(message, SIGNED_RECORD.pack(RECORD_MOVE, dx, dy))
+    except struct.error:
+        pass  # Out of the record's range; sent as JSON
+    return message
+
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def pointer_absolute_message(x: int, y: int) -> str:
+    """Return the encoded absolute `pointer_move` message (0-65535 coordinates)."""
+    message = dumps({"type": "pointer_move", "x": x, "y": y, "absolute": True})
+    try:
+        _remember_record(message, UNSIGNED_RECORD.pack(RECORD_MOVE_ABSOLUTE, x, y))
+    except struct.error:
+        pass  # Out of the record's range; sent as JSON
+    return message
+
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def pointer_wheel_message(delta_x: int, delta_y: int) -> str:
+    """Return the encoded `pointer_wheel` message."""
+    message = dumps({"type": "pointer_wheel", "delta_x": delta_x, "delta_y": delta_y})
+    try:
+        _remember_record(message, SIGNED_RECORD.pack(RECORD_WHEEL, delta_x, delta_y))
+    except struct.error:
+        pass  # Out of the record's range; sent as JSON
+    return message
+
+
+def text_message(text: str) -> str:
+    """Return the encoded `text` message (typed as Unicode by the agent)."""
+    return dumps({"type": "text", "text": text})
+
+
+def batch_messages(messages: Sequence[str], max_bytes: int) -> List[str]:
+    """Pack encoded messages into `batch` envelopes of at most `max_bytes`.
+
+    The envelope is `{"type":"batch","events":[...]}`; the events are
+    spliced in as already encoded, so nothing is serialized twice.
+    """
+    prefix, suffix = '{"type":"batch","events":[', "]}"
+    envelopes: List[str] = []
+    chunk: List[str] = []
+    size = len(prefix) + len(suffix)
+    for message in messages:
+        length = len(message.encode()) + 1
+        if chunk and size + length > max_bytes:
+            envelopes.append(prefix + ",".join(chunk) + suffix)
+            chunk, size = [], len(prefix) + len(suffix)
+        chunk.append(message)
+        size += length
+    if chunk:
+        envelopes.append(prefix + ",".join(chunk) + suffix)
+    return envelopes
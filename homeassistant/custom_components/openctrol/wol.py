@@ -0,0 +1,254 @@
+"""Wake-on-LAN sender and fast online probe for Openctrol agents.
+
+The agent cannot wake the PC it runs on, so the integration sends the
+magic packet itself. After sending, a short-interval TCP connect probe
+watches the agent port and reports the host online as soon as it answers
+instead of waiting for the next coordinator poll.
+"""
+
+import asyncio
+import logging
+import re
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC_PACKET_PORT = 9
+BROADCAST_ADDRESS = "255.255.255.255"
+# UDP is lossy; a few copies cost nothing
+MAGIC_PACKET_REPEATS = 3
+
+PROBE_INTERVAL = 0.5
+PROBE_TIMEOUT = 0.5
+WAKE_TIMEOUT = 180.0
+
+# Retry interval for learning the MAC while the agent is online
+LEARN_RETRY_INTERVAL = 600.0
+
+ARP_TABLE = "/proc/net/arp"
+_ARP_FLAG_COMPLETE = 0x2
+
+_MAC_CHARS_RE = re.compile(r"[0-9a-fA-F:.\-]+")
+
+
+class OpenctrolWakeError(Exception):
+    """Raised when a wake request cannot be sent."""
+
+
+def normalize_mac(mac: str) -> str:
+    """Return a MAC address as lowercase colon-separated hex.
+
+    Raises ValueError for anything that is not a 48-bit MAC address.
+    """
+    digits = re.sub(r"[:.\-]", "", mac).lower()
+    if not _MAC_CHARS_RE.fullmatch(mac) or len(digits) != 12:
+        raise ValueError(f"Invalid MAC address: {mac}")
+    return ":".join(digits[i : i + 2] for i in range(0, 12, 2))
+
+
+def build_magic_packet(mac: str) -> bytes:
+    """Build a magic packet: six 0xFF bytes followed by the MAC 16 times."""
+    return b"\xff" * 6 + bytes.fromhex(normalize_mac(mac).replace(":", "")) * 16
+
+
+def lookup_mac(host: str) -> Optional[str]:
+    """Find the MAC address of `host` in the kernel ARP table.
+
+    Blocking; run in the executor. Only works when the agent is on the same
+    L2 segment as Home Assistant and was contacted recently.
+    """
+    try:
+        address = socket.gethostbyname(host)
+    except OSError:
+        return None
+    try:
+        with open(ARP_TABLE, encoding="ascii") as arp:
+            lines = arp.readlines()[1:]
+    except OSError:
+        return None
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 4 or fields[0] != address:
+            continue
+        try:
+            if not int(fields[2], 16) & _ARP_FLAG_COMPLETE:
+                continue
+            return normalize_mac(fields[3])
+        except ValueError:
+            continue
+    return None
+
+
+async def async_send_magic_packet(
+    mac: str,
+    broadcast: str = BROADCAST_ADDRESS,
+    port: int = MAGIC_PACKET_PORT,
+) -> None:
+    """Broadcast a Wake-on-LAN magic packet for `mac`."""
+    packet = build_magic_packet(mac)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        asyncio.DatagramProtocol, family=socket.AF_INET, allow_broadcast=True
+    )
+    try:
+        for _ in range(MAGIC_PACKET_REPEATS):
+            transport.sendto(packet, (broadcast, port))
+    finally:
+        transport.close()
+
+
+async def async_probe_port(host: str, port: int, timeout: float = PROBE_TIMEOUT) -> bool:
+    """Return True if a TCP connection to host:port succeeds within `timeout`."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class OpenctrolWaker:
+    """Wakes one agent's PC and measures how long it takes to come online.
+
+    `on_port_open` is awaited every time the probe reaches the agent port
+    and returns True once the agent is actually serving requests.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        on_port_open: Callable[[], Awaitable[bool]],
+        mac: Optional[str] = None,
+        on_mac_learned: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Initialize the waker."""
+        self._hass = hass
+        self._host = host
+        self._port = port
+        self._on_port_open = on_port_open
+        self._on_mac_learned = on_mac_learned
+        self.mac = normalize_mac(mac) if mac else None
+        self._probe_task: Optional[asyncio.Task] = None
+        self._learn_task: Optional[asyncio.Task] = None
+        self._next_learn_attempt = 0.0
+        self._listeners: List[Callable[[], None]] = []
+        self.wakes_sent = 0
+        self.wake_timeouts = 0
+        self.last_wake_duration: Optional[float] = None
+        self.last_port_open_after: Optional[float] = None
+
+    @property
+    def waking(self) -> bool:
+        """Return True while waiting for the agent to come online."""
+        return self._probe_task is not None
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call `listener` when wake state changes; returns a remove function."""
+        self._listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _remove
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    def async_schedule_learn(self) -> None:
+        """Look up the agent's MAC in the background if it is not known yet."""
+        if self.mac is not None or self._learn_task is not None:
+            return
+        now = time.monotonic()
+        if now < self._next_learn_attempt:
+            return
+        self._next_learn_attempt = now + LEARN_RETRY_INTERVAL
+        self._learn_task = self._hass.async_create_background_task(
+            self._async_learn(), f"openctrol learn mac {self._host}"
+        )
+
+    async def _async_learn(self) -> None:
+        try:
+            mac = await self._hass.async_add_executor_job(lookup_mac, self._host)
+        finally:
+            self._learn_task = None
+        if mac is None:
+            _LOGGER.debug("MAC address of %s not found in the ARP table", self._host)
+            return
+        _LOGGER.debug("Learned MAC address of %s", self._host)
+        self.mac = mac
+        if self._on_mac_learned is not None:
+            self._on_mac_learned(mac)
+        self._notify()
+
+    async def async_wake(self, probe: bool = True) -> None:
+        """Send the magic packet and optionally start the online probe."""
+        if self.mac is None:
+            raise OpenctrolWakeError(
+                f"MAC address of {self._host} is unknown; set it in the integration options"
+            )
+        try:
+            await async_send_magic_packet(self.mac)
+        except OSError as err:
+            raise OpenctrolWakeError(f"Failed to send Wake-on-LAN packet: {err}") from err
+        self.wakes_sent += 1
+        _LOGGER.debug("Sent Wake-on-LAN packet for %s", self._host)
+
+        if probe and self._probe_task is None:
+            self._probe_task = self._hass.async_create_background_task(
+                self._async_probe_until_online(time.monotonic()),
+                f"openctrol wake probe {self._host}",
+            )
+            self._notify()
+
+    async def _async_probe_until_online(self, started: float) -> None:
+        """Probe the agent port until the agent serves requests or we give up."""
+        port_open_after: Optional[float] = None
+        try:
+            while (elapsed := time.monotonic() - started) < WAKE_TIMEOUT:
+                if await async_probe_port(self._host, self._port):
+                    if port_open_after is None:
+                        port_open_after = elapsed
+                    if await self._on_port_open():
+                        self.last_port_open_after = round(port_open_after, 2)
+                        self.last_wake_duration = round(time.monotonic() - started, 2)
+                        _LOGGER.info(
+                            "%s came online %.1f s after Wake-on-LAN",
+                            self._host,
+                            self.last_wake_duration,
+                        )
+                        return
+                await asyncio.sleep(PROBE_INTERVAL)
+            self.wake_timeouts += 1
+            _LOGGER.warning(
+                "%s did not come online within %.0f s of Wake-on-LAN", self._host, WAKE_TIMEOUT
+            )
+        finally:
+            self._probe_task = None
+            self._notify()
+
+    def async_cancel(self) -> None:
+        """Stop a running probe or MAC lookup."""
+        for task in (self._probe_task, self._learn_task):
+            if task is not None:
+                task.cancel()
+        self._probe_task = None
+        self._learn_task = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return wake counters for attributes and diagnostics."""
+        return {
+            "mac_known": self.mac is not None,
+            "waking": self.waking,
+            "wakes_sent": self.wakes_sent,
+            "wake_timeouts": self.wake_timeouts,
+            "last_wake_duration": self.last_wake_duration,
+            "last_port_open_after": self.last_port_open_after,
+        }
@@ -0,0 +1,150 @@
+"""Coalescing writer for Openctrol volume changes."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_VOLUME_SETTLE_TIME
+
+_LOGGER = logging.getLogger(__name__)
+
+TARGET_MASTER = "master"
+
+SendFunction = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def device_target(device_id: str) -> str:
+    """Return the writer target key for an audio device."""
+    return f"device:{device_id}"
+
+
+class _TargetState:
+    """Pending and in-flight write state for one target."""
+
+    __slots__ = ("pending", "send", "waiters", "task", "last_sent", "collapsed")
+
+    def __init__(self) -> None:
+        self.pending: Optional[Dict[str, Any]] = None
+        self.send: Optional[SendFunction] = None
+        self.waiters: List[asyncio.Future] = []
+        self.task: Optional[asyncio.Task] = None
+        self.last_sent = float("-inf")
+        self.collapsed = 0
+
+
+class OpenctrolVolumeWriter:
+    """Last-write-wins volume writer.
+
+    Per target (master or a device id) at most one request is in flight and
+    one value is pending. New values replace the pending one, so a slider
+    drag results in one write per settle window and the final value always
+    reaches the agent last. Callers resolve once their value (or a newer one
+    that replaced it) has been written.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, settle_time: float = DEFAULT_VOLUME_SETTLE_TIME
+    ) -> None:
+        """Initialize the writer."""
+        self._hass = hass
+        self._settle_time = settle_time
+        self._targets: Dict[str, _TargetState] = {}
+        self.writes_requested = 0
+        self.writes_sent = 0
+
+    @property
+    def writes_collapsed(self) -> int:
+        """Return how many requested writes were merged into a later one."""
+        return sum(state.collapsed for state in self._targets.values())
+
+    @property
+    def busy(self) -> bool:
+        """Return True while any target has a write pending or in flight."""
+        return any(state.task is not None for state in self._targets.values())
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return writer statistics for diagnostics."""
+        return {
+            "settle_time": self._settle_time,
+            "writes_requested": self.writes_requested,
+            "writes_sent": self.writes_sent,
+            "writes_collapsed": self.writes_collapsed,
+            "collapsed_by_target": {
+                target: state.collapsed for target, state in self._targets.items()
+            },
+        }
+
+    async def async_write(
+        self, target: str, values: Dict[str, Any], send: SendFunction
+    ) -> None:
+        """Queue `values` for `target` and wait until they are written.
+
+        `values` only holds the fields being changed; fields from a replaced
+        pending write are kept unless overridden (e.g. a mute toggle does not
+        drop a volume change queued just before it).
+        """
+        state = self._targets.setdefault(target, _TargetState())
+        self.writes_requested += 1
+        if state.pending is not None:
+            state.collapsed += 1
+            state.pending.update(values)
+        else:
+            state.pending = dict(values)
+        state.send = send
+
+        future: asyncio.Future = self._hass.loop.create_future()
+        state.waiters.append(future)
+        if state.task is None:
+            state.task = self._hass.async_create_background_task(
+                self._async_drain(target, state), f"openctrol volume writer {target}"
+            )
+        await future
+
+    async def _async_drain(self, target: str, state: _TargetState) -> None:
+        """Send pending values for one target until none are left."""
+        loop = self._hass.loop
+        waiters: List[asyncio.Future] = []
+        try:
+            while state.pending is not None:
+                delay = state.last_sent + self._settle_time - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                values, waiters, send = state.pending, state.waiters, state.send
+                state.pending, state.waiters = None, []
+                state.last_sent = loop.time()
+                try:
+                    assert send is not None
+                    await send(values)
+                except Exception as err:  # pylint: disable=broad-except
+                    _LOGGER.debug("Volume write for %s failed: %s", target, err)
+                    _resolve(waiters, err)
+                else:
+                    self.writes_sent += 1
+                    _resolve(waiters, None)
+        except asyncio.CancelledError:
+            _resolve(waiters + state.waiters, asyncio.CancelledError())
+            state.pending, state.waiters = None, []
+            raise
+        finally:
+            state.task = None
+
+    def async_cancel(self) -> None:
+        """Cancel all pending writes."""
+        for state in self._targets.values():
+            if state.task is not None:
+                state.task.cancel()
+
+
+def _resolve(waiters: List[asyncio.Future], error: Optional[BaseException]) -> None:
+    """Complete all waiters with the outcome of a write."""
+    for waiter in waiters:
+        if waiter.done():
+            continue
+        if error is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(error)
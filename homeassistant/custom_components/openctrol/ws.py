@@ -2,13 +2,52 @@
 
 import aiohttp
 import asyncio
-import json
 import logging
 import struct
-from typing import Any, Callable, Dict, Optional, TYPE_CHECKING
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from .api import OpenctrolCircuitOpenError, guarded
+from .breaker import CircuitBreaker
+from .codec import encode_frames
+from .const import DEFAULT_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_MISSED_PONGS
+from .cork import CorkStats, cork_websocket
+from .held import HeldInputTracker
+from .keys import (
+    VK_CONTROL,
+    VK_LWIN,
+    VK_MENU,
+    VK_SHIFT,
+    combo_messages,
+    map_key_name_to_code,
+    split_combo,
+)
+from .latency import InputLatency, detach_dispatch
+from .motion import MOTION_INTERVAL, PointerMotion
+from .replay import ReplayBuffer
+from .serialization import (
+    batch_messages,
+    dumps,
+    loads,
+    pointer_absolute_message,
+    pointer_button_message,
+    pointer_move_message,
+    pointer_wheel_message,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# How long a new connection waits for the agent's hello message
+HELLO_TIMEOUT = 1.0
+# The agent closes the socket on messages over 64 KiB
+MAX_MESSAGE_BYTES = 64 * 1024
+
+# Optional protocol features an agent can list in `hello.capabilities`
+CAPABILITY_BATCH = "batch"
+CAPABILITY_BINARY_INPUT = "binary_input"
+CAPABILITY_ECHO = "echo"
+CAPABILITY_ACK = "ack"
+
 if TYPE_CHECKING:
     from .api import OpenctrolApiClient
 
@@ -24,8 +63,33 @@ class OpenctrolWsClient:
         use_ssl: bool,
         api_key: Optional[str] = None,
         entry_id: Optional[str] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        api_client: Optional["OpenctrolApiClient"] = None,
+        coalesce_writes: bool = False,
+        binary_input: bool = False,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+        heartbeat_missed_pongs: int = DEFAULT_HEARTBEAT_MISSED_PONGS,
+        reliable_input: bool = False,
+        pointer_motion: bool = False,
+        pointer_acceleration: float = 0.0,
+        pointer_smoothing: float = 0.0,
     ) -> None:
-        """Initialize the WebSocket client."""
+        """Initialize the WebSocket client.
+
+        When `api_client` is given, its long-lived session is used for the
+        WebSocket and for desktop session requests instead of building a
+        new client on every connect. With `coalesce_writes`, frames written
+        in one event loop iteration leave as a single transport write. With
+        `binary_input`, input is sent in the binary codec to agents that
+        announce support for it; JSON is used otherwise. A heartbeat is
+        sent every `heartbeat_interval` seconds; after
+        `heartbeat_missed_pongs` unanswered in a row the connection is
+        aborted and reopened. With `reliable_input`, agents that acknowledge
+        input get sequence-numbered messages, and unacknowledged ones are
+        replayed after a reconnect. With `pointer_motion`, relative moves
+        keep their fractions and leave once per motion tick, with the
+        given acceleration and smoothing (see motion.py).
+        """
         self._hass = hass
         self._host = host
         self._port = port
@@ -39,13 +103,45 @@ class OpenctrolWsClient:
         self._frame_callback: Optional[Callable[[bytes, int, int], None]] = None
         self._receive_task: Any = None
         self._is_deprecated_endpoint: bool = False  # Track if using deprecated endpoint format
+        self._api_client = api_client
+        self._write_listeners: List[Callable[[Sequence[str]], None]] = []
+        self._cork_stats: Optional[CorkStats] = CorkStats() if coalesce_writes else None
+        self._hello = asyncio.Event()
+        self._capabilities: frozenset = frozenset()
+        self._monitors: List[Dict[str, Any]] = []
+        self._binary_input = binary_input
+        self.batches_sent = 0
+        self.binary_frames_sent = 0
+        self.batched_events = 0
+        self.latency = InputLatency()
+        # Survives reconnects so a press cut off by a drop is released later
+        self.held_inputs = HeldInputTracker()
+        self._replay: Optional[ReplayBuffer] = ReplayBuffer() if reliable_input else None
+        self._motion: Optional[PointerMotion] = (
+            PointerMotion(pointer_acceleration, pointer_smoothing) if pointer_motion else None
+        )
+        self._motion_task: Any = None
+        self._probe_task: Any = None
+        self._ping_sequence = 0
+        self._pings: Dict[int, float] = {}
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_missed_pongs = heartbeat_missed_pongs
+        self._missed_pongs = 0
+        self._connect_lock = asyncio.Lock()
+        self.dead_connections = 0
+        # Shared with the REST client of the same agent
+        self._breaker = breaker or (api_client.breaker if api_client else None)
+        self._ws_url_deprecated = f"{'wss' if use_ssl else 'ws'}://{host}:{port}/api/v1/rd/session"
 
     @property
     def _ws_url(self) -> str:
         """Get the WebSocket URL (deprecated - use session-based URL instead)."""
-        protocol = "wss" if self._use_ssl else "ws"
-        return f"{protocol}://{self._host}:{self._port}/api/v1/rd/session"
+        return self._ws_url_deprecated
     
+    def set_entry_id(self, entry_id: str) -> None:
+        """Look desktop sessions up under another config entry of this agent."""
+        self._entry_id = entry_id
+
     def set_frame_callback(self, callback: Optional[Callable[[bytes, int, int], None]]) -> None:
         """Set callback for receiving video frames. Callback receives (jpeg_data, width, height)."""
         self._frame_callback = callback
@@ -75,8 +171,11 @@ class OpenctrolWsClient:
                 self._ws = None
 
         try:
-            from homeassistant.helpers.aiohttp_client import async_get_clientsession
-            session = async_get_clientsession(self._hass)
+            if self._api_client is not None:
+                session = self._api_client.session
+            else:
+                from homeassistant.helpers.aiohttp_client import async_get_clientsession
+                session = async_get_clientsession(self._hass)
             
             # For input-only operations, we need a desktop session first
             # Try to reuse existing session or create one if we don't have a websocket_url
@@ -133,12 +232,13 @@ class OpenctrolWsClient:
                                         existing_session = session_data
                                         break
                     
-                    api_client = OpenctrolApiClient(
+                    api_client = self._api_client or OpenctrolApiClient(
                         session=session,
                         host=self._host,
                         port=self._port,
                         use_ssl=self._use_ssl,
                         api_key=self._api_key,
+                        breaker=self._breaker,
                     )
                     
                     if existing_session and existing_session.get("websocket_url"):
@@ -238,25 +338,53 @@ class OpenctrolWsClient:
 
             _LOGGER.info("Connecting to WebSocket: %s (deprecated=%s, headers=%s)", url, self._is_deprecated_endpoint, headers)
             try:
-                self._ws = await session.ws_connect(
-                    url,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                )
+                async with guarded(self._breaker):
+                    # Pongs are read by the receive loop to time round trips
+                    self._ws = await session.ws_connect(
+                        url,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=30),
+                        autoping=False,
+                    )
                 # Verify connection is actually open
                 if self._ws.closed:
                     raise RuntimeError("WebSocket connection closed immediately after connect")
                 self._connected = True
                 self._websocket_url = url
+                if self._cork_stats is not None:
+                    cork_websocket(self._ws, asyncio.get_running_loop(), self._cork_stats)
                 _LOGGER.info("WebSocket connected successfully (deprecated endpoint: %s, URL: %s)", self._is_deprecated_endpoint, url)
             except Exception as conn_err:
                 _LOGGER.error("WebSocket connection failed: %s (URL: %s, deprecated: %s)", conn_err, url, self._is_deprecated_endpoint)
                 self._connected = False
                 raise
             
-            # Start receiving messages if frame callback is set
-            if self._frame_callback:
-                self._start_receiving()
+            # Always read: the hello message carries the agent's capabilities
+            self._hello.clear()
+            self._capabilities = frozenset()
+            self._start_receiving()
+            if not self._is_deprecated_endpoint:
+                try:
+                    async with asyncio.timeout(HELLO_TIMEOUT):
+                        await self._hello.wait()
+                except TimeoutError:
+                    _LOGGER.debug("No hello from agent within %.1f s; using per-event messages", HELLO_TIMEOUT)
+                # Before any new input goes out on this connection: finish
+                # what was cut off, or release whatever is still held when
+                # the interaction cannot be continued
+                try:
+                    continued = False
+                    if self._replay is not None:
+                        if self.reliable_input_active:
+                            continued = await self._async_replay()
+                        else:
+                            self._replay.clear()
+                    if self.held_inputs and not continued:
+                        await self._async_release_held_inputs()
+                except Exception:
+                    self._connected = False
+                    raise
+            self._start_probing()
         except aiohttp.ClientError as err:
             self._connected = False
             _LOGGER.error("WebSocket connection error: %s", err)
@@ -264,18 +392,29 @@ class OpenctrolWsClient:
     
     def _start_receiving(self) -> None:
         """Start background task to receive WebSocket messages."""
-        if self._receive_task:
-            return
+        if self._receive_task and not self._receive_task.done():
+            # Reader of a previous connection
+            self._receive_task.cancel()
+        ws = self._ws
         
         async def receive_loop() -> None:
-            if not self._ws:
+            detach_dispatch()
+            if not ws:
                 return
             try:
-                async for msg in self._ws:
+                async for msg in ws:
                     if msg.type == aiohttp.WSMsgType.BINARY:
                         await self._handle_binary_message(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.TEXT:
+                        self._handle_text_message(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.PING:
+                        await ws.pong(msg.data)
+                    elif msg.type == aiohttp.WSMsgType.PONG:
+                        # Unsolicited keep-alive pongs carry no probe id
+                        if len(msg.data) == 8:
+                            self._handle_probe_reply(struct.unpack("<Q", msg.data)[0])
                     elif msg.type == aiohttp.WSMsgType.ERROR:
-                        _LOGGER.error("WebSocket error: %s", self._ws.exception())
+                        _LOGGER.error("WebSocket error: %s", ws.exception())
                         break
                     elif msg.type == aiohttp.WSMsgType.CLOSE:
                         _LOGGER.info("WebSocket closed")
@@ -283,10 +422,146 @@ class OpenctrolWsClient:
             except Exception as err:
                 _LOGGER.error("Error in WebSocket receive loop: %s", err)
             finally:
-                self._receive_task = None
+                if self._receive_task is asyncio.current_task():
+                    self._receive_task = None
         
         # Create task in Home Assistant event loop
-        self._receive_task = self._hass.async_create_task(receive_loop())
+        self._receive_task = self._hass.async_create_background_task(
+            receive_loop(), f"openctrol websocket {self._host}"
+        )
+
+    def _handle_text_message(self, data: str) -> None:
+        """Handle a JSON message from the agent."""
+        try:
+            message = loads(data)
+        except ValueError:
+            _LOGGER.debug("Ignoring non-JSON WebSocket message")
+            return
+        if not isinstance(message, dict):
+            return
+        if message.get("type") == "hello":
+            # Agents without a capabilities list get plain per-event messages
+            capabilities = message.get("capabilities")
+            self._capabilities = frozenset(
+                capabilities if isinstance(capabilities, list) else ()
+            )
+            self._monitors = message.get("monitors") or []
+            self._hello.set()
+            _LOGGER.debug("Agent hello: version %s, capabilities %s", message.get("version"), sorted(self._capabilities))
+        elif message.get("type") == "echo" and isinstance(message.get("id"), int):
+            self._handle_probe_reply(message["id"])
+        elif message.get("type") == "ack" and isinstance(message.get("seq"), int):
+            if self._replay is not None:
+                self._replay.ack(message["seq"])
+
+    def _start_probing(self) -> None:
+        """Start heartbeats, which also time round trips, on the current connection."""
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._pings.clear()
+        self._missed_pongs = 0
+        ws = self._ws
+
+        async def probe_loop() -> None:
+            detach_dispatch()
+            try:
+                while ws is not None and not ws.closed:
+                    await asyncio.sleep(self._heartbeat_interval)
+                    if self._pings:
+                        self._missed_pongs += 1
+                        if self._missed_pongs >= self._heartbeat_missed_pongs:
+                            self._handle_dead_connection(ws)
+                            return
+                    # Only the latest probe is timed; older ones count as lost
+                    self._pings.clear()
+                    self._ping_sequence += 1
+                    self._pings[self._ping_sequence] = time.monotonic()
+                    self.latency.pings_sent += 1
+                    if CAPABILITY_ECHO in self._capabilities:
+                        # Echo also covers the agent's message dispatch
+                        await ws.send_str(dumps({"type": "echo", "id": self._ping_sequence}))
+                    else:
+                        await ws.ping(struct.pack("<Q", self._ping_sequence))
+            except Exception as err:
+                _LOGGER.debug("WebSocket round-trip probe stopped: %s", err)
+            finally:
+                if self._probe_task is asyncio.current_task():
+                    self._probe_task = None
+
+        self._probe_task = self._hass.async_create_background_task(
+            probe_loop(), f"openctrol websocket probe {self._host}"
+        )
+
+    def _start_motion(self) -> None:
+        """Emit accumulated pointer motion once per tick until it is used up."""
+        if self._motion_task and not self._motion_task.done():
+            return
+        motion = self._motion
+
+        async def motion_loop() -> None:
+            detach_dispatch()
+            try:
+                while motion.pending:
+                    await asyncio.sleep(MOTION_INTERVAL)
+                    if (move := motion.take()) is not None:
+                        await self._async_deliver_input((move,))
+            except Exception as err:
+                _LOGGER.debug("Pointer motion to %s stopped: %s", self._host, err)
+                motion.reset()
+                self._connected = False
+            finally:
+                if self._motion_task is asyncio.current_task():
+                    self._motion_task = None
+
+        self._motion_task = self._hass.async_create_background_task(
+            motion_loop(), f"openctrol pointer motion {self._host}"
+        )
+
+    def _handle_probe_reply(self, sequence: int) -> None:
+        """Record the round trip of an answered probe."""
+        if (sent := self._pings.pop(sequence, None)) is not None:
+            self.latency.rtt.record(time.monotonic() - sent)
+            self.latency.pongs_received += 1
+            self._missed_pongs = 0
+
+    def _handle_dead_connection(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Abort a connection that stopped answering heartbeats and reopen it.
+
+        A half-open TCP connection keeps accepting writes until the OS
+        gives up on it; aborting the transport makes pending and new sends
+        fail at once.
+        """
+        if ws is not self._ws:
+            return
+        _LOGGER.warning(
+            "WebSocket to %s missed %d heartbeats; reconnecting", self._host, self._missed_pongs
+        )
+        self.dead_connections += 1
+        self._connected = False
+        transport = getattr(getattr(ws, "_writer", None), "transport", None)
+        if transport is not None:
+            transport.abort()
+
+        async def reconnect() -> None:
+            detach_dispatch()
+            try:
+                await self._async_reconnect(ws)
+            except Exception as err:
+                _LOGGER.debug("Reconnect to %s after missed heartbeats failed: %s", self._host, err)
+
+        self._hass.async_create_background_task(
+            reconnect(), f"openctrol websocket reconnect {self._host}"
+        )
+
+    async def _async_reconnect(self, ws: Optional[aiohttp.ClientWebSocketResponse]) -> None:
+        """Replace a failed connection; held and unacknowledged input is handled on the new one."""
+        async with self._connect_lock:
+            if self._ws is ws:
+                await self.async_close()
+            elif ws is not None:
+                # Someone else already reconnected
+                await ws.close()
+            await self._async_ensure_connected()
     
     async def _handle_binary_message(self, data: bytes) -> None:
         """Handle binary WebSocket message (video frame with OFRA header)."""
@@ -318,14 +593,56 @@ class OpenctrolWsClient:
         except Exception as err:
             _LOGGER.error("Error parsing binary frame: %s", err)
 
+    async def _async_replay(self) -> bool:
+        """Write unacknowledged input again, in its original order.
+
+        Returns True when nothing was lost, so keys and buttons held on
+        purpose (a drag in progress) can stay down.
+        """
+        dropped = self._replay.dropped
+        pending = self._replay.pending()
+        if pending:
+            _LOGGER.info("Replaying %d unacknowledged input events to %s", len(pending), self._host)
+            await self._async_send_json([stamped_json for stamped_json, _ in pending])
+            self._replay.replayed += len(pending)
+            self.held_inputs.observe([message_json for _, message_json in pending])
+        return self._replay.dropped == dropped
+
+    async def _async_release_held_inputs(self) -> None:
+        """Send the up events for keys and buttons still held down."""
+        releases = self.held_inputs.releases()
+        _LOGGER.info("Releasing %d keys/buttons left held on %s", len(releases), self._host)
+        await self._async_write(releases)
+        self.held_inputs.releases_sent += len(releases)
+
+    async def async_release_held_inputs(self) -> None:
+        """Release keys and buttons still held down, if the connection is open.
+
+        Whatever cannot be released now is kept for the next connection.
+        """
+        if self.held_inputs and self.connected and not self._is_deprecated_endpoint:
+            try:
+                await self._async_release_held_inputs()
+            except Exception as err:
+                _LOGGER.debug("Could not release held input: %s", err)
+
     async def async_close(self) -> None:
-        """Close the WebSocket connection."""
+        """Close the WebSocket connection, releasing held keys and buttons first."""
+        await self.async_release_held_inputs()
+        if self._probe_task and not self._probe_task.done():
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self._motion_task and not self._motion_task.done():
+            self._motion_task.cancel()
+            self._motion_task = None
+        if self._motion is not None:
+            self._motion.reset()
         # Cancel receive task if running
         if self._receive_task and not self._receive_task.done():
             self._receive_task.cancel()
             try:
                 await self._receive_task
-            except Exception:
+            except (asyncio.CancelledError, Exception):
                 pass
             self._receive_task = None
         
@@ -339,20 +656,68 @@ class OpenctrolWsClient:
         self._ws = None
         self._session_id = None
         self._websocket_url = None
+        self._hello.clear()
+        self._capabilities = frozenset()
 
-    async def async_send_pointer_event(
-        self,
-        event_type: str,
-        dx: float | None = None,
-        dy: float | None = None,
-        button: Optional[str] = None,
-        action: Optional[str] = None,
-        absolute: bool = False,
-        x: float | None = None,
-        y: float | None = None,
-    ) -> None:
-        """Send a pointer event (move, click, button, or scroll)."""
-        # Ensure connection with retry logic
+    @property
+    def capabilities(self) -> frozenset:
+        """Return the optional protocol features the agent announced in hello."""
+        return self._capabilities
+
+    @property
+    def monitors(self) -> List[Dict[str, Any]]:
+        """Return the monitors listed in the agent's hello."""
+        return self._monitors
+
+    @property
+    def reliable_input_active(self) -> bool:
+        """Return True when input is sequence-numbered and acknowledged on this session."""
+        return self._replay is not None and CAPABILITY_ACK in self._capabilities
+
+    @property
+    def binary_input_active(self) -> bool:
+        """Return True when input goes out in the binary codec on this session."""
+        return self._binary_input and CAPABILITY_BINARY_INPUT in self._capabilities
+
+    @property
+    def write_stats(self) -> Optional[Dict[str, Any]]:
+        """Return write coalescing counters, or None when it is off."""
+        return self._cork_stats.as_dict() if self._cork_stats is not None else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return connection state and counters for diagnostics."""
+        return {
+            "connected": self.connected,
+            "deprecated_endpoint": self._is_deprecated_endpoint,
+            "capabilities": sorted(self._capabilities),
+            "batches_sent": self.batches_sent,
+            "batched_events": self.batched_events,
+            "binary_input": self.binary_input_active,
+            "binary_frames_sent": self.binary_frames_sent,
+            "writes": self.write_stats,
+            "heartbeat_interval": self._heartbeat_interval,
+            "heartbeat_missed_pongs": self._heartbeat_missed_pongs,
+            "dead_connections": self.dead_connections,
+            "held_inputs": len(self.held_inputs),
+            "held_releases_sent": self.held_inputs.releases_sent,
+            "reliable_input": self.reliable_input_active,
+            "replay": self._replay.as_dict() if self._replay is not None else None,
+            "pointer_motion": self._motion.as_dict() if self._motion is not None else None,
+            "latency": self.latency.as_dict(),
+        }
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the WebSocket is open."""
+        return self._connected and self._ws is not None and not self._ws.closed
+
+    async def async_ensure_connected(self) -> None:
+        """Connect if needed, retrying a few times with backoff."""
+        # Callers and the heartbeat reconnect share one attempt
+        async with self._connect_lock:
+            await self._async_ensure_connected()
+
+    async def _async_ensure_connected(self) -> None:
         max_retries = 3
         retry_delay = 0.3
         
@@ -360,21 +725,24 @@ class OpenctrolWsClient:
             # Check connection state - verify both flag and actual WebSocket state
             if not self._connected or not self._ws or self._ws.closed:
                 try:
-                    _LOGGER.debug("WebSocket not connected for pointer event, attempting connection (attempt %d/%d)", attempt + 1, max_retries)
+                    _LOGGER.debug("WebSocket not connected for input, attempting connection (attempt %d/%d)", attempt + 1, max_retries)
                     await self.async_connect()
                     # Verify connection was actually established
                     if self._connected and self._ws and not self._ws.closed:
-                        _LOGGER.debug("WebSocket connected successfully for pointer event")
+                        _LOGGER.debug("WebSocket connected successfully for input")
                         break
                     else:
                         raise RuntimeError("Connection established but WebSocket state invalid")
+                except OpenctrolCircuitOpenError:
+                    # Agent is known to be unreachable - don't wait out retries
+                    raise
                 except Exception as conn_err:
                     if attempt < max_retries - 1:
                         _LOGGER.debug("WebSocket connection attempt %d failed, retrying: %s", attempt + 1, conn_err)
                         await asyncio.sleep(retry_delay * (attempt + 1))  # Exponential backoff
                         continue
                     else:
-                        _LOGGER.error("Failed to connect WebSocket for pointer event after %d attempts: %s", max_retries, conn_err)
+                        _LOGGER.error("Failed to connect WebSocket for input after %d attempts: %s", max_retries, conn_err)
                         raise RuntimeError(f"WebSocket not connected: {conn_err}") from conn_err
             else:
                 # Connection appears valid, verify it's actually working
@@ -395,6 +763,111 @@ class OpenctrolWsClient:
             _LOGGER.error("WebSocket connection verification failed after retries")
             raise RuntimeError("WebSocket not connected after retry attempts")
 
+    def add_write_listener(self, listener: Callable[[Sequence[str]], None]) -> Callable[[], None]:
+        """Call `listener` with every batch of input messages written; returns a remove function."""
+        self._write_listeners.append(listener)
+
+        def _remove() -> None:
+            if listener in self._write_listeners:
+                self._write_listeners.remove(listener)
+
+        return _remove
+
+    async def _async_write(self, messages: Sequence[str]) -> None:
+        """Write session-format input messages in order.
+
+        Every session input write goes through here, so listeners (macro
+        recording) see exactly what the agent received, the held-input
+        tracker sees every press and release, and its timing feeds the
+        queue wait and send histograms.
+        """
+        started = time.monotonic()
+        try:
+            if self.reliable_input_active:
+                # Binary records have no room for a sequence number
+                await self._async_send_json(self._replay.stamp(messages))
+            elif self.binary_input_active:
+                for frame in encode_frames(messages, MAX_MESSAGE_BYTES):
+                    if isinstance(frame, bytes):
+                        await self._ws.send_bytes(frame)
+                        self.binary_frames_sent += 1
+                    else:
+                        await self._ws.send_str(frame)
+            else:
+                await self._async_send_json(messages)
+        except BaseException:
+            self.held_inputs.observe(messages, delivered=False)
+            raise
+        self.held_inputs.observe(messages)
+        self.latency.record_write(started, time.monotonic())
+        for listener in list(self._write_listeners):
+            listener(messages)
+
+    async def _async_send_json(self, messages: Sequence[str]) -> None:
+        """Write JSON messages, in batch envelopes when the agent takes them."""
+        if len(messages) > 1 and CAPABILITY_BATCH in self._capabilities:
+            for envelope in batch_messages(messages, MAX_MESSAGE_BYTES):
+                await self._ws.send_str(envelope)
+                self.batches_sent += 1
+            self.batched_events += len(messages)
+        else:
+            for message_json in messages:
+                await self._ws.send_str(message_json)
+
+    async def _async_send_input(self, messages: Sequence[str]) -> None:
+        """Write input messages after any pointer motion still pending."""
+        if self._motion is not None and (move := self._motion.take(settle=True)) is not None:
+            messages = (move, *messages)
+        await self._async_deliver_input(messages)
+
+    async def _async_deliver_input(self, messages: Sequence[str]) -> None:
+        """Write input messages; in reliable mode a failed write is recovered.
+
+        The messages are already in the replay buffer, so reconnecting
+        delivers them and the caller does not have to send them again.
+        """
+        ws = self._ws
+        try:
+            await self._async_write(messages)
+        except Exception as err:
+            if not self.reliable_input_active:
+                raise
+            _LOGGER.debug("Input write to %s failed (%s); reconnecting to replay it", self._host, err)
+            self._connected = False
+            await self._async_reconnect(ws)
+
+    async def async_send_messages(self, messages: Sequence[str]) -> None:
+        """Send pre-encoded session-format messages in order.
+
+        The caller connects first (see `async_ensure_connected`); this only
+        writes, so a sequence of bursts shares one connection check.
+        """
+        if not self.connected:
+            self._connected = False
+            raise RuntimeError("WebSocket not connected")
+        if self._is_deprecated_endpoint:
+            raise RuntimeError("The deprecated WebSocket endpoint does not accept session input messages")
+        try:
+            await self._async_send_input(messages)
+        except Exception as err:
+            _LOGGER.error("Error sending input messages: %s", err)
+            self._connected = False
+            raise
+
+    async def async_send_pointer_event(
+        self,
+        event_type: str,
+        dx: float | None = None,
+        dy: float | None = None,
+        button: Optional[str] = None,
+        action: Optional[str] = None,
+        absolute: bool = False,
+        x: float | None = None,
+        y: float | None = None,
+    ) -> None:
+        """Send a pointer event (move, click, button, or scroll)."""
+        await self.async_ensure_connected()
+
         # Build message according to endpoint format (deprecated vs session-based)
         if self._is_deprecated_endpoint:
             # Deprecated endpoint format: {"type": "pointer", "event": "move", "dx": ..., "dy": ...}
@@ -442,7 +915,7 @@ class OpenctrolWsClient:
             
             # Send single message for deprecated endpoint
             try:
-                message_json = json.dumps(message)
+                message_json = dumps(message)
                 _LOGGER.debug("Sending pointer event (deprecated format) to %s: %s", self._websocket_url, message_json)
                 await self._ws.send_str(message_json)
                 _LOGGER.debug("Sent pointer event (deprecated format): %s", event_type)
@@ -457,39 +930,31 @@ class OpenctrolWsClient:
                 # Absolute moves use normalized 0-65535 coordinates
                 if absolute and x is not None and y is not None:
                     # Send absolute move with normalized 0-65535 coordinates
-                    message = {
-                        "type": "pointer_move",
-                        "x": int(round(x)),
-                        "y": int(round(y)),
-                        "absolute": True,
-                    }
+                    message_json = pointer_absolute_message(int(round(x)), int(round(y)))
+                elif dx is not None and dy is not None and self._motion is not None:
+                    # Fractions are kept; the motion tick writes the move
+                    self._motion.add(float(dx), float(dy))
+                    if self._motion.pending:
+                        self._start_motion()
+                    return
                 elif dx is not None and dy is not None:
                     # Relative move
-                    message = {
-                        "type": "pointer_move",
-                        "dx": int(round(dx)),
-                        "dy": int(round(dy)),
-                    }
+                    message_json = pointer_move_message(int(round(dx)), int(round(dy)))
                 else:
                     raise ValueError("dx and dy (or x, y with absolute) are required for move events")
             elif event_type == "click":
                 if button is None:
                     raise ValueError("button is required for click events")
                 # Send both down and up actions for a click
-                message_down = {
-                    "type": "pointer_button",
-                    "button": button.lower(),
-                    "action": "down",
-                }
-                message_up = {
-                    "type": "pointer_button",
-                    "button": button.lower(),
-                    "action": "up",
-                }
+                button_name = button.lower()
                 # Send down first, then up
                 try:
-                    await self._ws.send_str(json.dumps(message_down))
-                    await self._ws.send_str(json.dumps(message_up))
+                    await self._async_send_input(
+                        (
+                            pointer_button_message(button_name, "down"),
+                            pointer_button_message(button_name, "up"),
+                        )
+                    )
                     # Reduced logging
                 except Exception as err:
                     _LOGGER.error("Error sending pointer click: %s", err)
@@ -515,14 +980,9 @@ class OpenctrolWsClient:
                         button_action = action_str
                     else:
                         _LOGGER.warning("Invalid button action in dx parameter: %s, defaulting to 'down'", dx)
-                message = {
-                    "type": "pointer_button",
-                    "button": button.lower(),
-                    "action": button_action,
-                }
                 try:
-                    message_json = json.dumps(message)
-                    await self._ws.send_str(message_json)
+                    message_json = pointer_button_message(button.lower(), button_action)
+                    await self._async_send_input((message_json,))
                     _LOGGER.debug("Sent pointer button event: %s", message_json)
                 except Exception as err:
                     _LOGGER.error("Error sending pointer button: %s", err)
@@ -533,74 +993,41 @@ class OpenctrolWsClient:
                 if dx is None or dy is None:
                     raise ValueError("dx and dy are required for scroll events")
                 # Ensure delta_x and delta_y are integers
-                message = {
-                    "type": "pointer_wheel",
-                    "delta_x": int(round(dx)),
-                    "delta_y": int(round(dy)),
-                }
+                message_json = pointer_wheel_message(int(round(dx)), int(round(dy)))
             else:
                 raise ValueError(f"Unknown pointer event type: {event_type}")
 
             # Send message
             try:
-                message_json = json.dumps(message)
                 # Reduced logging - only log errors
-                await self._ws.send_str(message_json)
+                await self._async_send_input((message_json,))
             except Exception as err:
                 _LOGGER.error("Error sending pointer event: %s", err)
                 self._connected = False
                 raise
 
-    def _map_key_name_to_code(self, key_name: str) -> Optional[int]:
-        """Map key name to Windows virtual key code."""
-        key_upper = key_name.upper()
-        mapping = {
-            "TAB": 0x09,
-            "ENTER": 0x0D,
-            "ESC": 0x1B,
-            "ESCAPE": 0x1B,
-            "SPACE": 0x20,
-            "BACKSPACE": 0x08,
-            "DEL": 0x2E,
-            "DELETE": 0x2E,
-            "INSERT": 0x2D,
-            "HOME": 0x24,
-            "END": 0x23,
-            "PAGEUP": 0x21,
-            "PAGEDOWN": 0x22,
-            "UP": 0x26,
-            "DOWN": 0x28,
-            "LEFT": 0x25,
-            "RIGHT": 0x27,
-            "F1": 0x70,
-            "F2": 0x71,
-            "F3": 0x72,
-            "F4": 0x73,
-            "F5": 0x74,
-            "F6": 0x75,
-            "F7": 0x76,
-            "F8": 0x77,
-            "F9": 0x78,
-            "F10": 0x79,
-            "F11": 0x7A,
-            "F12": 0x7B,
-            "CTRL": 0x11,
-            "CONTROL": 0x11,
-            "ALT": 0x12,
-            "SHIFT": 0x10,
-            "WIN": 0x5B,
-            "WINDOWS": 0x5B,
-        }
-        
-        # Handle letter keys (A-Z)
-        if len(key_upper) == 1 and key_upper.isalpha():
-            return ord(key_upper)
-        
-        # Handle number keys (0-9)
-        if len(key_upper) == 1 and key_upper.isdigit():
-            return ord(key_upper)
-        
-        return mapping.get(key_upper)
+    async def async_click_at(self, x: int, y: int, button: str = "left") -> None:
+        """Move to normalized (0-65535) coordinates and click there.
+
+        The move and the down/up pair are written as one burst, so the
+        click cannot land anywhere else and costs a single write.
+        """
+        await self.async_ensure_connected()
+        if self._is_deprecated_endpoint:
+            raise RuntimeError("The deprecated WebSocket endpoint does not support absolute pointer moves")
+        button_name = button.lower()
+        try:
+            await self._async_send_input(
+                (
+                    pointer_absolute_message(x, y),
+                    pointer_button_message(button_name, "down"),
+                    pointer_button_message(button_name, "up"),
+                )
+            )
+        except Exception as err:
+            _LOGGER.error("Error sending click at %d,%d: %s", x, y, err)
+            self._connected = False
+            raise
 
     async def async_send_key_combo(self, keys: list[str]) -> None:
         """Send a keyboard key combination.
@@ -609,86 +1036,15 @@ class OpenctrolWsClient:
         Modifiers are sent first (down), then main keys, then keys released (up) in reverse order.
         Supports modifier-only combinations (e.g., ["CTRL"]).
         """
-        # Ensure connection with retry logic (same as pointer events)
-        max_retries = 3
-        retry_delay = 0.3
-        
-        for attempt in range(max_retries):
-            # Check connection state - verify both flag and actual WebSocket state
-            if not self._connected or not self._ws or self._ws.closed:
-                try:
-                    _LOGGER.debug("WebSocket not connected for key combo, attempting connection (attempt %d/%d)", attempt + 1, max_retries)
-                    await self.async_connect()
-                    # Verify connection was actually established
-                    if self._connected and self._ws and not self._ws.closed:
-                        _LOGGER.debug("WebSocket connected successfully for key combo")
-                        break
-                    else:
-                        raise RuntimeError("Connection established but WebSocket state invalid")
-                except Exception as conn_err:
-                    if attempt < max_retries - 1:
-                        _LOGGER.debug("WebSocket connection attempt %d failed, retrying: %s", attempt + 1, conn_err)
-                        await asyncio.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                        continue
-                    else:
-                        _LOGGER.error("Failed to connect WebSocket for key combo after %d attempts: %s", max_retries, conn_err)
-                        raise RuntimeError(f"WebSocket not connected: {conn_err}") from conn_err
-            else:
-                # Connection appears valid, verify it's actually working
-                try:
-                    # Quick check - if WebSocket is in a bad state, reconnect
-                    if self._ws.closed:
-                        self._connected = False
-                        continue
-                    break
-                except Exception:
-                    # WebSocket may be in invalid state, force reconnect
-                    self._connected = False
-                    self._ws = None
-                    continue
-
-        # Final verification
-        if not self._ws or self._ws.closed:
-            _LOGGER.error("WebSocket connection verification failed after retries")
-            raise RuntimeError("WebSocket not connected after retry attempts")
-        
         if not keys:
             raise ValueError("keys list cannot be empty")
 
-        if not keys:
-            raise ValueError("keys list cannot be empty")
+        await self.async_ensure_connected()
 
         # Separate modifiers from main keys
-        modifier_flags = {"ctrl": False, "alt": False, "shift": False, "win": False}
-        modifier_key_codes = []  # Store modifier key codes for sending
-        main_keys = []
-        
-        # Map key codes to their modifier flags for exclusion logic
-        VK_CONTROL = 0x11
-        VK_MENU = 0x12  # Alt
-        VK_SHIFT = 0x10
-        VK_LWIN = 0x5B
-        
-        for key in keys:
-            key_upper = key.upper()
-            if key_upper in ("CTRL", "CONTROL"):
-                modifier_flags["ctrl"] = True
-                modifier_key_codes.append(VK_CONTROL)
-            elif key_upper in ("ALT",):
-                modifier_flags["alt"] = True
-                modifier_key_codes.append(VK_MENU)
-            elif key_upper in ("SHIFT",):
-                modifier_flags["shift"] = True
-                modifier_key_codes.append(VK_SHIFT)
-            elif key_upper in ("WIN", "WINDOWS"):
-                modifier_flags["win"] = True
-                modifier_key_codes.append(VK_LWIN)
-            else:
-                key_code = self._map_key_name_to_code(key)
-                if key_code is not None:
-                    main_keys.append(key_code)
-                else:
-                    _LOGGER.warning("Unknown key name: %s", key)
+        modifier_key_codes, main_keys, unknown = split_combo(keys)
+        for key in unknown:
+            _LOGGER.warning("Unknown key name: %s", key)
 
         # Check if we have any keys to send (modifiers or main keys)
         if not modifier_key_codes and not main_keys:
@@ -719,7 +1075,7 @@ class OpenctrolWsClient:
                         else:
                             # Fallback: use original key name from input
                             for orig_key in keys:
-                                if self._map_key_name_to_code(orig_key) == key_code:
+                                if map_key_name_to_code(orig_key) == key_code:
                                     key_names.append(orig_key.upper())
                                     break
                 
@@ -727,51 +1083,16 @@ class OpenctrolWsClient:
                     "type": "keyboard",
                     "keys": key_names,
                 }
-                message_json = json.dumps(message)
+                message_json = dumps(message)
                 _LOGGER.debug("Sending key combo (deprecated format) to %s: %s", self._websocket_url, message_json)
                 await self._ws.send_str(message_json)
                 _LOGGER.info("Sent key combo (deprecated format): %s -> %s", keys, message_json)
             else:
                 # Session-based endpoint format: {"type": "key", "key_code": ..., "action": "down"}
-                # Send key down events: modifiers first, then main keys
-                # IMPORTANT: Since modifiers are sent first as physical keys, we should NOT
-                # set modifier flags for subsequent keys - the modifiers are already physically down.
-                # Setting flags would cause C# to inject synthetic modifiers again, causing double-injection.
-                all_keys_down = modifier_key_codes + main_keys
-                
-                for key_code in all_keys_down:
-                    message = {
-                        "type": "key",
-                        "key_code": key_code,
-                        "action": "down",
-                    }
-                    # Do NOT set modifier flags here - modifiers are already physically pressed
-                    # Setting flags would cause redundant injection in C# InputDispatcher
-                    # The C# side will see the physical modifier keys that were sent first
-                    
-                    await self._ws.send_str(json.dumps(message))
-                
-                # Send key up events in reverse order: main keys first, then modifiers
-                # IMPORTANT: Do NOT set modifier flags for up events either - modifiers are
-                # still physically down until they are released, so no flags needed
-                all_keys_up = list(reversed(main_keys)) + list(reversed(modifier_key_codes))
-                
-                for key_code in all_keys_up:
-                    message = {
-                        "type": "key",
-                        "key_code": key_code,
-                        "action": "up",
-                    }
-                    # Do NOT set modifier flags here - modifiers are still physically pressed
-                    # until they are released. Setting flags would cause redundant injection.
-                    
-                    message_json = json.dumps(message)
-                    await self._ws.send_str(message_json)
-                    # Reduced logging - only log errors
-                
-                # Only log if there's an error, not every key combo
+                # Modifiers go down first and come up last; they are sent as
+                # physical keys, so no modifier flags are set on the other keys
+                await self._async_send_input(combo_messages(modifier_key_codes, main_keys))
         except Exception as err:
             _LOGGER.error("Error sending key combo: %s (keys: %s, endpoint: %s)", err, keys, "deprecated" if self._is_deprecated_endpoint else "session", exc_info=True)
             self._connected = False
             raise
-